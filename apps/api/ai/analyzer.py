@@ -1,45 +1,166 @@
-"""AI DOM Analyzer using OpenAI GPT-4"""
-import os
-from typing import Dict, Any, Optional
-from openai import AsyncOpenAI
+"""AI DOM Analyzer using OpenAI chat models"""
+import asyncio
+import json
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 
-class DOMAnalyzer:
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from ai.fingerprint import cluster_pages, page_fingerprint, propagate_results
+from ai.heuristics import predict_complexity
+from ai.model_router import ModelRouter, get_model_router
+from ai.token_budget import Batch, TokenBudgetPacker, TokenCounter, group_by_source
+from config.settings import settings
+from lib.cpu_executor import cpu_executor
+from lib.exceptions import ExternalServiceError
 
-    async def analyze(self, html: str, css: Optional[str] = None) -> Dict[str, Any]:
-        """Analyze HTML structure with GPT-4"""
-        
-        prompt = f"""
-        Analyze this HTML and identify:
-        1. Page type (static/template/dynamic)
-        2. Main sections (header, hero, features, footer, etc.)
-        3. Complexity score (0-100)
-        
-        HTML:
-        {html[:2000]}  # Truncate for token limits
-        
-        Return JSON format:
-        {{
+SYSTEM_PROMPT = "You are an expert web analyzer."
+
+PROMPT_TEMPLATE = """
+Analyze each HTML document below and identify, per document:
+1. Page type (static/template/dynamic)
+2. Main sections (header, hero, features, footer, etc.)
+3. Complexity score (0-100)
+
+Some documents are consecutive parts of one larger page; analyze each one on its own.
+
+{documents}
+
+Return JSON format, with one entry per document id:
+{{
+    "documents": {{
+        "<document id>": {{
             "page_type": "static|template|dynamic",
             "sections": [
-                {{"type": "header", "html": "...", "complexity": 0-100}}
+                {{"type": "header", "html": "...", "complexity": 0-100, "confidence": 0-1}}
             ],
             "overall_complexity": 0-100
         }}
+    }}
+}}
+"""
+
+DOCUMENT_TEMPLATE = '<document id="{id}">\n{text}\n</document>'
+
+
+class DOMAnalyzer:
+    def __init__(self, router: Optional[ModelRouter] = None, max_tokens: Optional[int] = None):
+        self.router = router or get_model_router()
+        self.counter = TokenCounter(settings.ai_strong_model)
+        self.reserved_tokens = self.counter.count(SYSTEM_PROMPT + PROMPT_TEMPLATE)
+        self.packer = TokenBudgetPacker(
+            self.counter,
+            max_tokens=max_tokens or settings.ai_max_tokens,
+            reserved_tokens=self.reserved_tokens,
+            completion_tokens=settings.ai_completion_tokens_per_document,
+        )
+
+    async def analyze(self, html: str, css: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze HTML structure with the routed model"""
+        results = await self.analyze_pages({"page": html})
+        return results["page"]
+
+    async def analyze_pages(self, pages: Mapping[str, str]) -> Dict[str, Dict[str, Any]]:
         """
-        
-        response = await self.client.chat.completions.create(
-            model="gpt-4-turbo-preview",
+        Analyze many pages with as few requests as the token budget allows.
+
+        Pages are packed into shared requests and oversized pages are split;
+        results are returned per page key in input order.
+        """
+        batches = self.packer.pack(pages)
+        results: Dict[str, Any] = {}
+
+        for response in await asyncio.gather(*(self._analyze_batch(b) for b in batches)):
+            results.update(response)
+
+        # Retry documents the model dropped from a shared response on their own
+        missing = [item for batch in batches for item in batch.items if item.id not in results]
+        if missing:
+            retries = await asyncio.gather(*(
+                self._analyze_batch(self.packer.batch_of(item))
+                for item in missing
+            ))
+            for response in retries:
+                results.update(response)
+
+        grouped = group_by_source(batches, results)
+
+        analyses: Dict[str, Dict[str, Any]] = {}
+        for source in pages:
+            parts = grouped.get(source)
+            if not parts or any(part is None for part in parts):
+                raise ExternalServiceError("OpenAI", f"No analysis returned for page '{source}'")
+            analyses[source] = merge_analyses(parts)
+
+        return analyses
+
+    async def analyze_site(self, pages: Mapping[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze a whole site, sending only one page per structural template.
+
+        Each page's result carries a `template` entry naming the analyzed
+        representative and the confidence that the result applies.
+        """
+        fingerprints = dict(zip(pages, await cpu_executor.map(page_fingerprint, pages.values())))
+        clusters = cluster_pages(fingerprints)
+
+        representatives = {cluster.representative: pages[cluster.representative] for cluster in clusters}
+        analyses = await self.analyze_pages(representatives)
+
+        propagated = propagate_results(clusters, analyses)
+        return {key: propagated[key] for key in pages}
+
+    async def _analyze_batch(self, batch: Batch) -> Dict[str, Any]:
+        """Send one packed request and return its results keyed by item id"""
+        documents = "\n\n".join(
+            DOCUMENT_TEMPLATE.format(id=item.id, text=item.text) for item in batch.items
+        )
+
+        expected = {item.id for item in batch.items}
+
+        def parse(response: Any) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+            try:
+                result = json.loads(response.choices[0].message.content)
+            except (TypeError, ValueError):
+                return None, None
+
+            documents_result = result.get("documents") if isinstance(result, dict) else None
+            if not isinstance(documents_result, dict):
+                return None, None
+
+            documents_result = {
+                key: value for key, value in documents_result.items()
+                if key in expected and isinstance(value, dict)
+            }
+            confidences = [
+                section["confidence"]
+                for value in documents_result.values()
+                for section in value.get("sections", [])
+                if isinstance(section, dict) and isinstance(section.get("confidence"), (int, float))
+            ]
+            confidence = sum(confidences) / len(confidences) if confidences else None
+            return documents_result, confidence
+
+        result = await self.router.complete(
             messages=[
-                {"role": "system", "content": "You are an expert web analyzer."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": PROMPT_TEMPLATE.format(documents=documents)}
             ],
+            input_tokens=self.reserved_tokens + batch.tokens,
+            complexity=max(predict_complexity(item.text) for item in batch.items),
+            parse=parse,
             response_format={"type": "json_object"},
-            temperature=0.1
+            max_tokens=batch.completion_tokens,
+            temperature=settings.ai_temperature
         )
-        
-        # Parse JSON response
-        import json
-        result = json.loads(response.choices[0].message.content)
-        return result
+        return result or {}
+
+
+def merge_analyses(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine the analyses of consecutive parts of one page"""
+    sections: List[Dict[str, Any]] = []
+    for part in parts:
+        sections.extend(part.get("sections", []))
+
+    return {
+        "page_type": parts[0].get("page_type", "static"),
+        "sections": sections,
+        "overall_complexity": max(part.get("overall_complexity", 0) for part in parts),
+    }
@@ -1,43 +1,104 @@
 """Component Classifier using embeddings"""
-from typing import List, Dict
-from openai import AsyncOpenAI
-import os
+import asyncio
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import structlog
+
+from ai.client import OpenAIClient, get_openai_client
+from ai.heuristics import ClassificationStats, HeuristicClassifier, Prediction
+from config.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Escalation counters across all classifier instances in this process
+classification_stats = ClassificationStats()
+
 
 class ComponentClassifier:
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
+    def __init__(self, client: Optional[OpenAIClient] = None):
+        self._client = client
+        self.heuristics = HeuristicClassifier(threshold=settings.ai_heuristic_threshold)
+
+    @property
+    def client(self) -> OpenAIClient:
+        # Resolved per use: the shared client is replaced after a lifespan restart
+        return self._client or get_openai_client()
+
     async def classify(self, sections: List[Dict]) -> List[Dict]:
         """Classify components and calculate similarity"""
-        
-        classified = []
-        for section in sections:
-            # Get embedding for semantic similarity
-            embedding = await self.get_embedding(section['html'])
-            
-            # Match against pattern library
-            pattern = await self.match_pattern(embedding)
-            
-            classified.append({
-                "type": section['type'],
-                "confidence": 0.85,  # Mock confidence
-                "html": section['html'],
-                "styles": {},
-                "complexity_score": section.get('complexity', 50),
-                "matched_pattern": pattern
-            })
-        
+        classified: List[Optional[Dict]] = [None] * len(sections)
+        async for index, component in self.classify_iter(sections):
+            classified[index] = component
         return classified
-    
+
+    async def classify_iter(self, sections: List[Dict]) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        Yield (index, component) pairs as soon as each section is classified
+
+        Sections the local heuristics are confident about skip the embedding
+        and pattern lookup and are yielded immediately; the rest are escalated
+        concurrently and yielded in completion order.
+        """
+        stats = ClassificationStats()
+        escalations = []
+
+        for index, section in enumerate(sections):
+            position = index / (len(sections) - 1) if len(sections) > 1 else 0.0
+            prediction = self.heuristics.predict(section['html'], position)
+            escalate = not self.heuristics.is_confident(prediction)
+            stats.record(escalate)
+
+            if escalate:
+                escalations.append(asyncio.ensure_future(self._escalate(index, section, prediction)))
+            else:
+                yield index, build_component(section, prediction.type, prediction.confidence, None)
+
+        try:
+            for escalation in asyncio.as_completed(escalations):
+                yield await escalation
+        finally:
+            for escalation in escalations:
+                escalation.cancel()
+
+        classification_stats.merge(stats)
+        logger.info(
+            "sections_classified",
+            sections=stats.total,
+            escalated=stats.escalated,
+            escalation_rate=stats.escalation_rate,
+            overall_escalation_rate=classification_stats.escalation_rate,
+        )
+
+    async def _escalate(self, index: int, section: Dict, prediction: Prediction) -> Tuple[int, Dict]:
+        # Get embedding for semantic similarity
+        embedding = await self.get_embedding(section['html'])
+
+        # Match against pattern library
+        pattern = await self.match_pattern(embedding)
+
+        component_type = section['type']
+        confidence = section.get('confidence', prediction.scores.get(component_type, 0.0))
+        return index, build_component(section, component_type, confidence, pattern)
+
     async def get_embedding(self, text: str) -> List[float]:
         """Get text embedding for similarity search"""
-        response = await self.client.embeddings.create(
+        response = await self.client.embedding(
             model="text-embedding-ada-002",
             input=text[:1000]  # Truncate
         )
         return response.data[0].embedding
-    
+
     async def match_pattern(self, embedding: List[float]) -> str:
         """Match to pattern library (mock implementation)"""
         # In production: Use vector database (Supabase pgvector)
         return "modern-hero"
+
+
+def build_component(section: Dict, component_type: str, confidence: float, pattern: Optional[str]) -> Dict:
+    return {
+        "type": component_type,
+        "confidence": confidence,
+        "html": section['html'],
+        "styles": {},
+        "complexity_score": section.get('complexity', 50),
+        "matched_pattern": pattern
+    }
@@ -0,0 +1,280 @@
+"""Shared, rate-limit-aware OpenAI client"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import openai
+import structlog
+from openai import AsyncOpenAI
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from tenacity.wait import wait_base
+
+from ai.token_budget import TokenCounter
+from config.settings import settings
+from lib.exceptions import ExternalServiceError
+
+logger = structlog.get_logger(__name__)
+
+# Completion size assumed for quota accounting when max_tokens is not set
+DEFAULT_COMPLETION_TOKENS = 1000
+
+# Per-message framing tokens added by the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenBucket:
+    """Client-side token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until `amount` is available, then take it"""
+        amount = min(amount, self.capacity)
+
+        # Waiters queue on the lock, so the bucket is drained in FIFO order
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._refill(now)
+
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= amount:
+                        self.tokens -= amount
+                        return
+                    wait = (amount - self.tokens) / self.rate
+
+                await asyncio.sleep(wait)
+
+    def refund(self, amount: float) -> None:
+        """Return unused quota, e.g. when a completion was shorter than estimated"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out quota for a while, e.g. after a 429 with Retry-After"""
+        self.blocked_until = max(self.blocked_until, self._clock() + seconds)
+
+    @property
+    def headroom(self) -> float:
+        """Fraction of the bucket currently available"""
+        now = self._clock()
+        if now < self.blocked_until:
+            return 0.0
+        self._refill(now)
+        return self.tokens / self.capacity
+
+
+class ModelLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one model"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    async def acquire(self, tokens: int) -> None:
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+    def pause(self, seconds: float) -> None:
+        self.requests.pause(seconds)
+        self.tokens.pause(seconds)
+
+    @property
+    def headroom(self) -> float:
+        return min(self.requests.headroom, self.tokens.headroom)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read the server's Retry-After hint from an OpenAI error, if any"""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code >= 500
+
+
+class wait_retry_after(wait_base):
+    """
+    Honor Retry-After when the server sends it, else fall back to jittered backoff
+
+    A 429 already paused the model's limiter for its Retry-After, and the
+    next attempt waits there along with every other caller, so it is
+    retried without sleeping here as well.
+    """
+
+    def __init__(self, fallback: wait_base):
+        self.fallback = fallback
+
+    def __call__(self, retry_state) -> float:
+        if retry_state.outcome is not None and retry_state.outcome.failed:
+            exc = retry_state.outcome.exception()
+            if isinstance(exc, openai.RateLimitError):
+                return 0.0
+            seconds = retry_after_seconds(exc)
+            if seconds is not None:
+                return seconds
+        return self.fallback(retry_state)
+
+
+class OpenAIClient:
+    """
+    App-scoped OpenAI client.
+
+    Shares one pooled keep-alive HTTP connection pool, meters every call
+    against per-model request and token buckets, caps the number of calls in
+    flight, and retries transient failures with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 16,
+        max_retries: int = 5,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 150_000,
+        model_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        timeout: float = 60.0,
+    ):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+                keepalive_expiry=30.0,
+            ),
+            timeout=timeout,
+        )
+        # Retries are handled here so they can respect the shared limiters
+        self.client = AsyncOpenAI(api_key=api_key, http_client=self.http_client, max_retries=0)
+
+        self.max_retries = max_retries
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_limits = model_limits or {}
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._counters: Dict[str, TokenCounter] = {}
+
+    def limiter(self, model: str) -> ModelLimiter:
+        if model not in self._limiters:
+            limits = self.model_limits.get(model, {})
+            self._limiters[model] = ModelLimiter(
+                limits.get("rpm", self.requests_per_minute),
+                limits.get("tpm", self.tokens_per_minute),
+            )
+        return self._limiters[model]
+
+    def counter(self, model: str) -> TokenCounter:
+        if model not in self._counters:
+            self._counters[model] = TokenCounter(model)
+        return self._counters[model]
+
+    async def chat_completion(self, model: str, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        """Rate-limited `chat.completions.create`"""
+        counter = self.counter(model)
+        estimate = sum(counter.count(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+        estimate += kwargs.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+
+        return await self._call(
+            model,
+            estimate,
+            self.client.chat.completions.create,
+            model=model,
+            messages=messages,
+            **kwargs,
+        )
+
+    async def embedding(self, model: str, input: str, **kwargs: Any) -> Any:
+        """Rate-limited `embeddings.create`"""
+        estimate = self.counter(model).count(input)
+        return await self._call(model, estimate, self.client.embeddings.create, model=model, input=input, **kwargs)
+
+    async def _call(self, model: str, estimate: int, create: Callable, **kwargs: Any) -> Any:
+        limiter = self.limiter(model)
+
+        retrying = AsyncRetrying(
+            retry=retry_if_exception(is_retryable),
+            wait=wait_retry_after(wait_random_exponential(multiplier=1, max=60)),
+            stop=stop_after_attempt(self.max_retries),
+            reraise=True,
+        )
+
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    await limiter.acquire(estimate)
+                    async with self._semaphore:
+                        try:
+                            response = await create(**kwargs)
+                        except openai.RateLimitError as e:
+                            # Hold back every caller of this model, not just this one
+                            limiter.pause(retry_after_seconds(e) or 1.0)
+                            logger.warning("openai_rate_limited", model=model, attempt=attempt.retry_state.attempt_number)
+                            raise
+        except openai.OpenAIError as e:
+            raise ExternalServiceError("OpenAI", str(e))
+
+        usage = getattr(response, "usage", None)
+        if usage is not None and usage.total_tokens < estimate:
+            limiter.tokens.refund(estimate - usage.total_tokens)
+
+        return response
+
+    async def close(self) -> None:
+        await self.http_client.aclose()
+
+
+_client: Optional[OpenAIClient] = None
+
+
+def get_openai_client() -> OpenAIClient:
+    """The process-wide OpenAI client, created on first use"""
+    global _client
+    if _client is None:
+        _client = OpenAIClient(
+            api_key=settings.openai_api_key,
+            max_concurrency=settings.openai_max_concurrency,
+            max_retries=settings.openai_max_retries,
+            requests_per_minute=settings.openai_requests_per_minute,
+            tokens_per_minute=settings.openai_tokens_per_minute,
+            model_limits=settings.openai_model_limits,
+        )
+    return _client
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
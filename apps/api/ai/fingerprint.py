@@ -0,0 +1,138 @@
+"""Structural page fingerprints for template-level deduplication"""
+import hashlib
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping
+
+import lxml.html
+from lxml.etree import ParserError
+
+FINGERPRINT_BITS = 64
+
+# Tag paths are shingled over this many ancestors
+SHINGLE_DEPTH = 4
+
+# Pages within this Hamming distance are treated as the same template
+DEFAULT_MAX_DISTANCE = 6
+
+# Elements whose structure says nothing about the page layout
+IGNORED_TAGS = {"script", "style", "noscript", "template", "meta", "link"}
+
+
+def tag_path_shingles(html: str, depth: int = SHINGLE_DEPTH) -> Counter:
+    """Count tag-path shingles of a document, ignoring all text content"""
+    try:
+        root = lxml.html.document_fromstring(html)
+    except (ParserError, ValueError):
+        return Counter()
+
+    shingles: Counter = Counter()
+    stack = [(root, (root.tag,))]
+
+    while stack:
+        element, path = stack.pop()
+        for child in element:
+            tag = child.tag
+            # Comments and processing instructions have non-string tags
+            if not isinstance(tag, str) or tag in IGNORED_TAGS:
+                continue
+            child_path = path[-(depth - 1):] + (tag,)
+            shingles[">".join(child_path)] += 1
+            stack.append((child, child_path))
+
+    return shingles
+
+
+def simhash(features: Mapping[str, float]) -> int:
+    """64-bit SimHash of weighted features"""
+    weights = [0.0] * FINGERPRINT_BITS
+
+    for feature, weight in features.items():
+        digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            if digest >> bit & 1:
+                weights[bit] += weight
+            else:
+                weights[bit] -= weight
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def page_fingerprint(html: str) -> int:
+    """Structural fingerprint of a page"""
+    # Log-weighting keeps long repeated lists from dominating the layout
+    shingles = tag_path_shingles(html)
+    return simhash({shingle: 1 + math.log(count) for shingle, count in shingles.items()})
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def template_confidence(distance: int) -> float:
+    """Confidence that two pages share a template, from 1.0 (identical) to 0.0 (unrelated)"""
+    # Unrelated fingerprints differ in half their bits on average
+    return max(0.0, 1 - distance / (FINGERPRINT_BITS / 2))
+
+
+@dataclass
+class TemplateCluster:
+    """Pages sharing one structural template"""
+    representative: str
+    fingerprint: int
+    members: Dict[str, float] = field(default_factory=dict)  # page key -> confidence
+
+
+def cluster_pages(
+    fingerprints: Mapping[str, int],
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+) -> List[TemplateCluster]:
+    """
+    Group pages into templates by fingerprint distance.
+
+    The first page of each template becomes its representative, and every
+    other page joins the nearest representative within max_distance. Sites
+    have few templates, so this stays linear in the number of pages.
+    """
+    clusters: List[TemplateCluster] = []
+
+    for key, fingerprint in fingerprints.items():
+        best = None
+        best_distance = max_distance + 1
+        for cluster in clusters:
+            distance = hamming_distance(fingerprint, cluster.fingerprint)
+            if distance < best_distance:
+                best, best_distance = cluster, distance
+
+        if best is None:
+            best = TemplateCluster(representative=key, fingerprint=fingerprint)
+            clusters.append(best)
+            best_distance = 0
+
+        best.members[key] = template_confidence(best_distance)
+
+    return clusters
+
+
+def propagate_results(
+    clusters: List[TemplateCluster],
+    results: Mapping[str, Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    """Copy each representative's result to every page of its template"""
+    propagated: Dict[str, Dict[str, Any]] = {}
+    for cluster in clusters:
+        result = results[cluster.representative]
+        for key, confidence in cluster.members.items():
+            propagated[key] = {
+                **result,
+                "template": {
+                    "representative": cluster.representative,
+                    "confidence": confidence,
+                },
+            }
+    return propagated
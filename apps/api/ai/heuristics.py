@@ -0,0 +1,267 @@
+"""Offline heuristic section classifier used as a fast path before the LLM"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+
+import lxml.html
+from lxml.etree import ParserError
+
+SECTION_TYPES = (
+    "header",
+    "navigation",
+    "hero",
+    "features",
+    "testimonials",
+    "pricing",
+    "cta",
+    "form",
+    "gallery",
+    "footer",
+    "content",
+)
+
+# Class and id tokens that hint at a section type
+KEYWORDS: Dict[str, FrozenSet[str]] = {
+    "header": frozenset({"header", "masthead", "topbar", "navbar"}),
+    "navigation": frozenset({"nav", "navigation", "menu", "menubar", "breadcrumb", "breadcrumbs"}),
+    "hero": frozenset({"hero", "jumbotron", "splash", "banner", "intro", "showcase"}),
+    "features": frozenset({"features", "feature", "benefits", "services", "highlights"}),
+    "testimonials": frozenset({"testimonial", "testimonials", "reviews", "review", "quotes"}),
+    "pricing": frozenset({"pricing", "plans", "plan", "price", "prices", "tier", "tiers"}),
+    "cta": frozenset({"cta", "signup", "subscribe", "action", "started"}),
+    "form": frozenset({"form", "contact", "newsletter", "login", "register"}),
+    "gallery": frozenset({"gallery", "carousel", "slider", "portfolio", "lightbox"}),
+    "footer": frozenset({"footer", "copyright", "colophon"}),
+    "content": frozenset({"content", "article", "post", "entry", "prose", "body"}),
+}
+
+# Tags counted as features of a section's subtree
+COUNTED_TAGS = frozenset({
+    "nav", "form", "input", "textarea", "select", "button", "img", "h1", "h2", "h3",
+    "li", "article", "blockquote", "a", "p", "figure",
+})
+
+_TOKEN_SPLIT = re.compile(r"[\s_\-]+")
+_CAMEL_SPLIT = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_CURRENCY = re.compile(r"[$€£¥]\s?\d")
+
+
+@dataclass
+class SectionFeatures:
+    """Cheap structural features of one page section"""
+    tag: str = ""
+    role: str = ""
+    tokens: FrozenSet[str] = frozenset()
+    position: float = 0.5  # 0.0 for the first section, 1.0 for the last
+    link_density: float = 0.0
+    text_length: int = 0
+    prices: int = 0
+    counts: Counter = field(default_factory=Counter)
+
+
+@dataclass
+class Prediction:
+    type: str
+    confidence: float
+    scores: Dict[str, float]
+
+
+def _tokens(value: str) -> set:
+    tokens = set()
+    for raw in _TOKEN_SPLIT.split(value):
+        if raw:
+            tokens.add(raw.lower())
+            tokens.update(part.lower() for part in _CAMEL_SPLIT.split(raw))
+    return tokens
+
+
+def extract_features(html: str, position: float = 0.5) -> SectionFeatures:
+    """Extract classifier features from a section's HTML"""
+    try:
+        root = lxml.html.fragment_fromstring(html, create_parent="div")
+    except (ParserError, ValueError):
+        return SectionFeatures(position=position)
+
+    # Unwrap the synthetic parent when the section has a single root element
+    children = [child for child in root if isinstance(child.tag, str)]
+    if len(children) == 1 and not (root.text or "").strip():
+        root = children[0]
+
+    tokens: set = set()
+    counts: Counter = Counter()
+    link_text = 0
+
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+        if tag in COUNTED_TAGS:
+            counts[tag] += 1
+        if tag == "a":
+            link_text += len(element.text_content().strip())
+        for attr in ("class", "id"):
+            value = element.get(attr)
+            if value:
+                tokens.update(_tokens(value))
+
+    text = root.text_content()
+    text_length = len(text.strip())
+
+    return SectionFeatures(
+        tag=root.tag if isinstance(root.tag, str) else "",
+        role=(root.get("role") or "").lower(),
+        tokens=frozenset(tokens),
+        position=position,
+        link_density=link_text / text_length if text_length else 0.0,
+        text_length=text_length,
+        prices=len(_CURRENCY.findall(text)),
+        counts=counts,
+    )
+
+
+def score_features(f: SectionFeatures) -> Dict[str, float]:
+    """Evidence for each section type, on a log-odds-like scale"""
+    scores = {section_type: 0.0 for section_type in SECTION_TYPES}
+
+    for section_type, keywords in KEYWORDS.items():
+        if f.tokens & keywords:
+            scores[section_type] += 2.0
+
+    if f.tag == "header" or f.role == "banner":
+        scores["header"] += 4.0
+    if f.counts["nav"] and f.position < 0.2:
+        scores["header"] += 1.0
+    if f.position < 0.1:
+        scores["header"] += 1.0
+
+    if f.tag == "nav" or f.role == "navigation":
+        scores["navigation"] += 4.0
+    if f.link_density > 0.6:
+        scores["navigation"] += 1.5
+
+    if f.tag == "footer" or f.role == "contentinfo":
+        scores["footer"] += 4.0
+    if f.position > 0.85:
+        scores["footer"] += 1.0
+        if f.link_density > 0.4:
+            scores["footer"] += 0.5
+
+    if f.counts["h1"]:
+        scores["hero"] += 1.5
+        if f.position < 0.3:
+            scores["hero"] += 0.5
+        if f.counts["button"] or f.counts["a"]:
+            scores["hero"] += 0.5
+
+    if f.counts["h3"] >= 3 or f.counts["article"] >= 3:
+        scores["features"] += 1.0
+    if f.counts["li"] >= 3 and f.link_density < 0.3:
+        scores["features"] += 0.5
+
+    if f.counts["blockquote"]:
+        scores["testimonials"] += 2.0
+
+    if f.prices >= 2:
+        scores["pricing"] += 2.0
+
+    if f.counts["button"] and 0 < f.text_length < 300 and not f.counts["input"]:
+        scores["cta"] += 1.0
+
+    if f.tag == "form" or f.counts["form"]:
+        scores["form"] += 2.0
+    if f.counts["input"] + f.counts["textarea"] + f.counts["select"] >= 2:
+        scores["form"] += 1.5
+
+    if f.counts["img"] + f.counts["figure"] >= 4:
+        scores["gallery"] += 1.5
+
+    if f.tag in ("article", "main") or f.role == "main":
+        scores["content"] += 2.0
+    if f.text_length > 1000 and f.link_density < 0.2:
+        scores["content"] += 1.0
+
+    return scores
+
+
+# Elements that usually become a component or need interactive behaviour
+LANDMARK_TAGS = frozenset({"header", "nav", "main", "section", "article", "aside", "footer", "form"})
+INTERACTIVE_TAGS = frozenset({"form", "input", "select", "textarea", "button", "iframe", "video", "canvas"})
+
+
+def predict_complexity(html: str) -> float:
+    """Predicted analysis difficulty of a document, from 0.0 (trivial) to 1.0"""
+    try:
+        root = lxml.html.fragment_fromstring(html, create_parent="div")
+    except (ParserError, ValueError):
+        return 0.0
+
+    elements = landmarks = interactive = 0
+    for element in root.iter():
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+        elements += 1
+        if tag in LANDMARK_TAGS:
+            landmarks += 1
+        if tag in INTERACTIVE_TAGS:
+            interactive += 1
+
+    # Saturating blend: ~30 sections, ~40 controls or ~3000 nodes is "hard"
+    return (
+        0.5 * min(1.0, landmarks / 30)
+        + 0.3 * min(1.0, interactive / 40)
+        + 0.2 * min(1.0, elements / 3000)
+    )
+
+
+class HeuristicClassifier:
+    """
+    Local feature-based section classifier.
+
+    Scores are turned into probabilities with a softmax, so sections with no
+    distinctive evidence get a near-uniform, low-confidence prediction and
+    should be escalated to the LLM classifier.
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+
+    def predict(self, html: str, position: float = 0.5) -> Prediction:
+        scores = score_features(extract_features(html, position))
+
+        peak = max(scores.values())
+        exp = {section_type: math.exp(score - peak) for section_type, score in scores.items()}
+        total = sum(exp.values())
+        probabilities = {section_type: value / total for section_type, value in exp.items()}
+
+        best = max(SECTION_TYPES, key=lambda section_type: probabilities[section_type])
+        return Prediction(type=best, confidence=probabilities[best], scores=probabilities)
+
+    def is_confident(self, prediction: Prediction) -> bool:
+        return prediction.confidence >= self.threshold
+
+
+@dataclass
+class ClassificationStats:
+    """Counts of sections resolved locally versus escalated to the LLM"""
+    total: int = 0
+    escalated: int = 0
+
+    @property
+    def fast_path(self) -> int:
+        return self.total - self.escalated
+
+    @property
+    def escalation_rate(self) -> Optional[float]:
+        return self.escalated / self.total if self.total else None
+
+    def record(self, escalated: bool) -> None:
+        self.total += 1
+        if escalated:
+            self.escalated += 1
+
+    def merge(self, other: "ClassificationStats") -> None:
+        self.total += other.total
+        self.escalated += other.escalated
@@ -0,0 +1,179 @@
+"""Latency- and cost-aware model routing for analysis calls"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import structlog
+
+from ai.client import OpenAIClient, get_openai_client
+from config.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Latency samples kept per tier for percentile estimates
+LATENCY_WINDOW = 500
+
+# Parses a response into (result, confidence); result None means unusable
+ResponseParser = Callable[[Any], Tuple[Optional[Any], Optional[float]]]
+
+
+@dataclass
+class ModelTier:
+    name: str
+    model: str
+    max_input_tokens: int  # larger requests go to a stronger tier
+    max_complexity: float  # harder documents go to a stronger tier
+
+
+@dataclass
+class TierStats:
+    """Usage and latency counters for one tier"""
+    calls: int = 0
+    failures: int = 0
+    escalations: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "escalations": self.escalations,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_p50": self.percentile(0.5),
+            "latency_p95": self.percentile(0.95),
+        }
+
+
+class ModelRouter:
+    """
+    Picks the cheapest model tier that can handle a request.
+
+    A tier is eligible when the request's input tokens and predicted
+    complexity are within its limits. If the chosen tier's rate-limit
+    headroom is exhausted, the next stronger tier with headroom is used
+    instead of queueing. Responses that fail to parse or come back below
+    `min_confidence` are retried on the next stronger tier.
+    """
+
+    def __init__(
+        self,
+        tiers: List[ModelTier],
+        client: Optional[OpenAIClient] = None,
+        min_confidence: float = 0.5,
+        min_headroom: float = 0.1,
+    ):
+        self.tiers = tiers
+        self._client = client
+        self.min_confidence = min_confidence
+        self.min_headroom = min_headroom
+        self.stats: Dict[str, TierStats] = {tier.name: TierStats() for tier in tiers}
+
+    @property
+    def client(self) -> OpenAIClient:
+        # Resolved per use: the shared client is replaced after a lifespan restart
+        return self._client or get_openai_client()
+
+    def route(self, input_tokens: int, complexity: float) -> List[ModelTier]:
+        """Tiers to try for a request, in order"""
+        start = len(self.tiers) - 1
+        for index, tier in enumerate(self.tiers):
+            if input_tokens <= tier.max_input_tokens and complexity <= tier.max_complexity:
+                start = index
+                break
+
+        candidates = self.tiers[start:]
+        for index, tier in enumerate(candidates):
+            if self.client.limiter(tier.model).headroom >= self.min_headroom:
+                return candidates[index:]
+        return candidates
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        input_tokens: int,
+        complexity: float,
+        parse: ResponseParser,
+        **kwargs: Any,
+    ) -> Optional[Any]:
+        """Run a chat completion on the routed tier, escalating when needed"""
+        result = None
+        tiers = self.route(input_tokens, complexity)
+
+        for position, tier in enumerate(tiers):
+            stats = self.stats[tier.name]
+            start = time.perf_counter()
+            try:
+                response = await self.client.chat_completion(model=tier.model, messages=messages, **kwargs)
+            except Exception:
+                stats.failures += 1
+                if position == len(tiers) - 1:
+                    raise
+                stats.escalations += 1
+                continue
+            finally:
+                stats.calls += 1
+                stats.latencies.append(time.perf_counter() - start)
+
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                stats.prompt_tokens += usage.prompt_tokens
+                stats.completion_tokens += usage.completion_tokens
+
+            result, confidence = parse(response)
+            if result is not None and (confidence is None or confidence >= self.min_confidence):
+                return result
+
+            if position < len(tiers) - 1:
+                stats.escalations += 1
+                logger.info(
+                    "model_escalated",
+                    tier=tier.name,
+                    model=tier.model,
+                    reason="invalid_response" if result is None else "low_confidence",
+                    confidence=confidence,
+                )
+
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            tier.name: {"model": tier.model, **self.stats[tier.name].snapshot()}
+            for tier in self.tiers
+        }
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """The process-wide model router, created on first use"""
+    global _router
+    if _router is None:
+        _router = ModelRouter(
+            tiers=[
+                ModelTier(
+                    name="fast",
+                    model=settings.ai_fast_model,
+                    max_input_tokens=settings.ai_fast_max_input_tokens,
+                    max_complexity=settings.ai_fast_max_complexity,
+                ),
+                ModelTier(
+                    name="strong",
+                    model=settings.ai_strong_model,
+                    max_input_tokens=settings.ai_max_tokens,
+                    max_complexity=1.0,
+                ),
+            ],
+            min_confidence=settings.ai_router_min_confidence,
+        )
+    return _router
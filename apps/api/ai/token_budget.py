@@ -0,0 +1,196 @@
+"""Token counting and budget-aware request packing for LLM calls"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+import tiktoken
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Preferred split points, tried in order: between tags, then at line breaks.
+_SPLIT_PATTERNS = (re.compile(r"(?<=>)"), re.compile(r"(?<=\n)"))
+
+
+class TokenCounter:
+    """Counts tokens with the tokenizer of the target model"""
+
+    def __init__(self, model: str = "gpt-4-turbo-preview", encoding: Optional[Any] = None):
+        self.model = model
+        self._encoding = encoding
+
+    @property
+    def encoding(self) -> Any:
+        # Loaded lazily: tiktoken fetches and caches the BPE ranks on first use
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        return self._encoding
+
+    def encode(self, text: str) -> List[int]:
+        return self.encoding.encode(text, disallowed_special=())
+
+    def decode(self, tokens: List[int]) -> str:
+        return self.encoding.decode(tokens)
+
+    def count(self, text: str) -> int:
+        """Exact token count of text"""
+        return len(self.encode(text))
+
+
+@dataclass
+class PackedItem:
+    """One source input, or one part of a split source, inside a batch"""
+    id: str  # positional, so it cannot collide with any source key
+    source: str
+    text: str
+    tokens: int
+    part: int = 0
+    parts: int = 1
+
+
+@dataclass
+class Batch:
+    """A group of items that fits into a single LLM request"""
+    items: List[PackedItem] = field(default_factory=list)
+    tokens: int = 0  # input
+    completion_tokens: int = 0  # reserved for the reply, `max_tokens` of the request
+
+
+class TokenBudgetPacker:
+    """
+    Packs many inputs into as few requests as the token budget allows.
+
+    Inputs larger than the per-request budget are split deterministically,
+    preferring tag and line boundaries. Every packed item carries a stable id
+    so responses can be mapped back to their source with `group_by_source`.
+    The budget covers the reply too: each item reserves `completion_tokens`
+    of output, so a batch's reply grows with the number of items in it.
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        max_tokens: int,
+        reserved_tokens: int = 0,
+        item_overhead: int = 16,
+        completion_tokens: int = 0,
+    ):
+        self.counter = counter
+        self.budget = max_tokens - reserved_tokens
+        self.item_overhead = item_overhead
+        self.completion_tokens = completion_tokens
+
+        if self.budget <= item_overhead + completion_tokens:
+            raise ValueError("Token budget is too small to hold any input")
+
+    @property
+    def item_budget(self) -> int:
+        """Largest item that fits in a request on its own"""
+        return self.budget - self.item_overhead - self.completion_tokens
+
+    def batch_of(self, item: PackedItem) -> Batch:
+        """A request holding a single item, e.g. to retry it on its own"""
+        return Batch(items=[item], tokens=item.tokens, completion_tokens=self.completion_tokens)
+
+    def split(self, text: str) -> List[str]:
+        """Split text into chunks that each fit within the item budget"""
+        if self.counter.count(text) <= self.item_budget:
+            return [text]
+        return self._split(text, 0)
+
+    def _split(self, text: str, level: int) -> List[str]:
+        if level >= len(_SPLIT_PATTERNS):
+            tokens = self.counter.encode(text)
+            return [
+                self.counter.decode(tokens[i:i + self.item_budget])
+                for i in range(0, len(tokens), self.item_budget)
+            ]
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for segment in _SPLIT_PATTERNS[level].split(text):
+            if not segment:
+                continue
+            segment_tokens = self.counter.count(segment)
+
+            if segment_tokens > self.item_budget:
+                if current:
+                    chunks.append("".join(current))
+                    current, current_tokens = [], 0
+                chunks.extend(self._split(segment, level + 1))
+                continue
+
+            # Token counts are not strictly additive across a join, so the
+            # running total is an estimate that is re-checked below
+            if current and current_tokens + segment_tokens > self.item_budget:
+                chunks.append("".join(current))
+                current, current_tokens = [], 0
+
+            current.append(segment)
+            current_tokens += segment_tokens
+
+        if current:
+            chunks.append("".join(current))
+
+        result: List[str] = []
+        for chunk in chunks:
+            if self.counter.count(chunk) > self.item_budget:
+                result.extend(self._split(chunk, level + 1))
+            else:
+                result.append(chunk)
+        return result
+
+    def pack(self, sources: Mapping[str, str]) -> List[Batch]:
+        """
+        Pack sources into batches using first-fit decreasing.
+
+        The result only depends on the input order and contents, so identical
+        inputs always produce identical batches.
+        """
+        items: List[PackedItem] = []
+        for source, text in sources.items():
+            chunks = self.split(text)
+            for part, chunk in enumerate(chunks):
+                items.append(PackedItem(
+                    id=str(len(items)),
+                    source=source,
+                    text=chunk,
+                    tokens=self.counter.count(chunk) + self.item_overhead,
+                    part=part,
+                    parts=len(chunks),
+                ))
+
+        batches: List[Batch] = []
+        cost = self.completion_tokens
+
+        for item in sorted(items, key=lambda i: (-i.tokens, int(i.id))):
+            for batch in batches:
+                if batch.tokens + batch.completion_tokens + item.tokens + cost <= self.budget:
+                    break
+            else:
+                batch = Batch()
+                batches.append(batch)
+            batch.items.append(item)
+            batch.tokens += item.tokens
+            batch.completion_tokens += cost
+
+        for batch in batches:
+            batch.items.sort(key=lambda i: int(i.id))
+        return batches
+
+
+def group_by_source(
+    batches: List[Batch],
+    results: Mapping[str, Any],
+) -> Dict[str, List[Any]]:
+    """Map per-item results back to their sources, with parts in order"""
+    grouped: Dict[str, List[Any]] = {}
+    for batch in batches:
+        for item in batch.items:
+            if item.id in results:
+                grouped.setdefault(item.source, [None] * item.parts)[item.part] = results[item.id]
+    return grouped
@@ -0,0 +1,98 @@
+"""
+Rows/sec for ingesting scraped pages and component patterns
+
+Compares the row-by-row ORM path (`db.add` in a loop) with `bulk_insert`.
+Every trial runs in a transaction that is rolled back, so it is safe to
+point at a development database:
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bulk_insert --rows 5000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from config.database import AsyncSessionLocal, bulk_insert, init_db
+from models.component_pattern import ComponentPattern
+from models.job import Job
+from models.project import Project
+from models.scraped_page import ScrapedPage
+from models.user import User
+
+
+def page_rows(job_id, count):
+    return [
+        {
+            "job_id": job_id,
+            "url": f"https://example.com/page/{i}",
+            "html_ref": f"{uuid.uuid4().hex}{uuid.uuid4().hex}.zst",
+            "html_size": 48_000,
+            "css_ref": f"{uuid.uuid4().hex}{uuid.uuid4().hex}.zst",
+            "css_size": 120_000,
+            "page_metadata": {"title": f"Page {i}", "links": [f"/page/{i + 1}"]},
+        }
+        for i in range(count)
+    ]
+
+
+def pattern_rows(count):
+    return [
+        {
+            "type": ("header", "hero", "footer", "card")[i % 4],
+            "html_sample": "<section><h1>Title</h1><p>Body copy</p></section>",
+            "css_sample": "section { padding: 2rem; }",
+            "embedding": "[" + ", ".join("0.125" for _ in range(64)) + "]",
+        }
+        for i in range(count)
+    ]
+
+
+async def create_job(db):
+    user = User(email=f"bench-{uuid.uuid4().hex}@example.com", password_hash="x")
+    db.add(user)
+    await db.flush()
+    project = Project(user_id=user.id, name="bench", url="https://example.com")
+    db.add(project)
+    await db.flush()
+    job = Job(project_id=project.id, type="scrape", status="completed")
+    db.add(job)
+    await db.flush()
+    return job.id
+
+
+async def orm_loop(db, model, rows):
+    for row in rows:
+        db.add(model(**row))
+    await db.flush()
+
+
+async def trial(name, model, make_rows, count, insert):
+    async with AsyncSessionLocal() as db:
+        try:
+            rows = make_rows(await create_job(db))
+            started = time.perf_counter()
+            await insert(db, model, rows)
+            elapsed = time.perf_counter() - started
+        finally:
+            await db.rollback()
+    print(f"{model.__tablename__:<20} {name:<12} {count:>8} rows {elapsed:8.3f}s {count / elapsed:12,.0f} rows/s")
+
+
+async def main(count, repeat):
+    await init_db()
+    cases = [
+        (ScrapedPage, lambda job_id: page_rows(job_id, count)),
+        (ComponentPattern, lambda job_id: pattern_rows(count)),
+    ]
+    for model, make_rows in cases:
+        for _ in range(repeat):
+            await trial("orm loop", model, make_rows, count, orm_loop)
+            await trial("bulk_insert", model, make_rows, count, bulk_insert)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
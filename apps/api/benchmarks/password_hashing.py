@@ -0,0 +1,72 @@
+"""
+Login throughput and event-loop latency under a burst of password checks
+
+Runs the same burst of bcrypt verifications inline (the old behaviour) and
+through `password_hasher`, while a probe task measures how late the event
+loop wakes it, which is the delay every other request and WebSocket sees:
+
+    python -m benchmarks.password_hashing --logins 32 --rounds 12
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+from lib import auth
+from lib.auth import PasswordHasher
+
+PROBE_INTERVAL = 0.005
+
+
+async def probe(lags, stop):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def inline_verify(password, hashed):
+    return auth.pwd_context.verify_and_update(password, hashed)
+
+
+async def run(name, verify, password, hashed, logins):
+    lags, stop = [], asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 2)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(verify(password, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+    assert all(valid for valid, _ in results)
+
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{name:<18} {logins / elapsed:8.1f} logins/s   "
+        f"loop lag p50 {statistics.median(lags) * 1000:7.1f} ms  "
+        f"p99 {p99 * 1000:7.1f} ms  max {lags[-1] * 1000:7.1f} ms"
+    )
+
+
+async def main(logins, rounds, workers):
+    auth.pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    password = "correct horse battery staple"
+    hashed = auth.pwd_context.hash(password)
+
+    hasher = PasswordHasher(max_workers=workers, max_waiting=logins)
+    await run("inline", inline_verify, password, hashed, logins)
+    await run(f"thread pool x{workers}", hasher.verify_and_update, password, hashed, logins)
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.rounds, args.workers))
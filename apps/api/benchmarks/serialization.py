@@ -0,0 +1,85 @@
+"""
+Encoding cost of the largest JSON payloads: stdlib path vs `lib.serialization`
+
+- generate: a /api/generator/generate body (generated files as pydantic
+  models), through FastAPI's default path (jsonable_encoder + json.dumps)
+  and as a FastJSONResponse returned from the handler
+- scrape:completed: a WebSocket event with per-page metadata, json.dumps
+  per recipient (before) vs dumps_text once (after)
+
+    python -m benchmarks.serialization --files 200 --pages 500
+"""
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from lib.serialization import FastJSONResponse, dumps_text, orjson
+from routers.generator import ComponentFile, GeneratedCode
+
+
+def generate_body(files):
+    component = "export function Hero() {\n  return <section className=\"py-24\">...</section>\n}\n" * 60
+    return {
+        "job_id": str(uuid.uuid4()),
+        "files": [
+            GeneratedCode(filename=f"Component{i}.tsx", content=component, type="component")
+            for i in range(files)
+        ],
+        "components": [ComponentFile(type="hero", filename=f"Component{i}.tsx") for i in range(files)],
+        "manifest": {"added": [f"Component{i}.tsx" for i in range(files)], "changed": [], "removed": []},
+        "total_files": files,
+        "cache_hits": 0,
+    }
+
+
+def scrape_event(pages):
+    return {
+        "type": "scrape:completed",
+        "job_id": str(uuid.uuid4()),
+        "project_id": str(uuid.uuid4()),
+        "result": {
+            "pages": [
+                {
+                    "id": str(uuid.uuid4()),
+                    "url": f"https://example.com/page/{i}",
+                    "scraped_at": datetime.utcnow().isoformat(),
+                    "metadata": {"title": f"Page {i}", "links": [f"/page/{j}" for j in range(20)]},
+                }
+                for i in range(pages)
+            ],
+        },
+    }
+
+
+def report(name, before, after, number):
+    before_ms, after_ms = before / number * 1000, after / number * 1000
+    print(f"{name:<28} before {before_ms:8.2f} ms   after {after_ms:8.2f} ms   {before_ms / after_ms:5.1f}x")
+
+
+def main(files, pages, recipients, number):
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib fallback'}")
+
+    body = generate_body(files)
+    before = timeit.timeit(lambda: JSONResponse(jsonable_encoder(body)), number=number)
+    after = timeit.timeit(lambda: FastJSONResponse(body), number=number)
+    report(f"generate ({files} files)", before, after, number)
+
+    event = scrape_event(pages)
+    before = timeit.timeit(lambda: [json.dumps(event) for _ in range(recipients)], number=number)
+    after = timeit.timeit(lambda: dumps_text(event), number=number)
+    report(f"scrape:completed x{recipients}", before, after, number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--recipients", type=int, default=10)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    main(args.files, args.pages, args.recipients, args.number)
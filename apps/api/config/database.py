@@ -1,10 +1,15 @@
 """Database configuration and session management"""
 import os
+from sqlalchemy import insert, inspect as sa_inspect
+from sqlalchemy.engine import Dialect
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, List, Sequence, Tuple
+import structlog
 
 from models.base import Base
 
+logger = structlog.get_logger(__name__)
+
 # Get database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -49,3 +54,100 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+# Below this many rows the ORM unit of work is cheap enough, and keeps events
+# and relationship handling; above it rows are streamed in batches
+BULK_INSERT_MIN_ROWS = 50
+BULK_INSERT_BATCH_SIZE = 5000
+
+
+def _has_python_default(column) -> bool:
+    default = column.default
+    return default is not None and (default.is_callable or default.is_scalar)
+
+
+def bulk_records(
+    model: type, rows: Sequence[Dict[str, Any]], dialect: Dialect
+) -> Tuple[List[str], List[tuple]]:
+    """
+    Column names and driver-ready tuples for inserting `rows` into `model`
+
+    Rows are keyed by mapped attribute name, as for the model constructor.
+    Python-side column defaults (UUID keys, timestamps) are applied here
+    since COPY bypasses them; values go through each column type's bind
+    processor, so e.g. JSONB arrives serialized the way the driver expects.
+    """
+    mapper_columns = sa_inspect(model).columns
+    unknown = {key for row in rows for key in row} - set(mapper_columns.keys())
+    if unknown:
+        raise TypeError(f"{model.__name__} has no columns {sorted(unknown)}")
+
+    keys = [
+        key for key, column in mapper_columns.items()
+        if any(key in row for row in rows)
+        or _has_python_default(column)
+    ]
+    columns = [mapper_columns[key] for key in keys]
+    processors = [column.type.bind_processor(dialect) for column in columns]
+
+    records = []
+    for row in rows:
+        record = []
+        for key, column, process in zip(keys, columns, processors):
+            if key in row:
+                value = row[key]
+            elif _has_python_default(column):
+                value = column.default.arg(None) if column.default.is_callable else column.default.arg
+            else:
+                value = None
+            record.append(process(value) if process and value is not None else value)
+        records.append(tuple(record))
+    return [column.name for column in columns], records
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model: type,
+    rows: Sequence[Dict[str, Any]],
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+) -> int:
+    """
+    Insert many rows of `model` within the session's transaction
+
+    Small writes go through the ORM. Larger ones use asyncpg's binary COPY
+    (`copy_records_to_table`), or a batched multi-row INSERT on other
+    drivers. The bulk paths skip ORM events and do not add the objects to
+    the session. Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    if len(rows) < BULK_INSERT_MIN_ROWS:
+        session.add_all(model(**row) for row in rows)
+        await session.flush()
+        return len(rows)
+
+    # Pending ORM writes must land first so foreign keys resolve
+    await session.flush()
+    connection = await session.connection()
+    table = model.__table__
+
+    if connection.dialect.driver != "asyncpg":
+        # ORM bulk INSERT: multi-row VALUES batches, Python defaults applied
+        for start in range(0, len(rows), batch_size):
+            await session.execute(insert(model), list(rows[start:start + batch_size]))
+        return len(rows)
+
+    # COPY runs on the raw driver connection; a statement through SQLAlchemy
+    # first opens the session's transaction so the copy commits or rolls back with it
+    await connection.exec_driver_sql("SELECT 1")
+    raw = await connection.get_raw_connection()
+    driver = raw.driver_connection
+
+    for start in range(0, len(rows), batch_size):
+        columns, records = bulk_records(model, rows[start:start + batch_size], connection.dialect)
+        await driver.copy_records_to_table(
+            table.name, schema_name=table.schema, columns=columns, records=records
+        )
+    logger.debug("bulk_insert", table=table.name, rows=len(rows))
+    return len(rows)
@@ -18,11 +18,21 @@ class Settings(BaseSettings):
 
     # OpenAI
     openai_api_key: str
+    openai_max_concurrency: int = 16
+    openai_max_retries: int = 5
+    openai_requests_per_minute: int = 500
+    openai_tokens_per_minute: int = 150_000
+    openai_model_limits: dict[str, dict[str, int]] = {}  # model -> {"rpm": ..., "tpm": ...}
 
     # JWT Authentication
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    auth_cache_ttl_seconds: int = 60  # how long a resolved user is trusted without a database read
+    auth_cache_max_entries: int = 10_000
+    bcrypt_rounds: int = 12  # existing hashes are upgraded on the next login when this changes
+    password_hash_workers: int = 4  # concurrent bcrypt operations
+    password_hash_max_waiting: int = 64  # queued beyond the workers before shedding with 429
 
     # CORS
     cors_origins: list[str] = ["http://localhost:3000"]
@@ -34,15 +44,59 @@ class Settings(BaseSettings):
     rate_limit_enabled: bool = True
     rate_limit_requests: int = 100
     rate_limit_period: int = 60  # seconds
+    rate_limit_backend: str = "memory"  # memory (per process), redis (shared via redis_url)
+    # Tighter budgets for expensive routes, on top of the default; "*" suffix matches a prefix
+    rate_limit_routes: dict[str, dict[str, int]] = {
+        "POST /api/scraper/start": {"requests": 5, "period": 60},
+        "POST /api/analyzer/analyze": {"requests": 20, "period": 60},
+        "POST /api/analyzer/analyze/stream": {"requests": 20, "period": 60},
+        "POST /api/generator/generate": {"requests": 30, "period": 60},
+        "POST /api/auth/login": {"requests": 10, "period": 60},
+    }
+
+    # Response compression and HTTP caching
+    compression_min_bytes: int = 1024
+    # First match wins; "*" matches any method or path prefix. GET bodies also get ETags,
+    # so "no-cache" responses revalidate with a 304 instead of a full download.
+    cache_control_policies: dict[str, str] = {
+        "* /api/auth/*": "no-store",
+        "GET /api/analyzer/models/stats": "no-store",
+        "GET /api/*": "private, no-cache",
+        "* /api/*": "no-store",
+    }
 
     # Scraping
     max_pages_limit: int = 100
     scrape_timeout: int = 300  # seconds
 
+    # Blob storage for page HTML, CSS and screenshots
+    blob_store_backend: str = "local"  # local, s3
+    blob_store_path: str = "./data/blobs"
+    blob_store_codec: str = "zstd"  # zstd, gzip (zstd falls back to gzip if unavailable)
+    s3_bucket: str | None = None
+    s3_prefix: str = "blobs/"
+    s3_endpoint_url: str | None = None  # e.g. a local MinIO
+    s3_region: str | None = None
+    s3_access_key_id: str | None = None
+    s3_secret_access_key: str | None = None
+
+    # CPU offload
+    cpu_pool_workers: int = 2
+    cpu_inline_threshold_bytes: int = 100_000  # smaller inputs are processed inline
+
     # AI
     ai_temperature: float = 0.1
-    ai_max_tokens: int = 4000
+    ai_max_tokens: int = 4000  # per request, prompt and reply
+    ai_completion_tokens_per_document: int = 600  # reply budget per packed document
     embedding_cache_ttl: int = 3600  # 1 hour
+    ai_fast_model: str = "gpt-3.5-turbo-1106"
+    ai_strong_model: str = "gpt-4-turbo-preview"
+    ai_fast_max_input_tokens: int = 2500  # larger requests go to the strong model
+    ai_fast_max_complexity: float = 0.3  # predicted complexity, 0-1
+    ai_router_min_confidence: float = 0.5  # retry on the strong model below this
+    ai_heuristic_threshold: float = 0.8  # below this, sections escalate to the LLM
+    analyzer_concurrency: int = 4  # concurrent analysis requests per job
+    analyzer_pages_per_request: int = 8  # pages offered to the token packer at once
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,125 @@
+"""Streaming, reproducible archives of generated projects"""
+import gzip
+import io
+import tarfile
+import zipfile
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple
+
+# Fixed timestamps keep archives byte-identical across runs, which is what
+# makes ETags and range requests over a regenerated stream valid
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+FILE_MODE = 0o644
+
+
+class _Sink:
+    """Write-only file object whose output is drained after each entry"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipArchiveWriter:
+    media_type = "application/zip"
+    extension = "zip"
+
+    def __init__(self):
+        self._sink = _Sink()
+        # An unseekable sink makes zipfile write data descriptors instead of seeking back
+        self._zip = zipfile.ZipFile(self._sink, "w", zipfile.ZIP_DEFLATED)
+
+    def add(self, path: str, data: bytes) -> bytes:
+        info = zipfile.ZipInfo(path, date_time=ZIP_EPOCH)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = FILE_MODE << 16
+        self._zip.writestr(info, data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._zip.close()
+        return self._sink.drain()
+
+
+class TarGzArchiveWriter:
+    media_type = "application/gzip"
+    extension = "tar.gz"
+
+    def __init__(self):
+        self._sink = _Sink()
+        # tarfile's own "w|gz" stamps the current time into the gzip header
+        self._gzip = gzip.GzipFile(filename="", fileobj=self._sink, mode="wb", mtime=0)
+        self._tar = tarfile.open(fileobj=self._gzip, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def add(self, path: str, data: bytes) -> bytes:
+        info = tarfile.TarInfo(path)
+        info.size = len(data)
+        info.mode = FILE_MODE
+        info.mtime = 0
+        self._tar.addfile(info, io.BytesIO(data))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._tar.close()
+        self._gzip.close()
+        return self._sink.drain()
+
+
+ARCHIVE_WRITERS = {
+    "zip": ZipArchiveWriter,
+    "tar.gz": TarGzArchiveWriter,
+}
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single `bytes=` range, or None to send everything
+
+    Raises ValueError when the range cannot be satisfied. Multi-range
+    requests are answered with the full body, which the spec allows.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start < 0 or start >= size or end < start:
+        raise ValueError(f"Range {header!r} not satisfiable for {size} bytes")
+    return start, min(end, size - 1)
+
+
+async def slice_chunks(chunks: AsyncIterable[bytes], start: int, end: int) -> AsyncIterator[bytes]:
+    """Bytes start..end (inclusive) of a chunked stream"""
+    offset = 0
+    async for chunk in chunks:
+        chunk_end = offset + len(chunk)
+        if chunk_end > start and offset <= end:
+            yield chunk[max(0, start - offset):end + 1 - offset]
+        offset = chunk_end
+        if offset > end:
+            break
@@ -0,0 +1,469 @@
+"""Per-component CSS pruning via an index of rules by rightmost selector"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Pseudo-classes that Tailwind expresses as variants, allowed on the subject only
+STATE_VARIANTS = {
+    "hover": "hover", "focus": "focus", "active": "active", "visited": "visited",
+    "focus-visible": "focus-visible", "focus-within": "focus-within",
+    "disabled": "disabled", "checked": "checked",
+}
+PSEUDO_ELEMENTS = {
+    "before": "before", "after": "after", "placeholder": "placeholder",
+    "selection": "selection", "marker": "marker",
+    "first-line": "first-line", "first-letter": "first-letter",
+}
+LEGACY_PSEUDO_ELEMENTS = frozenset({"before", "after", "first-line", "first-letter"})
+STRUCTURAL_PSEUDOS = frozenset({"first-child", "last-child", "only-child", "nth-child", "empty", "not"})
+
+# Ancestors that always exist in the page a component is placed in
+PAGE_CONTEXT_TAGS = frozenset({"html", "body"})
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_COMBINATOR = re.compile(r"\s*([>+~])\s*|\s+")
+_IDENT = r"-?[_a-zA-Z][_a-zA-Z0-9-]*"
+_SIMPLE = re.compile(
+    rf"(?P<universal>\*)|(?P<tag>{_IDENT})|#(?P<id>{_IDENT})|\.(?P<cls>{_IDENT})"
+    rf"|\[\s*(?P<attr>{_IDENT})\s*(?:(?P<op>[~|^$*]?=)\s*(?P<val>\"[^\"]*\"|'[^']*'|[^\]\s]+)\s*)?\]"
+    rf"|(?P<colons>::?)(?P<pseudo>{_IDENT})(?:\((?P<arg>[^()]*(?:\([^()]*\)[^()]*)*)\))?"
+)
+_NTH = re.compile(r"^\s*(?:(?P<odd>odd)|(?P<even>even)|(?P<a>[+-]?\d*)n\s*(?:(?P<sign>[+-])\s*(?P<b>\d+))?|(?P<only>[+-]?\d+))\s*$")
+
+
+@dataclass(frozen=True)
+class Compound:
+    tag: Optional[str] = None
+    id: Optional[str] = None
+    classes: Tuple[str, ...] = ()
+    attributes: Tuple[Tuple[str, str, str], ...] = ()  # (name, operator, value)
+    pseudos: Tuple[Tuple[str, object], ...] = ()  # structural (name, argument)
+
+
+@dataclass(frozen=True)
+class Selector:
+    compounds: Tuple[Compound, ...]  # left to right
+    combinators: Tuple[str, ...]  # between compounds: " ", ">", "+", "~"
+    specificity: Tuple[int, int, int]
+    variants: Tuple[str, ...]  # state pseudo-classes and pseudo-element of the subject
+
+    @property
+    def subject(self) -> Compound:
+        return self.compounds[-1]
+
+
+@dataclass(frozen=True)
+class Rule:
+    selector: Selector
+    declarations: Tuple[Tuple[str, str, bool], ...]  # (property, value, important)
+    conditions: Tuple[str, ...]  # enclosing @media / @supports preludes
+    order: int
+
+
+def _split_top_level(text: str, separator: str) -> List[str]:
+    """Split on separator outside parentheses, brackets and strings"""
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_nth(argument: str) -> Optional[Tuple[int, int]]:
+    match = _NTH.match(argument)
+    if not match:
+        return None
+    if match["odd"]:
+        return 2, 1
+    if match["even"]:
+        return 2, 0
+    if match["only"] is not None:
+        return 0, int(match["only"])
+    a = match["a"]
+    a = 1 if a in ("", "+") else -1 if a == "-" else int(a)
+    b = int(match["b"] or 0) * (-1 if match["sign"] == "-" else 1)
+    return a, b
+
+
+def parse_compound(text: str, subject: bool) -> Optional[Tuple[Compound, List[int], List[str]]]:
+    """(compound, specificity, variants), or None if it cannot be matched statically"""
+    tag, id_, classes, attributes, pseudos, variants = None, None, [], [], [], []
+    specificity = [0, 0, 0]
+    position = 0
+    while position < len(text):
+        match = _SIMPLE.match(text, position)
+        if not match or match.end() == position:
+            return None
+        position = match.end()
+
+        if match["universal"]:
+            continue
+        if match["tag"]:
+            if match.start() != 0:
+                return None  # a type selector must come first
+            tag = match["tag"].lower()
+            specificity[2] += 1
+        elif match["id"]:
+            id_ = match["id"]
+            specificity[0] += 1
+        elif match["cls"]:
+            classes.append(match["cls"])
+            specificity[1] += 1
+        elif match["attr"]:
+            value = match["val"] or ""
+            if value[:1] in "\"'":
+                value = value[1:-1]
+            attributes.append((match["attr"].lower(), match["op"] or "", value))
+            specificity[1] += 1
+        else:
+            name = match["pseudo"].lower()
+            # Legacy single-colon pseudo-elements are still pseudo-elements
+            if match["colons"] == "::" or name in LEGACY_PSEUDO_ELEMENTS:
+                if not subject or name not in PSEUDO_ELEMENTS or position != len(text):
+                    return None
+                variants.append(PSEUDO_ELEMENTS[name])
+                specificity[2] += 1
+            elif name in STATE_VARIANTS:
+                if not subject:
+                    return None
+                variants.append(STATE_VARIANTS[name])
+                specificity[1] += 1
+            elif name in STRUCTURAL_PSEUDOS:
+                if name == "nth-child":
+                    argument = _parse_nth(match["arg"] or "")
+                    if argument is None:
+                        return None
+                    pseudos.append((name, argument))
+                    specificity[1] += 1
+                elif name == "not":
+                    inner = parse_compound((match["arg"] or "").strip(), subject=False)
+                    if inner is None or not (match["arg"] or "").strip():
+                        return None
+                    pseudos.append((name, inner[0]))
+                    specificity = [s + t for s, t in zip(specificity, inner[1])]
+                else:
+                    pseudos.append((name, None))
+                    specificity[1] += 1
+            else:
+                return None
+
+    compound = Compound(tag, id_, tuple(classes), tuple(attributes), tuple(pseudos))
+    return compound, specificity, variants
+
+
+def _split_compounds(text: str) -> Tuple[List[str], List[str]]:
+    """Compound texts and the combinators between them, ignoring nested parentheses"""
+    compounds, combinators = [], []
+    depth, quote, start, index = 0, None, 0, 0
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth == 0 and (char.isspace() or char in ">+~"):
+            match = _COMBINATOR.match(text, index)
+            compounds.append(text[start:index])
+            combinators.append(match.group(1) or " ")
+            index = start = match.end()
+            continue
+        index += 1
+    compounds.append(text[start:])
+    return compounds, combinators
+
+
+def parse_selector(text: str) -> Optional[Selector]:
+    """A complex selector, or None if it is unsupported or depends on runtime state"""
+    text = text.strip()
+    if not text:
+        return None
+
+    compound_texts, combinators = _split_compounds(text)
+    if any(not part for part in compound_texts):
+        return None
+
+    compounds, specificity, variants = [], [0, 0, 0], []
+    for index, part in enumerate(compound_texts):
+        parsed = parse_compound(part, subject=index == len(compound_texts) - 1)
+        if parsed is None:
+            return None
+        compound, part_specificity, part_variants = parsed
+        compounds.append(compound)
+        specificity = [s + t for s, t in zip(specificity, part_specificity)]
+        variants.extend(part_variants)
+
+    return Selector(tuple(compounds), tuple(combinators), tuple(specificity), tuple(variants))
+
+
+def parse_declarations(body: str) -> Tuple[Tuple[str, str, bool], ...]:
+    declarations = []
+    for declaration in _split_top_level(body, ";"):
+        prop, sep, value = declaration.partition(":")
+        prop, value = prop.strip().lower(), value.strip()
+        if not sep or not prop or not value:
+            continue
+        important = value.lower().endswith("!important")
+        if important:
+            value = value[:-len("!important")].rstrip()
+        declarations.append((prop, value, important))
+    return tuple(declarations)
+
+
+def iter_blocks(css: str) -> Iterator[Tuple[str, str]]:
+    """Top-level (prelude, body) pairs; statement at-rules are skipped"""
+    position, length = 0, len(css)
+    while position < length:
+        brace = css.find("{", position)
+        semicolon = css.find(";", position)
+        if brace == -1:
+            return
+        if semicolon != -1 and semicolon < brace and css[position:semicolon].lstrip().startswith("@"):
+            position = semicolon + 1  # @import, @charset, ...
+            continue
+
+        depth, end, quote = 1, brace + 1, None
+        while end < length and depth:
+            char = css[end]
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in "\"'":
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+            end += 1
+        yield css[position:brace].strip(), css[brace + 1:end - 1]
+        position = end
+
+
+class StylesheetIndex:
+    """
+    A job's style rules, indexed by the rightmost compound of each selector.
+
+    Every selector is filed under one key of its subject: its id, else its
+    first class, else its tag, else the universal bucket. An element only
+    has to be checked against the rules filed under its own id, classes and
+    tag, so matching a component is roughly linear in its DOM size instead
+    of rules × nodes.
+    """
+
+    def __init__(self, stylesheets: Iterable[str] = ()):
+        self.by_id: Dict[str, List[Rule]] = {}
+        self.by_class: Dict[str, List[Rule]] = {}
+        self.by_tag: Dict[str, List[Rule]] = {}
+        self.universal: List[Rule] = []
+        self.rule_count = 0
+        self.skipped_selectors = 0
+        for css in stylesheets:
+            if css:
+                self._add_blocks(_COMMENT.sub("", css), ())
+
+    def _add_blocks(self, css: str, conditions: Tuple[str, ...]) -> None:
+        for prelude, body in iter_blocks(css):
+            if prelude.startswith("@"):
+                keyword = prelude.split(None, 1)[0].lower()
+                if keyword in ("@media", "@supports"):
+                    self._add_blocks(body, conditions + (" ".join(prelude.split()),))
+                # @font-face, @keyframes, @page, ... are not per-element styles
+                continue
+
+            declarations = parse_declarations(body)
+            if not declarations:
+                continue
+            for text in _split_top_level(prelude, ","):
+                selector = parse_selector(text)
+                if selector is None:
+                    self.skipped_selectors += 1
+                    continue
+                self._file(Rule(selector, declarations, conditions, self.rule_count))
+                self.rule_count += 1
+
+    def _file(self, rule: Rule) -> None:
+        subject = rule.selector.subject
+        if subject.id:
+            self.by_id.setdefault(subject.id, []).append(rule)
+        elif subject.classes:
+            self.by_class.setdefault(subject.classes[0], []).append(rule)
+        elif subject.tag:
+            self.by_tag.setdefault(subject.tag, []).append(rule)
+        else:
+            self.universal.append(rule)
+
+    def candidates(self, element) -> Iterator[Rule]:
+        element_id = element.get("id")
+        if element_id and element_id in self.by_id:
+            yield from self.by_id[element_id]
+        for cls in set(element.get("class", "").split()):
+            yield from self.by_class.get(cls, ())
+        yield from self.by_tag.get(element.tag, ())
+        yield from self.universal
+
+    def matching_rules(self, root) -> Dict[object, List[Rule]]:
+        """Rules applying to each element under root (root itself is the fragment wrapper)"""
+        matches = {}
+        for element in root.iterdescendants():
+            if not isinstance(element.tag, str):
+                continue
+            rules = [rule for rule in self.candidates(element) if selector_matches(rule.selector, element, root)]
+            if rules:
+                matches[element] = rules
+        return matches
+
+    def tailwind_classes(self, root) -> Dict[object, List[str]]:
+        """Winning declarations per element as Tailwind arbitrary-property classes"""
+        return {
+            element: cascade_to_classes(rules)
+            for element, rules in self.matching_rules(root).items()
+        }
+
+
+def _siblings(element) -> List:
+    parent = element.getparent()
+    if parent is None:
+        return [element]
+    return [child for child in parent if isinstance(child.tag, str)]
+
+
+def _attribute_matches(actual: Optional[str], operator: str, expected: str) -> bool:
+    if actual is None:
+        return False
+    if operator == "":
+        return True
+    if operator == "=":
+        return actual == expected
+    if operator == "~=":
+        return expected in actual.split()
+    if operator == "|=":
+        return actual == expected or actual.startswith(expected + "-")
+    if operator == "^=":
+        return bool(expected) and actual.startswith(expected)
+    if operator == "$=":
+        return bool(expected) and actual.endswith(expected)
+    return bool(expected) and expected in actual  # *=
+
+
+def compound_matches(compound: Compound, element) -> bool:
+    if compound.tag and element.tag != compound.tag:
+        return False
+    if compound.id and element.get("id") != compound.id:
+        return False
+    if compound.classes and not set(compound.classes) <= set(element.get("class", "").split()):
+        return False
+    for name, operator, value in compound.attributes:
+        if not _attribute_matches(element.get(name), operator, value):
+            return False
+
+    for name, argument in compound.pseudos:
+        if name == "not":
+            if compound_matches(argument, element):
+                return False
+            continue
+        if name == "empty":
+            if len(element) or (element.text or ""):
+                return False
+            continue
+        siblings = _siblings(element)
+        position = siblings.index(element) + 1
+        if name == "first-child" and position != 1:
+            return False
+        if name == "last-child" and position != len(siblings):
+            return False
+        if name == "only-child" and len(siblings) != 1:
+            return False
+        if name == "nth-child":
+            a, b = argument
+            if a == 0:
+                if position != b:
+                    return False
+            elif (position - b) % a or (position - b) // a < 0:
+                return False
+    return True
+
+
+def selector_matches(selector: Selector, element, root, index: Optional[int] = None) -> bool:
+    """Right-to-left match of selector.compounds[:index + 1] ending at element"""
+    if index is None:
+        index = len(selector.compounds) - 1
+    if not compound_matches(selector.compounds[index], element):
+        return False
+    if index == 0:
+        return True
+
+    combinator = selector.combinators[index - 1]
+    if combinator in (" ", ">"):
+        parent = element.getparent()
+        while parent is not None and parent is not root:
+            if selector_matches(selector, parent, root, index - 1):
+                return True
+            if combinator == ">":
+                return False
+            parent = parent.getparent()
+        # Past the component root: only page-level ancestors can still match
+        return combinator == " " and all(
+            compound == Compound(tag=compound.tag) and compound.tag in PAGE_CONTEXT_TAGS
+            for compound in selector.compounds[:index]
+        ) and all(c == " " for c in selector.combinators[:index - 1])
+
+    siblings = _siblings(element)
+    before = siblings[:siblings.index(element)]
+    if combinator == "+":
+        return bool(before) and selector_matches(selector, before[-1], root, index - 1)
+    return any(selector_matches(selector, sibling, root, index - 1) for sibling in before)
+
+
+def _variant(condition: str) -> str:
+    normalized = re.sub(r"\s*([:,()])\s*", r"\1", condition)
+    return "[" + normalized.replace(" ", "_") + "]"
+
+
+def _arbitrary_value(value: str) -> Optional[str]:
+    if any(char in value for char in "[]\n"):
+        return None
+    return value.replace("_", "\\_").replace(" ", "_")
+
+
+def cascade_to_classes(rules: List[Rule]) -> List[str]:
+    """
+    Resolve the cascade for one element and emit the winners as classes
+
+    For each (variants, property), the declaration with the highest
+    (importance, specificity, source order) wins, as in the browser.
+    """
+    winners: Dict[Tuple[Tuple[str, ...], str], Tuple[Tuple, str, bool]] = {}
+    for rule in rules:
+        variants = tuple(_variant(condition) for condition in rule.conditions) + rule.selector.variants
+        for prop, value, important in rule.declarations:
+            rank = (important, rule.selector.specificity, rule.order)
+            key = (variants, prop)
+            if key not in winners or rank > winners[key][0]:
+                winners[key] = (rank, value, important)
+
+    classes = []
+    seen: Set[str] = set()
+    for (variants, prop), (_, value, important) in winners.items():
+        escaped = _arbitrary_value(value)
+        if escaped is None:
+            continue
+        cls = "".join(f"{variant}:" for variant in variants) + ("!" if important else "") + f"[{prop}:{escaped}]"
+        if cls not in seen:
+            seen.add(cls)
+            classes.append(cls)
+    return classes
@@ -0,0 +1,327 @@
+"""Design-token extraction for the generated Tailwind config"""
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Tailwind's default scales, used to name the snapped values (px)
+FONT_SIZE_SCALE = {
+    "xs": 12, "sm": 14, "base": 16, "lg": 18, "xl": 20, "2xl": 24, "3xl": 30,
+    "4xl": 36, "5xl": 48, "6xl": 60, "7xl": 72, "8xl": 96, "9xl": 128,
+}
+RADIUS_SCALE = {"sm": 2, "DEFAULT": 4, "md": 6, "lg": 8, "xl": 12, "2xl": 16, "3xl": 24}
+
+# Reference L* of Tailwind's gray steps, for naming achromatic clusters
+NEUTRAL_LIGHTNESS = {
+    "50": 98, "100": 96, "200": 90, "300": 83, "400": 64, "500": 45,
+    "600": 32, "700": 25, "800": 15, "900": 9, "950": 4,
+}
+BRAND_NAMES = ("primary", "secondary", "accent")
+
+# Used when a job has no colors at all
+FALLBACK_COLORS = {"primary": "#0070f3", "secondary": "#7928ca"}
+
+MAX_COLORS = 8
+MAX_SPACING_STEPS = 16
+ACHROMATIC_CHROMA = 15.0  # Lab chroma below which a color reads as (tinted) gray
+MERGE_DISTANCE = 10.0  # Lab distance below which two clusters are the same color
+ROOT_FONT_SIZE = 16.0
+
+_DECLARATION_VALUE = re.compile(r":\s*([^;{}]+)")
+_HEX = re.compile(r"#([0-9a-fA-F]{8}|[0-9a-fA-F]{6}|[0-9a-fA-F]{3,4})(?![0-9a-zA-Z_-])")
+_COLOR_FUNCTION = re.compile(
+    r"\b(rgba?|hsla?)\(\s*(-?[\d.]+)(?:deg)?(%?)[\s,]+(-?[\d.]+)(%?)[\s,]+(-?[\d.]+)(%?)"
+)
+_FONT_SIZE = re.compile(r"font-size\s*:\s*([\d.]+)(px|rem|em)\b")
+_SPACING = re.compile(r"(?<![\w-])(?:margin|padding|gap|row-gap|column-gap)(?:-[a-z-]+)?\s*:\s*([^;{}]+)")
+_RADIUS = re.compile(r"border(?:-[a-z]+)*-radius\s*:\s*([^;{}]+)")
+_LENGTH = re.compile(r"(-?[\d.]+)(px|rem)\b")
+_INLINE_STYLE = re.compile(r"""style\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+
+# Hex digit value per ASCII code point
+_NIBBLE = np.zeros(128, dtype=np.int64)
+for _digit in "0123456789abcdef":
+    _NIBBLE[ord(_digit)] = _NIBBLE[ord(_digit.upper())] = int(_digit, 16)
+
+_SRGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65 = np.array([0.95047, 1.0, 1.08883])
+
+
+def parse_hex_colors(hexes: List[str]) -> np.ndarray:
+    """(n, 4) RGBA in 0..255 for hex digits in any of the 3/4/6/8-digit forms"""
+    if not hexes:
+        return np.empty((0, 4))
+    digits = np.array(hexes, dtype="U8")
+    lengths = np.char.str_len(digits)
+    nibbles = _NIBBLE[digits.view(np.uint32).reshape(len(digits), 8)]
+
+    rgba = np.full((len(digits), 4), 255.0)
+    short = lengths <= 4
+    rgba[short, :3] = nibbles[short, :3] * 17
+    rgba[~short, :3] = nibbles[~short][:, [0, 2, 4]] * 16 + nibbles[~short][:, [1, 3, 5]]
+    rgba[lengths == 4, 3] = nibbles[lengths == 4, 3] * 17
+    rgba[lengths == 8, 3] = nibbles[lengths == 8, 6] * 16 + nibbles[lengths == 8, 7]
+    return rgba
+
+
+def parse_color_functions(matches: List[Tuple[str, ...]]) -> np.ndarray:
+    """(n, 3) RGB in 0..255 for rgb()/hsl() matches of _COLOR_FUNCTION"""
+    if not matches:
+        return np.empty((0, 3))
+    fields = np.array(matches)
+    names = fields[:, 0]
+    values = fields[:, [1, 3, 5]].astype(float)
+    percent = fields[:, [2, 4, 6]] == "%"
+
+    rgb = np.where(percent, values * 2.55, values)
+
+    # hsl() to rgb, with saturation and lightness given as percentages
+    hsl = np.char.startswith(names, "hsl")
+    if hsl.any():
+        h = (values[hsl, 0] % 360)[:, None]
+        s = values[hsl, 1:2] / 100
+        lightness = values[hsl, 2:3] / 100
+        k = (np.array([0, 8, 4]) + h / 30) % 12
+        a = s * np.minimum(lightness, 1 - lightness)
+        rgb[hsl] = 255 * (lightness - a * np.clip(np.minimum(k - 3, 9 - k), -1, 1))
+
+    return np.clip(rgb, 0, 255)
+
+
+def srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """CIE Lab (D65) for (n, 3) sRGB values in 0..255"""
+    c = rgb / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _SRGB_TO_XYZ.T / _D65
+    delta = 6 / 29
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4 / 29)
+    return np.stack([
+        116 * f[:, 1] - 16,
+        500 * (f[:, 0] - f[:, 1]),
+        200 * (f[:, 1] - f[:, 2]),
+    ], axis=1)
+
+
+def _nearest(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """Index of the nearest center per point; ||c||^2 - 2p.c ranks like the full distance"""
+    return ((centers ** 2).sum(1)[None] - 2 * points @ centers.T).argmin(1)
+
+
+def weighted_kmeans(
+    points: np.ndarray,
+    weights: np.ndarray,
+    k: int,
+    iterations: int = 50,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(centers, labels) of weighted k-means with k-means++ seeding"""
+    rng = np.random.default_rng(seed)
+    centers = [points[np.argmax(weights)]]
+    for _ in range(1, k):
+        d2 = ((points[:, None, :] - np.array(centers)[None]) ** 2).sum(-1).min(1)
+        p = weights * d2
+        if p.sum() == 0:
+            break
+        centers.append(points[rng.choice(len(points), p=p / p.sum())])
+    centers = np.array(centers)
+
+    for _ in range(iterations):
+        labels = _nearest(points, centers)
+        mass = np.bincount(labels, weights, minlength=len(centers))
+        sums = np.stack([
+            np.bincount(labels, weights * points[:, dim], minlength=len(centers))
+            for dim in range(points.shape[1])
+        ], axis=1)
+        # Empty clusters keep their previous center
+        updated = np.where(mass[:, None] > 0, sums / np.maximum(mass, 1e-12)[:, None], centers)
+        shift = np.abs(updated - centers).max()
+        centers = updated
+        if shift < 1e-3:
+            break
+
+    return centers, _nearest(points, centers)
+
+
+def merge_close_clusters(centers: np.ndarray, labels: np.ndarray, mass: np.ndarray) -> np.ndarray:
+    """Fold clusters into heavier ones less than MERGE_DISTANCE away"""
+    distances = np.sqrt(((centers[:, None, :] - centers[None]) ** 2).sum(-1))
+    target = np.arange(len(centers))
+    for cluster in np.argsort(-mass, kind="stable"):
+        if target[cluster] != cluster:
+            continue
+        close = (distances[cluster] < MERGE_DISTANCE) & (target == np.arange(len(centers)))
+        close[cluster] = False
+        target[close & (mass <= mass[cluster])] = cluster
+    return target[labels]
+
+
+def _dominant(keys: np.ndarray, values: np.ndarray, weights: np.ndarray) -> Dict[int, float]:
+    """Heaviest value per key"""
+    pairs, inverse = np.unique(np.stack([keys, values], axis=1), axis=0, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights, minlength=len(pairs))
+    order = np.lexsort((-totals, pairs[:, 0]))
+    _, first = np.unique(pairs[order, 0], return_index=True)
+    return {int(key): float(value) for key, value in pairs[order][first]}
+
+
+def _lengths_px(text: str) -> np.ndarray:
+    """Absolute px values of every px/rem length in text"""
+    matches = _LENGTH.findall(text)
+    if not matches:
+        return np.empty(0)
+    fields = np.array(matches)
+    values = np.abs(fields[:, 0].astype(float))
+    return np.where(fields[:, 1] == "rem", values * ROOT_FONT_SIZE, values)
+
+
+def _rem(px: float) -> str:
+    return f"{px / ROOT_FONT_SIZE:g}rem"
+
+
+def palette(text: str, max_colors: int = MAX_COLORS) -> Dict[str, Any]:
+    """Named palette from the colors used in CSS declaration values"""
+    values = "\n".join(_DECLARATION_VALUE.findall(text))
+    hex_rgba = parse_hex_colors(_HEX.findall(values))
+    rgb = np.concatenate([hex_rgba[hex_rgba[:, 3] > 0, :3], parse_color_functions(_COLOR_FUNCTION.findall(values))])
+    if not len(rgb):
+        return {}
+
+    # Cluster distinct colors, weighted by how often they are used
+    colors, counts = np.unique(np.round(rgb).astype(np.int64), axis=0, return_counts=True)
+    lab = srgb_to_lab(colors.astype(float))
+    centers, labels = weighted_kmeans(lab, counts.astype(float), min(max_colors, len(colors)))
+    labels = merge_close_clusters(centers, labels, np.bincount(labels, counts, minlength=len(centers)))
+
+    # Each cluster is represented by its most used real color
+    order = np.lexsort((-counts, labels))
+    cluster_ids, first = np.unique(labels[order], return_index=True)
+    representatives = order[first]
+    mass = np.bincount(labels, counts)[cluster_ids]
+
+    named: Dict[str, Any] = {}
+    neutral: Dict[str, str] = {}
+    brand = 0
+    for index in representatives[np.argsort(-mass, kind="stable")]:
+        hex_value = "#" + "".join(f"{int(channel):02x}" for channel in colors[index])
+        lightness, a, b = lab[index]
+        if np.hypot(a, b) < ACHROMATIC_CHROMA:
+            step = min(NEUTRAL_LIGHTNESS, key=lambda name: abs(NEUTRAL_LIGHTNESS[name] - lightness))
+            neutral.setdefault(step, hex_value)
+        else:
+            name = BRAND_NAMES[brand] if brand < len(BRAND_NAMES) else f"brand-{brand + 1}"
+            named[name] = hex_value
+            brand += 1
+
+    if neutral:
+        named["neutral"] = dict(sorted(neutral.items(), key=lambda item: int(item[0])))
+    return named
+
+
+def font_sizes(text: str) -> Dict[str, str]:
+    """Font sizes snapped to the nearest step of the type scale"""
+    matches = _FONT_SIZE.findall(text)
+    if not matches:
+        return {}
+    fields = np.array(matches)
+    px = fields[:, 0].astype(float)
+    px = np.where(fields[:, 1] == "px", px, px * ROOT_FONT_SIZE)
+    px = px[px > 0]
+    if not len(px):
+        return {}
+
+    names = list(FONT_SIZE_SCALE)
+    scale = np.array(list(FONT_SIZE_SCALE.values()), dtype=float)
+    # Type scales are geometric, so compare ratios rather than differences
+    steps = np.abs(np.log(px[:, None]) - np.log(scale[None])).argmin(1)
+    snapped = np.round(px / 2) * 2  # 0.125rem grid
+
+    dominant = _dominant(steps, snapped, np.ones(len(px)))
+    return {names[step]: _rem(value) for step, value in sorted(dominant.items())}
+
+
+def spacing(text: str, max_steps: int = MAX_SPACING_STEPS) -> Dict[str, str]:
+    """Most used spacing values, snapped to the 4px grid (2px below 8px)"""
+    px = _lengths_px("\n".join(_SPACING.findall(text)))
+    snapped = np.where(px < 8, np.round(px / 2) * 2, np.round(px / 4) * 4)
+    snapped = snapped[(snapped > 0) & (snapped <= 384)]
+    if not len(snapped):
+        return {}
+
+    values, counts = np.unique(snapped, return_counts=True)
+    kept = np.sort(values[np.argsort(-counts, kind="stable")[:max_steps]])
+    return {f"{value / 4:g}": _rem(value) for value in kept}
+
+
+def border_radii(text: str) -> Dict[str, str]:
+    """Border radii snapped to the nearest step of the radius scale"""
+    px = _lengths_px("\n".join(_RADIUS.findall(text)))
+    # Pill shapes are expressed with huge radii and map to rounded-full
+    px = px[(px > 0) & (px < 100)]
+    if not len(px):
+        return {}
+
+    names = list(RADIUS_SCALE)
+    scale = np.array(list(RADIUS_SCALE.values()), dtype=float)
+    steps = np.abs(px[:, None] - scale[None]).argmin(1)
+
+    dominant = _dominant(steps, np.round(px), np.ones(len(px)))
+    return {names[step]: _rem(value) for step, value in sorted(dominant.items())}
+
+
+def extract_design_tokens(stylesheets: Iterable[str]) -> Dict[str, Any]:
+    """Tailwind `theme.extend` entries for the colors, type, spacing and radii in use"""
+    text = "\n".join(sheet.lower() for sheet in stylesheets if sheet)
+    tokens = {
+        "colors": palette(text) or dict(FALLBACK_COLORS),
+        "fontSize": font_sizes(text),
+        "spacing": spacing(text),
+        "borderRadius": border_radii(text),
+    }
+    return {key: value for key, value in tokens.items() if value}
+
+
+def component_styles(components: List[Dict]) -> List[str]:
+    """Declarations from components' computed styles and inline style attributes"""
+    sheets = []
+    for comp in components:
+        styles = comp.get('styles') or {}
+        if styles:
+            sheets.append("{" + "".join(f"{prop}: {value};" for prop, value in styles.items()) + "}")
+        for double, single in _INLINE_STYLE.findall(comp.get('html') or ""):
+            sheets.append("{" + (double or single) + "}")
+    return sheets
+
+
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+
+
+def _ts_value(value: Any, depth: int) -> str:
+    if not isinstance(value, dict):
+        return f"'{value}'"
+    indent = "  " * (depth + 1)
+    entries = [
+        f"{indent}{key if _IDENTIFIER.fullmatch(key) else repr(key)}: {_ts_value(item, depth + 1)},"
+        for key, item in value.items()
+    ]
+    return "{\n" + "\n".join(entries) + "\n" + "  " * depth + "}"
+
+
+def generate_tailwind_config(components: List[Dict], stylesheets: Iterable[str] = ()) -> str:
+    """Generate Tailwind config with extracted design tokens"""
+    tokens = extract_design_tokens([*stylesheets, *component_styles(components)])
+    return f'''import type {{ Config }} from 'tailwindcss'
+
+const config: Config = {{
+  content: ['./src/**/*.{{ts,tsx}}'],
+  theme: {{
+    extend: {_ts_value(tokens, 2)},
+  }},
+  plugins: [],
+}}
+
+export default config
+'''
@@ -0,0 +1,352 @@
+"""HTML to React JSX compiler"""
+import json
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import lxml.html
+from lxml.etree import ParserError
+
+from generators.css_pruner import StylesheetIndex, _split_top_level
+
+# Bump when output changes, so memoized components are regenerated
+GENERATOR_VERSION = "3"
+
+INDENT = "  "
+
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+# Dropped entirely: behaviour and global styles are not carried into components
+DROPPED_TAGS = frozenset({"script", "style", "noscript", "template", "link", "meta", "base"})
+
+ATTRIBUTE_NAMES = {
+    "class": "className",
+    "for": "htmlFor",
+    "tabindex": "tabIndex",
+    "readonly": "readOnly",
+    "maxlength": "maxLength",
+    "minlength": "minLength",
+    "colspan": "colSpan",
+    "rowspan": "rowSpan",
+    "cellpadding": "cellPadding",
+    "cellspacing": "cellSpacing",
+    "contenteditable": "contentEditable",
+    "crossorigin": "crossOrigin",
+    "autocomplete": "autoComplete",
+    "autofocus": "autoFocus",
+    "autoplay": "autoPlay",
+    "enctype": "encType",
+    "formaction": "formAction",
+    "srcset": "srcSet",
+    "srcdoc": "srcDoc",
+    "usemap": "useMap",
+    "novalidate": "noValidate",
+    "datetime": "dateTime",
+    "accept-charset": "acceptCharset",
+    "http-equiv": "httpEquiv",
+    "frameborder": "frameBorder",
+    "allowfullscreen": "allowFullScreen",
+    "inputmode": "inputMode",
+    "playsinline": "playsInline",
+    "referrerpolicy": "referrerPolicy",
+    "spellcheck": "spellCheck",
+    "itemprop": "itemProp",
+    "itemscope": "itemScope",
+    "itemtype": "itemType",
+    # SVG attributes are lowercased by the HTML parser
+    "viewbox": "viewBox",
+    "preserveaspectratio": "preserveAspectRatio",
+    "xlink:href": "xlinkHref",
+    "xml:space": "xmlSpace",
+    "xml:lang": "xmlLang",
+}
+
+# Vue and Alpine directives; their `:`/`@` shorthands fail the name check
+FRAMEWORK_DIRECTIVE_PREFIXES = ("v-", "x-")
+
+BOOLEAN_ATTRIBUTES = frozenset({
+    "allowFullScreen", "async", "autoFocus", "autoPlay", "checked", "controls",
+    "default", "defer", "disabled", "hidden", "itemScope", "loop", "multiple",
+    "muted", "noValidate", "open", "playsInline", "readOnly", "required",
+    "reversed", "selected",
+})
+
+# Uncontrolled equivalents, so generated forms stay editable without state
+UNCONTROLLED_ATTRIBUTES = {"value": "defaultValue", "checked": "defaultChecked"}
+
+# SVG tags are lowercased by the HTML parser
+SVG_TAGS = {
+    "lineargradient": "linearGradient",
+    "radialgradient": "radialGradient",
+    "clippath": "clipPath",
+    "foreignobject": "foreignObject",
+    "textpath": "textPath",
+}
+
+TEXT_INPUT_TYPES = frozenset({"", "text", "email", "password", "search", "number", "tel", "url", "date"})
+
+SHADCN_TABLE = {
+    "table": "Table",
+    "thead": "TableHeader",
+    "tbody": "TableBody",
+    "tfoot": "TableFooter",
+    "tr": "TableRow",
+    "th": "TableHead",
+    "td": "TableCell",
+    "caption": "TableCaption",
+}
+
+# HTML whitespace only: non-breaking spaces are content
+_WHITESPACE = re.compile(r"[ \t\n\r\f]+")
+_CLASS_SPLIT = re.compile(r"[\s_\-]+")
+# JSX decodes entities in text and attribute strings, so `&` is never literal
+_JSX_UNSAFE = re.compile(r"[{}<>&\xa0]")
+_ATTRIBUTE_UNSAFE = re.compile(r'["\\\n&\xa0]')
+_JSX_ATTRIBUTE_NAME = re.compile(r"[A-Za-z_$][\w$-]*\Z")
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("-")
+    return head + "".join(part[:1].upper() + part[1:] for part in rest)
+
+
+def _class_tokens(element) -> Set[str]:
+    return {token.lower() for token in _CLASS_SPLIT.split(element.get("class", "")) if token}
+
+
+def style_to_object(style: str) -> str:
+    """Convert an inline style string to a JSX style object literal"""
+    entries = []
+    for declaration in _split_top_level(style, ";"):
+        prop, sep, value = declaration.partition(":")
+        prop, value = prop.strip(), value.strip()
+        if not sep or not prop or not value:
+            continue
+        key = json.dumps(prop) if prop.startswith("--") else _camel(prop.lower())
+        entries.append(f"{key}: {json.dumps(value)}")
+    return "{ " + ", ".join(entries) + " }" if entries else "{}"
+
+
+class JSXCompiler:
+    """
+    Compiles an HTML fragment into JSX for one component.
+
+    Attributes are mapped to their React names, inline styles become objects,
+    void and empty elements self-close, and when targeting ShadCN, common
+    widgets are swapped for their UI components. Only the imports that the
+    output actually uses are collected. With a stylesheet index, the rules
+    that apply to each element are added to it as Tailwind classes.
+    """
+
+    def __init__(self, ui_library: str = "shadcn", stylesheet: Optional[StylesheetIndex] = None):
+        self.ui_library = ui_library
+        self.stylesheet = stylesheet
+        self.imports: Dict[str, Set[str]] = {}
+        self.style_classes: Dict[object, List[str]] = {}
+
+    def _use(self, module: str, name: str) -> str:
+        self.imports.setdefault(module, set()).add(name)
+        return name
+
+    def widget(self, element) -> Tuple[Optional[str], Optional[str]]:
+        """(component name, wrapper component) replacing an element, if any"""
+        if self.ui_library != "shadcn":
+            return None, None
+
+        tag = element.tag
+        classes = _class_tokens(element)
+
+        if tag == "button":
+            return self._use("@/components/ui/button", "Button"), None
+        if tag == "a" and classes & {"btn", "button"}:
+            return None, self._use("@/components/ui/button", "Button")
+        if tag == "input":
+            input_type = (element.get("type") or "").lower()
+            if input_type == "checkbox":
+                return self._use("@/components/ui/checkbox", "Checkbox"), None
+            if input_type in TEXT_INPUT_TYPES:
+                return self._use("@/components/ui/input", "Input"), None
+        if tag == "textarea":
+            return self._use("@/components/ui/textarea", "Textarea"), None
+        if tag == "label":
+            return self._use("@/components/ui/label", "Label"), None
+        if tag == "hr":
+            return self._use("@/components/ui/separator", "Separator"), None
+        if tag in SHADCN_TABLE:
+            return self._use("@/components/ui/table", SHADCN_TABLE[tag]), None
+        if tag in ("div", "article") and "card" in classes:
+            return self._use("@/components/ui/card", "Card"), None
+        if tag == "span" and "badge" in classes:
+            return self._use("@/components/ui/badge", "Badge"), None
+        return None, None
+
+    def attributes(self, element, component: Optional[str]) -> List[str]:
+        rendered = []
+        style_classes = self.style_classes.get(element, [])
+        attributes = dict(element.attrib)
+        # React has no textarea children; the content is its initial value
+        if element.tag == "textarea" and element.text:
+            attributes["value"] = element.text.removeprefix("\n")
+        if style_classes:
+            attributes["class"] = " ".join([attributes.get("class", ""), *style_classes]).strip()
+
+        for name, value in attributes.items():
+            name = name.lower()
+            # Inline event handlers are not valid React props
+            if name.startswith("on") or name.startswith(FRAMEWORK_DIRECTIVE_PREFIXES):
+                continue
+
+            if name == "style":
+                rendered.append(f"style={{{style_to_object(value)}}}")
+                continue
+
+            if name.startswith(("data-", "aria-")):
+                prop = name
+            elif name in ATTRIBUTE_NAMES:
+                prop = ATTRIBUTE_NAMES[name]
+            elif "-" in name:
+                prop = _camel(name)
+            else:
+                prop = name
+            # Namespaced and framework-specific names (`:class`, `@click`) are not JSX
+            if not _JSX_ATTRIBUTE_NAME.match(prop):
+                continue
+
+            if element.tag in ("input", "textarea", "select") and prop in UNCONTROLLED_ATTRIBUTES:
+                prop = UNCONTROLLED_ATTRIBUTES[prop]
+
+            if prop in BOOLEAN_ATTRIBUTES or prop == "defaultChecked":
+                if value.lower() in ("", name, "true"):
+                    rendered.append(prop)
+                continue
+
+            # The checkbox widget has no type prop
+            if component == "Checkbox" and prop == "type":
+                continue
+
+            if _ATTRIBUTE_UNSAFE.search(value):
+                rendered.append(f"{prop}={{{json.dumps(value)}}}")
+            else:
+                rendered.append(f'{prop}="{value}"')
+        return rendered
+
+    def text(self, value: Optional[str], after_element: bool = False, before_element: bool = False) -> Optional[str]:
+        """JSX for a text node; spaces next to inline elements are kept explicitly"""
+        if not value:
+            return None
+        collapsed = _WHITESPACE.sub(" ", value)
+        stripped = collapsed.strip(" ")
+        if not stripped:
+            return None
+
+        text = "{" + json.dumps(stripped) + "}" if _JSX_UNSAFE.search(stripped) else stripped
+        if after_element and collapsed.startswith(" "):
+            text = '{" "}' + text
+        if before_element and collapsed.endswith(" "):
+            text = text + '{" "}'
+        return text
+
+    def element(self, element, depth: int) -> List[str]:
+        indent = INDENT * depth
+        tag = element.tag
+
+        component, wrapper = self.widget(element)
+        name = component or SVG_TAGS.get(tag, tag)
+        attrs = self.attributes(element, component)
+        open_tag = f"<{name}{' ' + ' '.join(attrs) if attrs else ''}"
+
+        children = [] if tag == "textarea" else self.children(element, depth + 1)
+        if tag in VOID_TAGS or not children:
+            lines = [f"{indent}{open_tag} />"]
+        elif len(children) == 1 and len(children[0].strip()) + len(open_tag) < 80 and not children[0].lstrip().startswith("<"):
+            lines = [f"{indent}{open_tag}>{children[0].strip()}</{name}>"]
+        else:
+            lines = [f"{indent}{open_tag}>", *children, f"{indent}</{name}>"]
+
+        if wrapper:
+            inner = [INDENT + line for line in lines]
+            return [f"{indent}<{wrapper} asChild>", *inner, f"{indent}</{wrapper}>"]
+        return lines
+
+    def children(self, element, depth: int) -> List[str]:
+        lines = []
+        indent = INDENT * depth
+        kept = [isinstance(child.tag, str) and child.tag not in DROPPED_TAGS for child in element]
+        # Kept elements still to come, so a tail knows whether one follows it
+        remaining = sum(kept)
+
+        text = self.text(element.text, before_element=remaining > 0)
+        if text:
+            lines.append(indent + text)
+
+        for child, is_kept in zip(element, kept):
+            if is_kept:
+                lines.extend(self.element(child, depth))
+                remaining -= 1
+            text = self.text(child.tail, after_element=is_kept, before_element=is_kept and remaining > 0)
+            if text:
+                lines.append(indent + text)
+        return lines
+
+    def compile(self, html: str, depth: int = 0) -> Optional[str]:
+        """JSX for an HTML fragment, or None when it has no content"""
+        try:
+            root = lxml.html.fragment_fromstring(html, create_parent="div")
+        except (ParserError, ValueError):
+            return None
+
+        if self.stylesheet is not None:
+            self.style_classes = self.stylesheet.tailwind_classes(root)
+
+        lines = self.children(root, depth + 1)
+        if not lines:
+            return None
+
+        top_level = [child for child in root if isinstance(child.tag, str) and child.tag not in DROPPED_TAGS]
+        if len(top_level) == 1 and not self.text(root.text) and not self.text(top_level[0].tail):
+            return "\n".join(line[len(INDENT):] for line in lines)
+
+        indent = INDENT * depth
+        return "\n".join([f"{indent}<>", *lines, f"{indent}</>"])
+
+    def render_imports(self) -> str:
+        return "\n".join(
+            f'import {{ {", ".join(sorted(names))} }} from "{module}"'
+            for module, names in sorted(self.imports.items())
+        )
+
+
+def component_name(component_type: str) -> str:
+    """PascalCase component name for a component type"""
+    name = "".join(part.capitalize() for part in re.split(r"[^0-9a-zA-Z]+", component_type) if part)
+    if not name or name[0].isdigit():
+        name = "Section" + name
+    return name
+
+
+def generate_react_component(
+    component: Dict,
+    ui_library: str,
+    stylesheet: Optional[StylesheetIndex] = None,
+) -> str:
+    """Convert HTML component to React with ShadCN UI"""
+    comp_type = component['type']
+    compiler = JSXCompiler(ui_library, stylesheet)
+    body = compiler.compile(component.get('html') or "", depth=2)
+
+    if body is None:
+        body = f'''    <section className="py-12 px-4">
+      {{/* Generated from: {comp_type} */}}
+    </section>'''
+
+    imports = compiler.render_imports()
+    header = f"{imports}\n\n" if imports else ""
+
+    return f'''{header}export default function {component_name(comp_type)}() {{
+  return (
+{body}
+  )
+}}
+'''
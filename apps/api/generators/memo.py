@@ -0,0 +1,76 @@
+"""Content-addressed keys and shared filenames for generated components"""
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, List
+
+from generators.jsx import GENERATOR_VERSION, component_name
+
+_BETWEEN_TAGS = re.compile(r">\s+<")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_html(html: str) -> str:
+    """Collapse whitespace the JSX compiler ignores anyway"""
+    return _WHITESPACE.sub(" ", _BETWEEN_TAGS.sub("><", html)).strip()
+
+
+def component_hash(component: Dict, target_framework: str, ui_library: str, stylesheet: str = "") -> str:
+    """Key under which a component's generated code is stored; stylesheet is a digest of the job's CSS"""
+    key = {
+        "type": component['type'],
+        "html": normalize_html(component.get('html') or ""),
+        "styles": component.get('styles') or {},
+        "target_framework": target_framework,
+        "ui_library": ui_library,
+        "stylesheet": stylesheet,
+        "generator_version": GENERATOR_VERSION,
+    }
+    payload = json.dumps(key, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def unique_components(components: List[Dict], hashes: List[str]) -> Dict[str, Dict]:
+    """First component for each hash, in order of appearance"""
+    unique: Dict[str, Dict] = {}
+    for component, digest in zip(components, hashes):
+        unique.setdefault(digest, component)
+    return unique
+
+
+def assign_filenames(unique: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    One file per distinct component
+
+    Variants of the same type are numbered in order of appearance (Header.tsx,
+    Header2.tsx), so a shared header gets the same file on every page.
+    """
+    used = set()
+    filenames = {}
+    for digest, component in unique.items():
+        name = component_name(component['type'])
+        filename, n = f"{name}.tsx", 1
+        while filename in used:
+            n += 1
+            filename = f"{name}{n}.tsx"
+        used.add(filename)
+        filenames[digest] = filename
+    return filenames
+
+
+def config_hash(component_hashes: Iterable[str], target_framework: str) -> str:
+    """Key for project-wide files, which depend on every component"""
+    digest = hashlib.sha256(f"{target_framework}\0{GENERATOR_VERSION}".encode())
+    for component in sorted(set(component_hashes)):
+        digest.update(b"\0" + component.encode())
+    return digest.hexdigest()
+
+
+def diff_manifest(previous: Dict[str, str], current: Dict[str, str]) -> Dict[str, List[str]]:
+    """Added, changed, removed and unchanged filenames between two {filename: hash} states"""
+    return {
+        "added": sorted(name for name in current if name not in previous),
+        "changed": sorted(name for name in current if name in previous and previous[name] != current[name]),
+        "removed": sorted(name for name in previous if name not in current),
+        "unchanged": sorted(name for name in current if previous.get(name) == current[name]),
+    }
@@ -1,35 +1,100 @@
 """Authentication and authorization utilities"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Set, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import event, select
 
 from models.user import User
 from config.database import get_db
 from config.settings import settings
-from lib.exceptions import AuthenticationError
+from lib.exceptions import AuthenticationError, RateLimitError
+
+T = TypeVar("T")
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 # Bearer token scheme
 security = HTTPBearer()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
+    """Verify a password against a hash (blocking; handlers use `password_hasher`)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
+    """Hash a password (blocking; handlers use `password_hasher`)"""
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """
+    bcrypt off the event loop, on a bounded thread pool
+
+    bcrypt releases the GIL, so threads hash in parallel without blocking
+    other requests. At most `max_workers` hashes run at once and up to
+    `max_waiting` more queue for a slot; beyond that sign-ins are shed with
+    RateLimitError rather than queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_waiting: int):
+        self.max_workers = max_workers
+        self.max_waiting = max_waiting
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="password-hash")
+            self._slots = asyncio.Semaphore(self.max_workers)
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise RateLimitError("Too many sign-in attempts in progress, please retry")
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Whether the password matches, and a replacement hash if its cost settings are outdated"""
+        return await self.run(pwd_context.verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._slots = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_waiting=settings.password_hash_max_waiting,
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -39,7 +104,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
 
-    to_encode.update({"exp": expire})
+    # A token ID lets the principal cache key on this token specifically
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
     return encoded_jwt
@@ -54,11 +120,116 @@ def decode_token(token: str) -> dict:
         raise AuthenticationError(f"Invalid token: {str(e)}")
 
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user, as seen by route handlers
+
+    Carries the columns handlers read (`id` for ownership checks, profile
+    fields for /me) and is detached from any session, so it can be cached
+    across requests. Load the `User` row when a handler needs to modify it.
+    """
+    id: uuid.UUID
+    email: str
+    name: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, name=user.name, created_at=user.created_at)
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache of principals by token ID
+
+    Entries expire after `ttl` seconds or when their token does, whichever
+    is sooner, and `invalidate_user` drops every entry for a user at once.
+    The cache is per process, so the TTL bounds how long another worker can
+    serve a stale principal after a change.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._by_user: Dict[uuid.UUID, Set[str]] = {}
+        # User events fire from whichever thread flushes the session
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token_id: str, user_id: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token_id)
+            if entry is not None:
+                principal, expires_at = entry
+                if expires_at > time.monotonic() and str(principal.id) == user_id:
+                    self._entries.move_to_end(token_id)
+                    self.hits += 1
+                    return principal
+                self._remove(token_id)
+            self.misses += 1
+            return None
+
+    def put(self, token_id: str, principal: Principal, token_expires_at: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, time.monotonic() + token_expires_at - time.time())
+        with self._lock:
+            self._remove(token_id)
+            self._entries[token_id] = (principal, expires_at)
+            self._by_user.setdefault(principal.id, set()).add(token_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            for token_id in list(self._by_user.get(user_id, ())):
+                self._remove(token_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token_id: str) -> None:
+        entry = self._entries.pop(token_id, None)
+        if entry is not None:
+            token_ids = self._by_user.get(entry[0].id)
+            if token_ids is not None:
+                token_ids.discard(token_id)
+                if not token_ids:
+                    del self._by_user[entry[0].id]
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.auth_cache_ttl_seconds,
+    max_entries=settings.auth_cache_max_entries,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, user: User) -> None:
+    # ORM flushes only; bulk UPDATE/DELETE statements on users must call
+    # principal_cache.invalidate_user themselves
+    principal_cache.invalidate_user(user.id)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token"""
+) -> Principal:
+    """
+    Get the current authenticated user from JWT token
+
+    Tokens are verified on every request; the user lookup behind them is
+    served from `principal_cache` when the token has been seen recently.
+    """
     token = credentials.credentials
 
     try:
@@ -71,6 +242,12 @@ async def get_current_user(
     except JWTError:
         raise AuthenticationError("Could not validate credentials")
 
+    # Tokens issued before token IDs existed are cached under their signature
+    token_id = payload.get("jti") or token.rsplit(".", 1)[-1]
+    principal = principal_cache.get(token_id, user_id)
+    if principal is not None:
+        return principal
+
     # Get user from database
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -78,12 +255,14 @@ async def get_current_user(
     if user is None:
         raise AuthenticationError("User not found")
 
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(token_id, principal, payload.get("exp"))
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get the current active user (can add active status check here)"""
     return current_user
 
@@ -92,7 +271,7 @@ async def get_current_active_user(
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: AsyncSession = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[Principal]:
     """Get current user if authenticated, None otherwise"""
     if not credentials:
         return None
@@ -0,0 +1,274 @@
+"""Content-addressed, compressed storage for large page payloads"""
+import asyncio
+import gzip
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+
+from config.settings import settings
+
+try:
+    import zstandard
+except ImportError:  # Optional: payloads fall back to gzip
+    zstandard = None
+
+logger = structlog.get_logger(__name__)
+
+CODEC_EXTENSIONS = {"zstd": "zst", "gzip": "gz"}
+EXTENSION_CODECS = {extension: codec for codec, extension in CODEC_EXTENSIONS.items()}
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    key: str  # "<sha256 of the raw bytes>.<codec extension>"
+    size: int  # uncompressed bytes
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(data: bytes, key: str) -> bytes:
+    extension = key.rsplit(".", 1)[-1]
+    if extension not in EXTENSION_CODECS:
+        raise ValueError(f"Blob {key} has no known codec extension ({', '.join(EXTENSION_CODECS)})")
+    codec = EXTENSION_CODECS[extension]
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"Blob {key} is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class BlobStore(ABC):
+    """
+    Compressed, content-addressed blob storage.
+
+    Blobs are keyed by the SHA-256 of their uncompressed bytes, so identical
+    payloads (the same CSS on every page, unchanged re-scrapes) are stored
+    once and writing an existing blob is a no-op. Backends implement blocking
+    `_read`/`_write`/`_exists`/`_delete`, which run in worker threads.
+    """
+
+    def __init__(self, codec: str = "zstd"):
+        if codec == "zstd" and zstandard is None:
+            codec = "gzip"
+        self.codec = codec
+
+    @staticmethod
+    def path(key: str) -> str:
+        # Sharded so no directory or listing prefix grows unbounded
+        return f"{key[:2]}/{key[2:4]}/{key}"
+
+    async def put(self, data: bytes) -> BlobRef:
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest}.{CODEC_EXTENSIONS[self.codec]}"
+        if not await asyncio.to_thread(self._exists, key):
+            payload = await asyncio.to_thread(compress, data, self.codec)
+            await asyncio.to_thread(self._write, key, payload)
+        return BlobRef(key=key, size=len(data))
+
+    async def put_text(self, text: Optional[str]) -> Optional[BlobRef]:
+        if text is None:
+            return None
+        return await self.put(text.encode())
+
+    async def get(self, key: str) -> bytes:
+        payload = await asyncio.to_thread(self._read, key)
+        return await asyncio.to_thread(decompress, payload, key)
+
+    async def get_text(self, key: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        # Rows not yet backfilled have no key, only their legacy inline text
+        if key is None:
+            return default
+        return (await self.get(key)).decode()
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    @abstractmethod
+    def _read(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def _write(self, key: str, payload: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def _delete(self, key: str) -> None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a root directory"""
+
+    def __init__(self, root: str, codec: str = "zstd"):
+        super().__init__(codec)
+        self.root = Path(root)
+
+    def _file(self, key: str) -> Path:
+        return self.root / self.path(key)
+
+    def _read(self, key: str) -> bytes:
+        return self._file(key).read_bytes()
+
+    def _write(self, key: str, payload: bytes) -> None:
+        target = self._file(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(payload)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _exists(self, key: str) -> bool:
+        return self._file(key).exists()
+
+    def _delete(self, key: str) -> None:
+        self._file(key).unlink(missing_ok=True)
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects in an S3-compatible bucket (AWS S3, MinIO, R2, ...)"""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        codec: str = "zstd",
+        client: Any = None,
+        **client_options: Any,
+    ):
+        super().__init__(codec)
+        if client is None:
+            import boto3
+
+            client = boto3.client("s3", **client_options)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + self.path(key)
+
+    def _read(self, key: str) -> bytes:
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        return response["Body"].read()
+
+    def _write(self, key: str, payload: bytes) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=payload,
+            ContentType="application/octet-stream",
+        )
+
+    def _exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def _delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+
+class BlobHandle:
+    """A row's reference to a blob, read on first use"""
+
+    def __init__(self, key: Optional[str], size: Optional[int], legacy: Optional[str] = None):
+        self.key = key
+        self.legacy = legacy
+        self._data: Optional[bytes] = None
+        if key is None and legacy is not None:
+            # Not backfilled yet: the payload is still inline on the row
+            self._data = legacy.encode()
+            size = len(self._data)
+        self.size = size
+
+    async def read(self) -> Optional[bytes]:
+        if self._data is None and self.key is not None:
+            self._data = await get_blob_store().get(self.key)
+        return self._data
+
+    async def text(self) -> Optional[str]:
+        data = await self.read()
+        return None if data is None else data.decode()
+
+
+class LazyBlob:
+    """
+    Model attribute exposing a `<name>_ref` / `<name>_size` column pair as a
+    blob that is only fetched when read: `await page.html.text()`
+
+    Until `scripts.backfill_page_blobs` has run, rows may only have the
+    payload in a legacy inline column, named by `legacy_attribute`.
+    """
+
+    def __init__(self, ref_attribute: str, size_attribute: str, legacy_attribute: Optional[str] = None):
+        self.ref_attribute = ref_attribute
+        self.size_attribute = size_attribute
+        self.legacy_attribute = legacy_attribute
+
+    def __set_name__(self, owner, name):
+        self.cache_attribute = f"_{name}_blob"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        key = getattr(instance, self.ref_attribute)
+        legacy = getattr(instance, self.legacy_attribute) if self.legacy_attribute else None
+        handle = instance.__dict__.get(self.cache_attribute)
+        if handle is None or handle.key != key or handle.legacy is not legacy:
+            handle = BlobHandle(key, getattr(instance, self.size_attribute), legacy)
+            instance.__dict__[self.cache_attribute] = handle
+        return handle
+
+
+def blob_columns(name: str, ref: Optional[BlobRef]) -> Dict[str, Any]:
+    """Keyword arguments setting a model's `<name>_ref` and `<name>_size` columns"""
+    return {f"{name}_ref": ref.key if ref else None, f"{name}_size": ref.size if ref else None}
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """The process-wide blob store, created on first use"""
+    global _store
+    if _store is None:
+        if settings.blob_store_backend == "s3":
+            _store = S3BlobStore(
+                bucket=settings.s3_bucket,
+                prefix=settings.s3_prefix,
+                codec=settings.blob_store_codec,
+                endpoint_url=settings.s3_endpoint_url,
+                region_name=settings.s3_region,
+                aws_access_key_id=settings.s3_access_key_id,
+                aws_secret_access_key=settings.s3_secret_access_key,
+            )
+        else:
+            _store = LocalBlobStore(settings.blob_store_path, codec=settings.blob_store_codec)
+        logger.info("blob_store_ready", backend=settings.blob_store_backend, codec=_store.codec)
+    return _store
@@ -0,0 +1,118 @@
+"""Process pool for CPU-bound work that would otherwise block the event loop"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Chunks per worker for batched maps, so uneven chunks still balance out
+CHUNKS_PER_WORKER = 4
+
+
+def _apply_each(fn: Callable[[Any], T], items: List[Any]) -> List[T]:
+    return [fn(item) for item in items]
+
+
+class CPUExecutor:
+    """
+    Size-aware dispatcher for CPU-heavy steps (parsing, fingerprinting, codegen).
+
+    Inputs below `inline_threshold` bytes run inline, where the pickling and
+    IPC round-trip would cost more than the work itself. Larger inputs go to
+    a process pool so the event loop keeps serving requests and WebSockets.
+    Before `start()` is called everything runs inline.
+    """
+
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.max_workers = 0
+        self.inline_threshold = 0
+        self.pending = 0
+        self.peak_pending = 0
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+
+    def start(self, max_workers: int, inline_threshold: int) -> None:
+        if self._pool is not None:
+            return
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        # Forking a process that runs an event loop and threads is unsafe
+        self._pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable[..., T], *args: Any, size: int = 0) -> T:
+        """Run fn(*args), offloading to the pool when size warrants it"""
+        if self._pool is None or size < self.inline_threshold:
+            self.inline_calls += 1
+            return fn(*args)
+
+        self.offloaded_calls += 1
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, partial(fn, *args))
+        finally:
+            self.pending -= 1
+
+    async def map(self, fn: Callable[[Any], T], items: Iterable[Any], size: Callable[[Any], int] = len) -> List[T]:
+        """Apply fn to every item concurrently, preserving order"""
+        return list(await asyncio.gather(*(self.run(fn, item, size=size(item)) for item in items)))
+
+    async def map_batched(
+        self, fn: Callable[[Any], T], items: Iterable[Any], size: Callable[[Any], int] = len
+    ) -> List[T]:
+        """
+        Apply fn to many small items across the pool, preserving order
+
+        Items that are individually too small to offload are grouped into
+        contiguous chunks, one round-trip per chunk. Runs inline when the
+        combined size is below the inline threshold.
+        """
+        items = list(items)
+        total = sum(size(item) for item in items)
+        if self._pool is None or total < self.inline_threshold or len(items) < 2:
+            self.inline_calls += len(items)
+            return _apply_each(fn, items)
+
+        chunk_count = min(len(items), self.max_workers * CHUNKS_PER_WORKER)
+        chunk_size = -(-len(items) // chunk_count)
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+
+        self.offloaded_calls += len(items)
+        self.pending += len(chunks)
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, _apply_each, fn, chunk) for chunk in chunks)
+            )
+        finally:
+            self.pending -= len(chunks)
+        return [result for chunk in results for result in chunk]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self._pool is not None,
+            "workers": self.max_workers,
+            "inline_threshold_bytes": self.inline_threshold,
+            "in_flight": self.pending,
+            "queue_depth": max(0, self.pending - self.max_workers),
+            "peak_queue_depth": max(0, self.peak_pending - self.max_workers),
+            "inline_calls": self.inline_calls,
+            "offloaded_calls": self.offloaded_calls,
+        }
+
+
+# Global instance, started and stopped by the application lifespan
+cpu_executor = CPUExecutor()
@@ -0,0 +1,61 @@
+"""Keyset (cursor) pagination for newest-first listings"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lib.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(payload)
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid pagination cursor", details={"field": "cursor"})
+
+
+async def keyset_page(
+    db: AsyncSession,
+    query: Select,
+    created_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[Sequence[Any], Optional[str]]:
+    """
+    One page of `query`, newest first, continuing after `cursor`
+
+    Seeks with a row comparison on (created_at, id) rather than OFFSET, so
+    every page costs one index range scan however deep the client pages;
+    the query's filter plus these two columns should have a composite index.
+    Both columns must be selected. Returns the rows and the cursor for the
+    next page, or None on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        query = query.where(tuple_(created_column, id_column) < tuple_(*decode_cursor(cursor)))
+    result = await db.execute(
+        query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(last[created_column.key], last[id_column.key])
+    return rows, next_cursor
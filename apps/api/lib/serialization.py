@@ -0,0 +1,65 @@
+"""Fast JSON encoding for API responses and WebSocket events"""
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library encoder
+    orjson = None
+
+# Non-string dict keys (ints, and with orjson UUIDs) are stringified
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder handles natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_default(obj: Any) -> Any:
+    # orjson encodes these natively
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return _default(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; UUIDs, datetimes and pydantic models are encoded natively"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_stdlib_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_text(obj: Any) -> str:
+    """`dumps` as a str, for text frames and line protocols"""
+    return dumps(obj).decode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with `dumps`
+
+    The app's default response class. Handlers with large bodies can return
+    one directly, which also skips FastAPI's `jsonable_encoder` pass over
+    the content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,7 +1,8 @@
 """WebSocket Manager for real-time updates"""
 from fastapi import WebSocket
 from typing import Dict
-import json
+
+from lib.serialization import dumps_text
 
 class WebSocketManager:
     def __init__(self):
@@ -25,8 +26,12 @@ class WebSocketManager:
     
     async def broadcast(self, message: dict):
         """Broadcast message to all connected clients"""
-        for connection in self.active_connections.values():
-            await connection.send_text(json.dumps(message))
+        if not self.active_connections:
+            return
+        # Encoded once for every recipient
+        text = dumps_text(message)
+        for connection in list(self.active_connections.values()):
+            await connection.send_text(text)
 
 # Global instance
 ws_manager = WebSocketManager()
@@ -7,11 +7,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import asynccontextmanager
+import asyncio
 import structlog
 
-from routers import scraper, analyzer, generator, cms, auth
+from routers import scraper, analyzer, generator, cms, auth, projects, search
 from lib.websocket_manager import WebSocketManager
+from lib.cpu_executor import cpu_executor
+from lib.auth import password_hasher
+from lib.serialization import FastJSONResponse
 from lib.exceptions import BoltflowException
+from middleware.rate_limit import RateLimitMiddleware
+from middleware.http_cache import HTTPCacheMiddleware
 from middleware.error_handler import (
     boltflow_exception_handler,
     validation_exception_handler,
@@ -19,6 +25,7 @@ from middleware.error_handler import (
     general_exception_handler
 )
 from config.database import init_db
+from ai.client import close_openai_client
 from config.settings import settings
 
 # Configure structured logging
@@ -55,6 +62,13 @@ async def lifespan(app: FastAPI):
         logger.error("database_init_failed", error=str(e))
         raise
 
+    # Start the process pool for CPU-heavy parsing and code generation
+    cpu_executor.start(
+        max_workers=settings.cpu_pool_workers,
+        inline_threshold=settings.cpu_inline_threshold_bytes
+    )
+    logger.info("cpu_pool_started", workers=settings.cpu_pool_workers)
+
     # Validate settings
     logger.info("settings_loaded",
                 debug=settings.debug,
@@ -64,15 +78,27 @@ async def lifespan(app: FastAPI):
 
     # Shutdown: Clean up resources
     logger.info("boltflow_shutdown", message="Boltflow API shutting down...")
+    await close_openai_client()
+    # Workers drain in a thread so the loop keeps serving until they are done
+    await asyncio.to_thread(cpu_executor.shutdown)
+    password_hasher.shutdown()
 
 
 app = FastAPI(
     title=settings.app_name,
     description="AI-driven web migration and modernization system",
     version=settings.app_version,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Compression, ETags and Cache-Control, innermost so that it sees handler responses
+app.add_middleware(HTTPCacheMiddleware)
+
+# Rate limiting - added before CORS so that 429s still carry CORS headers
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware - restrict to configured origins
 app.add_middleware(
     CORSMiddleware,
@@ -91,7 +117,9 @@ app.add_exception_handler(Exception, general_exception_handler)
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
+app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
 app.include_router(scraper.router, prefix="/api/scraper", tags=["scraper"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 app.include_router(analyzer.router, prefix="/api/analyzer", tags=["analyzer"])
 app.include_router(generator.router, prefix="/api/generator", tags=["generator"])
 app.include_router(cms.router, prefix="/api/cms", tags=["cms"])
@@ -125,6 +153,7 @@ async def health_check():
         "version": settings.app_version,
         "checks": {
             "api": "ok",
+            "cpu_pool": cpu_executor.metrics(),
             # Add more health checks as needed
         }
     }
@@ -0,0 +1,180 @@
+"""Response compression, ETags and Cache-Control policies"""
+import asyncio
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config.settings import settings
+from middleware.rate_limit import route_matches
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+# Compressing bodies above this size runs in a worker thread
+THREADED_COMPRESSION_BYTES = 256 * 1024
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Content codings and their q-values from an Accept-Encoding header"""
+    codings = {}
+    for part in header.split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding.lower()] = quality
+    return codings
+
+
+def negotiate_encoding(header: str) -> Optional[str]:
+    """"br" or "gzip" if the client accepts one, preferring brotli on a tie"""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    ranked = [(codings.get(coding, wildcard), -rank, coding) for rank, coding in enumerate(available)]
+    quality, _, coding = max(ranked)
+    return coding if quality > 0 else None
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=5)
+    # mtime=0 keeps the output, and so the ETag, stable across requests
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class HTTPCacheMiddleware:
+    """
+    Compression, ETags and Cache-Control for buffered responses
+
+    - Cache-Control comes from the first matching `cache_control_policies`
+      rule, unless the handler set one.
+    - Successful GET responses get a strong ETag over their bytes, and a
+      matching `If-None-Match` turns them into a bodiless 304.
+    - Compressible bodies of at least `compression_min_bytes` are gzip or
+      brotli encoded, as the client accepts.
+
+    Streaming responses (exports, NDJSON) and responses that manage their
+    own ETag or encoding pass through untouched apart from Cache-Control.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None, policies: Optional[Dict[str, str]] = None):
+        self.app = app
+        self.minimum_size = settings.compression_min_bytes if minimum_size is None else minimum_size
+        self.policies = []
+        for route, policy in (settings.cache_control_policies if policies is None else policies).items():
+            method, _, path = route.partition(" ")
+            self.policies.append((method.upper(), path, policy))
+
+    def cache_control(self, method: str, path: str) -> Optional[str]:
+        for route_method, route_path, policy in self.policies:
+            if route_matches(route_method, route_path, method, path):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, scope, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    """Buffers one response and rewrites it once the body is complete"""
+
+    def __init__(self, middleware: HTTPCacheMiddleware, scope, send):
+        self.middleware = middleware
+        self.scope = scope
+        self.request_headers = Headers(scope=scope)
+        self._send = send
+        self.start: Optional[dict] = None
+        self.headers: Optional[MutableHeaders] = None
+        self.passthrough = False
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.headers = MutableHeaders(raw=list(message.get("headers", [])))
+            policy = self.middleware.cache_control(self.scope["method"], self.scope["path"])
+            if policy and "cache-control" not in self.headers:
+                self.headers["Cache-Control"] = policy
+            self.passthrough = (
+                message["status"] != 200
+                or "etag" in self.headers
+                or "content-encoding" in self.headers
+            )
+            if self.passthrough:
+                await self._send_start()
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        if message.get("more_body", False):
+            # A streamed body is sent as it comes
+            self.passthrough = True
+            await self._send_start()
+            await self._send(message)
+            return
+
+        await self._finish(message.get("body", b""))
+
+    async def _send_start(self) -> None:
+        await self._send({**self.start, "headers": self.headers.raw})
+
+    async def _finish(self, body: bytes) -> None:
+        headers = self.headers
+        content_type = headers.get("content-type", "")
+        compressible = content_type.startswith(COMPRESSIBLE_TYPES)
+        coding = None
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.middleware.minimum_size:
+                coding = negotiate_encoding(self.request_headers.get("accept-encoding", ""))
+
+        if self.scope["method"] == "GET":
+            # One ETag per representation: the coding is part of the tag
+            digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+            etag = f'"{digest}-{coding}"' if coding else f'"{digest}"'
+            headers["ETag"] = etag
+            if etag_matches(self.request_headers.get("if-none-match", ""), etag):
+                for name in ("content-length", "content-type"):
+                    if name in headers:
+                        del headers[name]
+                await self._send({**self.start, "status": 304, "headers": headers.raw})
+                await self._send({"type": "http.response.body", "body": b""})
+                return
+
+        if coding:
+            if len(body) >= THREADED_COMPRESSION_BYTES:
+                body = await asyncio.to_thread(compress, body, coding)
+            else:
+                body = compress(body, coding)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+
+        await self._send_start()
+        await self._send({"type": "http.response.body", "body": body})
+
@@ -0,0 +1,263 @@
+"""Rate limiting middleware (GCRA) with per-user and per-route budgets"""
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from jose import JWTError, jwt
+
+from config.settings import settings
+
+logger = structlog.get_logger(__name__)
+
+# Never limited: liveness probes, docs and CORS preflights
+EXEMPT_PATHS = {"/", "/health", "/docs", "/redoc", "/openapi.json"}
+
+
+@dataclass(frozen=True)
+class Budget:
+    name: str
+    requests: int
+    period: float  # seconds
+
+    @property
+    def interval(self) -> float:
+        """Seconds each request adds to the theoretical arrival time"""
+        return self.period / self.requests
+
+
+@dataclass(frozen=True)
+class Decision:
+    budget: Budget
+    allowed: bool
+    remaining: int
+    reset_after: float  # seconds until the budget is full again
+    retry_after: float  # seconds until a denied request would be allowed
+
+
+def decide(budget: Budget, tat: float, now: float) -> Tuple[Decision, Optional[float]]:
+    """
+    GCRA: one stored timestamp per key, O(1) per request
+
+    `tat` is the key's theoretical arrival time, the moment its budget
+    would be full again. A request is allowed if adding its interval keeps
+    the TAT within one period of now, which permits bursts of up to
+    `requests`. Returns the decision and the TAT to store, or None when
+    the request is denied and nothing changes.
+    """
+    tat = max(tat, now)
+    new_tat = tat + budget.interval
+    allow_at = new_tat - budget.period
+    if allow_at > now:
+        return Decision(
+            budget=budget,
+            allowed=False,
+            remaining=0,
+            reset_after=tat - now,
+            retry_after=allow_at - now,
+        ), None
+    return Decision(
+        budget=budget,
+        allowed=True,
+        remaining=int((budget.period - (new_tat - now)) / budget.interval + 1e-9),
+        reset_after=new_tat - now,
+        retry_after=0.0,
+    ), new_tat
+
+
+class MemoryRateLimitBackend:
+    """Per-process limiter state; budgets are per worker when running several"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+
+    async def hit(self, key: str, budget: Budget) -> Decision:
+        now = time.monotonic()
+        decision, new_tat = decide(budget, self._tats.get(key, now), now)
+        if new_tat is not None:
+            self._tats[key] = new_tat
+            self._tats.move_to_end(key)
+            # The least recently limited keys have long since refilled
+            while len(self._tats) > self.max_keys:
+                self._tats.popitem(last=False)
+        return decision
+
+
+# Same algorithm as `decide`, atomically in Redis, on the server's clock so
+# that every API instance agrees on time. Returns {allowed, tat, now} with the
+# times as strings, since Lua numbers are truncated to integers in replies.
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local new_tat = tat + interval
+if new_tat - period > now then
+  return {0, tostring(tat), tostring(now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, tostring(tat), tostring(now)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Limiter state shared by every API instance through Redis"""
+
+    def __init__(self, client: Any = None, prefix: str = "ratelimit:"):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(settings.redis_url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(GCRA_SCRIPT)
+
+    async def hit(self, key: str, budget: Budget) -> Decision:
+        _, tat, now = await self._script(
+            keys=[self.prefix + key], args=[budget.interval, budget.period]
+        )
+        decision, _ = decide(budget, float(tat), float(now))
+        return decision
+
+
+def route_matches(route_method: str, route_path: str, method: str, path: str) -> bool:
+    """Whether a request matches a `METHOD /path` rule; "*" matches any method or path prefix"""
+    if route_method not in (method, "*"):
+        return False
+    if route_path.endswith("*"):
+        return path.startswith(route_path[:-1])
+    return path == route_path
+
+
+def parse_route_budgets(routes: Dict[str, Dict[str, int]]) -> List[Tuple[str, str, Budget]]:
+    """`{"POST /api/scraper/start": {"requests": 5, "period": 60}}` as (method, path, budget)"""
+    budgets = []
+    for route, limit in routes.items():
+        method, _, path = route.partition(" ")
+        budgets.append((method.upper(), path, Budget(route, limit["requests"], limit["period"])))
+    return budgets
+
+
+def request_identity(headers: Dict[bytes, bytes], client: Optional[Tuple[str, int]]) -> str:
+    """The user ID from a valid bearer token, else the client address"""
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+            if isinstance(payload.get("sub"), str):
+                return f"user:{payload['sub']}"
+        except JWTError:
+            pass
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing a default budget per caller, plus tighter
+    budgets for expensive routes
+
+    Callers are identified by user when they send a valid token and by
+    address otherwise. Every limited response carries `RateLimit-Policy`,
+    `RateLimit-Limit`, `RateLimit-Remaining` and `RateLimit-Reset` for the
+    most constrained budget; denials are 429 with `Retry-After`. If the
+    backend is unreachable, requests are let through.
+    """
+
+    def __init__(
+        self,
+        app,
+        backend=None,
+        default: Optional[Budget] = None,
+        routes: Optional[Dict[str, Dict[str, int]]] = None,
+    ):
+        self.app = app
+        if backend is None:
+            backend = (
+                RedisRateLimitBackend() if settings.rate_limit_backend == "redis"
+                else MemoryRateLimitBackend()
+            )
+        self.backend = backend
+        self.default = default or Budget("default", settings.rate_limit_requests, settings.rate_limit_period)
+        self.routes = parse_route_budgets(settings.rate_limit_routes if routes is None else routes)
+
+    def budgets(self, method: str, path: str) -> List[Budget]:
+        # Route budgets first, so a denied expensive call does not also
+        # spend the caller's default budget
+        matched = [
+            budget for route_method, route_path, budget in self.routes
+            if route_matches(route_method, route_path, method, path)
+        ]
+        return matched + [self.default]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        identity = request_identity(dict(scope["headers"]), scope.get("client"))
+        decisions = []
+        try:
+            for budget in self.budgets(scope["method"], scope["path"]):
+                decision = await self.backend.hit(f"{identity}:{budget.name}", budget)
+                decisions.append(decision)
+                if not decision.allowed:
+                    break
+        except Exception as e:
+            logger.warning("rate_limit_backend_unavailable", error=str(e))
+            await self.app(scope, receive, send)
+            return
+
+        binding = min(decisions, key=lambda d: (d.allowed, d.remaining))
+        headers = rate_limit_headers(binding)
+
+        if not binding.allowed:
+            logger.info("rate_limited", identity=identity, path=scope["path"], budget=binding.budget.name)
+            await send_rate_limited(send, binding, headers)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def rate_limit_headers(decision: Decision) -> List[Tuple[bytes, bytes]]:
+    budget = decision.budget
+    return [
+        (b"ratelimit-policy", f"{budget.requests};w={math.ceil(budget.period)}".encode()),
+        (b"ratelimit-limit", str(budget.requests).encode()),
+        (b"ratelimit-remaining", str(decision.remaining).encode()),
+        (b"ratelimit-reset", str(math.ceil(decision.reset_after)).encode()),
+    ]
+
+
+async def send_rate_limited(send, decision: Decision, headers: List[Tuple[bytes, bytes]]) -> None:
+    """429 in the same shape as the API's other errors"""
+    retry_after = max(1, math.ceil(decision.retry_after))
+    body = json.dumps({
+        "error": {
+            "message": "Rate limit exceeded",
+            "details": {"budget": decision.budget.name, "retry_after": retry_after},
+            "type": "RateLimitError"
+        }
+    }).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -5,6 +5,8 @@ from .job import Job
 from .scraped_page import ScrapedPage
 from .component_pattern import ComponentPattern
 from .generated_component import GeneratedComponent
+from .page_analysis import PageAnalysis
+from .job_summary import JobSummary
 
 __all__ = [
     "User",
@@ -13,4 +15,6 @@ __all__ = [
     "ScrapedPage",
     "ComponentPattern",
     "GeneratedComponent",
+    "PageAnalysis",
+    "JobSummary",
 ]
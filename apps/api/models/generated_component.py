@@ -10,10 +10,12 @@ class GeneratedComponent(Base, TimestampMixin):
     __tablename__ = "generated_components"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=False, index=True)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), index=True)
     component_type = Column(String, nullable=False)
     filename = Column(String, nullable=False)
     content = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False, index=True)  # sha256 of generator inputs
+    generator_version = Column(String, nullable=False)
 
     # Relationships
     job = relationship("Job", back_populates="generated_components")
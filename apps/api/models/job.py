@@ -1,5 +1,5 @@
 """Job model"""
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -8,6 +8,10 @@ from .base import Base, TimestampMixin
 
 class Job(Base, TimestampMixin):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination of a project's jobs, newest first
+        Index("ix_jobs_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
@@ -22,6 +26,8 @@ class Job(Base, TimestampMixin):
     project = relationship("Project", back_populates="jobs")
     scraped_pages = relationship("ScrapedPage", back_populates="job", cascade="all, delete-orphan")
     generated_components = relationship("GeneratedComponent", back_populates="job", cascade="all, delete-orphan")
+    page_analyses = relationship("PageAnalysis", back_populates="job", cascade="all, delete-orphan")
+    summary = relationship("JobSummary", back_populates="job", uselist=False, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Job {self.type} ({self.status})>"
@@ -0,0 +1,34 @@
+"""Job summary read model"""
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from .base import Base
+
+
+class JobSummary(Base):
+    """Denormalized counters for a job, updated by its runner as it goes"""
+    __tablename__ = "job_summaries"
+
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    pages_scraped = Column(Integer, nullable=False, default=0)
+    pages_total = Column(Integer)
+    bytes_scraped = Column(BigInteger, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    last_event = Column(String)  # e.g. scrape:progress
+    last_event_at = Column(DateTime)
+
+    # Relationships
+    job = relationship("Job", back_populates="summary")
+
+    def record(self, event: str, **changes) -> None:
+        """Apply changes and note the event that caused them"""
+        for name, value in changes.items():
+            setattr(self, name, value)
+        self.last_event = event
+        self.last_event_at = datetime.utcnow()
+
+    def __repr__(self):
+        return f"<JobSummary {self.job_id} ({self.last_event})>"
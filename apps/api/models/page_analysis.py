@@ -0,0 +1,27 @@
+"""Page analysis model"""
+from sqlalchemy import Column, String, Integer, Float, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+import uuid
+from .base import Base, TimestampMixin
+
+
+class PageAnalysis(Base, TimestampMixin):
+    __tablename__ = "page_analyses"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), index=True)
+    scraped_page_id = Column(UUID(as_uuid=True), ForeignKey("scraped_pages.id"), index=True)
+    content_hash = Column(String(64), nullable=False, index=True)  # sha256 of HTML + CSS
+    page_type = Column(String, nullable=False)  # static, template, dynamic
+    components = Column(JSONB, nullable=False)
+    component_count = Column(Integer, nullable=False, default=0)
+    complexity_score = Column(Float, nullable=False)
+    estimated_hours = Column(Float, nullable=False)
+    template_confidence = Column(Float)  # set when copied from a same-template page
+
+    # Relationships
+    job = relationship("Job", back_populates="page_analyses")
+
+    def __repr__(self):
+        return f"<PageAnalysis {self.content_hash[:12]} ({self.page_type})>"
@@ -1,5 +1,5 @@
 """Project model"""
-from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -8,6 +8,10 @@ from .base import Base, TimestampMixin
 
 class Project(Base, TimestampMixin):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Keyset pagination of a user's projects, newest first
+        Index("ix_projects_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
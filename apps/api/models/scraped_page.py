@@ -1,24 +1,57 @@
 """Scraped page model"""
 from datetime import datetime
-from sqlalchemy import Column, String, ForeignKey, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, Computed, String, ForeignKey, DateTime, Integer, Index, Text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
 from .base import Base
+from lib.blob_store import LazyBlob
+
+# Titles rank above body text. Postgres recomputes this on every insert and
+# update, so the index never lags the extracted text.
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(search_text, '')), 'B')"
+)
 
 
 class ScrapedPage(Base):
     __tablename__ = "scraped_pages"
+    __table_args__ = (
+        # Keyset pagination and ordered export of a job's pages
+        Index("ix_scraped_pages_job_id_scraped_at_id", "job_id", "scraped_at", "id"),
+        Index("ix_scraped_pages_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_scraped_pages_structure_tokens", "structure_tokens", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=False, index=True)
     url = Column(String, nullable=False)
-    html = Column(Text)
-    css = Column(Text)
-    screenshot = Column(Text)
-    metadata = Column(JSONB)
+    # Payloads live in the blob store; rows keep the key and uncompressed size
+    html_ref = Column(String(80))
+    html_size = Column(Integer)
+    css_ref = Column(String(80))
+    css_size = Column(Integer)
+    screenshot_ref = Column(String(80))
+    screenshot_size = Column(Integer)
+    # Inline payloads from before the blob store, kept until
+    # `python -m scripts.backfill_page_blobs` has moved them out
+    legacy_html = Column("html", Text)
+    legacy_css = Column("css", Text)
+    legacy_screenshot = Column("screenshot", Text)
+    # "metadata" is reserved by the declarative API, so map it under another name
+    page_metadata = Column("metadata", JSONB)
+    # Search fields, extracted from the HTML at scrape time
+    title = Column(String)
+    search_text = Column(Text)  # visible text, whitespace-collapsed
+    structure_tokens = Column(ARRAY(String))  # "form", ".btn", "input[type=email]", ...
+    search_vector = Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True))
     scraped_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    html = LazyBlob("html_ref", "html_size", "legacy_html")
+    css = LazyBlob("css_ref", "css_size", "legacy_css")
+    screenshot = LazyBlob("screenshot_ref", "screenshot_size", "legacy_screenshot")
+
     # Relationships
     job = relationship("Job", back_populates="scraped_pages")
 
@@ -1,14 +1,41 @@
 """
 Analyzer Router - AI-powered analysis endpoints
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from functools import lru_cache
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Any, Optional
+import asyncio
+import hashlib
+import uuid
+import structlog
 
 from ai.analyzer import DOMAnalyzer
-from ai.classifier import ComponentClassifier
+from ai.classifier import ComponentClassifier, classification_stats
+from ai.model_router import get_model_router
+from ai.fingerprint import cluster_pages, page_fingerprint
+from models.project import Project
+from models.job import Job
+from models.scraped_page import ScrapedPage
+from models.page_analysis import PageAnalysis
+from config.database import get_db
+from config.settings import settings
+from lib.auth import Principal, get_current_user, get_current_user_optional
+from lib.websocket_manager import ws_manager
+from lib.cpu_executor import cpu_executor
+from lib.blob_store import get_blob_store
+from lib.exceptions import NotFoundError, ValidationError
+from lib.serialization import dumps_text
 
 router = APIRouter()
+logger = structlog.get_logger(__name__)
+
+BASE_HOURS = 8  # Base setup time
+HOURLY_RATE = 100  # $100/hour
 
 class AnalyzeRequest(BaseModel):
     job_id: str
@@ -29,41 +56,168 @@ class AnalysisResponse(BaseModel):
     complexity_score: float
     estimated_hours: float
 
+@lru_cache(maxsize=None)
+def get_analyzer() -> DOMAnalyzer:
+    """App-scoped analyzer sharing the process-wide OpenAI client"""
+    return DOMAnalyzer()
+
+@lru_cache(maxsize=None)
+def get_classifier() -> ComponentClassifier:
+    """App-scoped classifier sharing the process-wide OpenAI client"""
+    return ComponentClassifier()
+
 @router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_page(request: AnalyzeRequest):
+async def analyze_page(
+    request: AnalyzeRequest,
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db),
+    analyzer: DOMAnalyzer = Depends(get_analyzer),
+    classifier: ComponentClassifier = Depends(get_classifier)
+):
     """
     Analyze scraped HTML with AI
 
     - **job_id**: Scraping job ID
     - **html**: HTML content to analyze
     - **css**: Optional CSS styles
+
+    Results are stored by content hash, so re-analyzing identical content is
+    a database read. The stored analysis is linked to the job, and counts
+    towards its project's quote, only when the caller owns the job.
     """
     try:
-        # Initialize AI analyzer
-        analyzer = DOMAnalyzer()
-        classifier = ComponentClassifier()
+        digest = content_hash(request.html, request.css)
 
-        # Analyze page structure
-        page_analysis = await analyzer.analyze(request.html, request.css)
+        # Rows copied from a same-template page are approximations
+        result = await db.execute(
+            select(PageAnalysis)
+            .where(PageAnalysis.content_hash == digest, PageAnalysis.template_confidence.is_(None))
+            .order_by(PageAnalysis.created_at.desc())
+            .limit(1)
+        )
+        stored = result.scalar_one_or_none()
 
-        # Classify components
-        components = await classifier.classify(page_analysis['sections'])
+        if stored is None:
+            # Analyze page structure
+            page_analysis = await analyzer.analyze(request.html, request.css)
 
-        # Calculate complexity and pricing
-        complexity = calculate_complexity(components)
-        estimated_hours = estimate_effort(complexity, len(components))
+            # Classify components
+            components = await classifier.classify(page_analysis['sections'])
+
+            # Calculate complexity and pricing
+            complexity = calculate_complexity(components)
+            estimated_hours = estimate_effort(complexity, len(components))
+
+            stored = PageAnalysis(
+                job_id=await resolve_job_id(db, request.job_id, current_user),
+                content_hash=digest,
+                page_type=page_analysis['page_type'],
+                components=components,
+                component_count=len(components),
+                complexity_score=complexity,
+                estimated_hours=estimated_hours
+            )
+            db.add(stored)
+            await db.flush()
 
         return AnalysisResponse(
             job_id=request.job_id,
-            page_type=page_analysis['page_type'],
-            components=components,
-            complexity_score=complexity,
-            estimated_hours=estimated_hours
+            page_type=stored.page_type,
+            components=stored.components,
+            complexity_score=stored.complexity_score,
+            estimated_hours=stored.estimated_hours
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def content_hash(html: str, css: Optional[str] = None) -> str:
+    """Key under which a page's analysis is stored"""
+    digest = hashlib.sha256(html.encode())
+    digest.update(b"\0")
+    digest.update((css or "").encode())
+    return digest.hexdigest()
+
+async def resolve_job_id(
+    db: AsyncSession,
+    job_id: str,
+    user: Optional[Principal]
+) -> Optional[uuid.UUID]:
+    """The job's id if it belongs to the user's project; results for other jobs are stored unlinked"""
+    if user is None:
+        return None
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        return None
+
+    result = await db.execute(
+        select(Job.id)
+        .join(Project, Project.id == Job.project_id)
+        .where(Job.id == job_uuid, Project.user_id == user.id)
+    )
+    return result.scalar_one_or_none()
+
+@router.post("/analyze/stream")
+async def analyze_page_stream(
+    request: AnalyzeRequest,
+    analyzer: DOMAnalyzer = Depends(get_analyzer),
+    classifier: ComponentClassifier = Depends(get_classifier)
+):
+    """
+    Analyze scraped HTML with AI, streaming results as NDJSON
+
+    Emits a `page_type` event once the page analysis is done, one `component`
+    event per section as soon as it is classified (in completion order, with
+    its section `index`), and a final `summary` event with the complexity
+    score and estimate. Failures are reported as an `error` event.
+    """
+    return StreamingResponse(
+        stream_analysis(request, analyzer, classifier),
+        media_type="application/x-ndjson"
+    )
+
+async def stream_analysis(
+    request: AnalyzeRequest,
+    analyzer: DOMAnalyzer,
+    classifier: ComponentClassifier
+) -> AsyncIterator[str]:
+    """Yield NDJSON analysis events for one page"""
+    try:
+        page_analysis = await analyzer.analyze(request.html, request.css)
+        yield ndjson({
+            "event": "page_type",
+            "job_id": request.job_id,
+            "page_type": page_analysis['page_type']
+        })
+
+        components = []
+        async for index, component in classifier.classify_iter(page_analysis['sections']):
+            components.append(component)
+            yield ndjson({
+                "event": "component",
+                "job_id": request.job_id,
+                "index": index,
+                "component": ComponentPattern(**component).model_dump()
+            })
+
+        complexity = calculate_complexity(components)
+        yield ndjson({
+            "event": "summary",
+            "job_id": request.job_id,
+            "component_count": len(components),
+            "complexity_score": complexity,
+            "estimated_hours": estimate_effort(complexity, len(components))
+        })
+
+    except Exception as e:
+        # Headers are already sent, so errors travel in-band
+        logger.error("analysis_stream_failed", job_id=request.job_id, error=str(e), exc_info=True)
+        yield ndjson({"event": "error", "job_id": request.job_id, "message": str(e)})
+
+def ndjson(event: Dict[str, Any]) -> str:
+    return dumps_text(event) + "\n"
+
 def calculate_complexity(components: List[Dict]) -> float:
     """Calculate overall complexity score (0-100)"""
     # Factors: number of components, style variety, JS complexity
@@ -73,28 +227,406 @@ def calculate_complexity(components: List[Dict]) -> float:
 
 def estimate_effort(complexity: float, component_count: int) -> float:
     """Estimate development hours"""
-    base_hours = 8  # Base setup time
     component_hours = component_count * 0.5  # 30 min per component
     complexity_factor = complexity / 100
-    return base_hours + component_hours * (1 + complexity_factor)
+    return BASE_HOURS + component_hours * (1 + complexity_factor)
+
+def build_quote(complexity_score: float, estimated_hours: float) -> Dict[str, Any]:
+    """Price an estimate at the standard hourly rate"""
+    return {
+        "complexity_score": complexity_score,
+        "estimated_hours": estimated_hours,
+        "hourly_rate": HOURLY_RATE,
+        "total_cost": estimated_hours * HOURLY_RATE,
+        "breakdown": {
+            "setup": BASE_HOURS * HOURLY_RATE,
+            "components": (estimated_hours - BASE_HOURS) * HOURLY_RATE,
+            "testing": 0  # Included
+        }
+    }
 
 @router.post("/quote")
-async def get_quote(request: AnalyzeRequest):
+async def get_quote(
+    request: AnalyzeRequest,
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db),
+    analyzer: DOMAnalyzer = Depends(get_analyzer),
+    classifier: ComponentClassifier = Depends(get_classifier)
+):
     """Get real-time pricing quote"""
-    analysis = await analyze_page(request)
-
-    hourly_rate = 100  # $100/hour
-    total_cost = analysis.estimated_hours * hourly_rate
+    analysis = await analyze_page(request, current_user, db, analyzer, classifier)
 
     return {
         "job_id": request.job_id,
-        "complexity_score": analysis.complexity_score,
-        "estimated_hours": analysis.estimated_hours,
-        "hourly_rate": hourly_rate,
-        "total_cost": total_cost,
-        "breakdown": {
-            "setup": 8 * hourly_rate,
-            "components": (analysis.estimated_hours - 8) * hourly_rate,
-            "testing": 0  # Included
+        **build_quote(analysis.complexity_score, analysis.estimated_hours)
+    }
+
+@router.get("/projects/{project_id}/quote")
+async def get_project_quote(
+    project_id: str,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a project-wide quote from its stored page analyses
+
+    Aggregates in the database over the latest analysis of each distinct page
+    content; no model calls are made. Setup hours are counted once per project.
+    """
+    result = await db.execute(
+        select(Project.id).where(Project.id == project_id, Project.user_id == current_user.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise NotFoundError("Project", project_id)
+
+    latest = (
+        select(
+            PageAnalysis.component_count,
+            PageAnalysis.complexity_score,
+            PageAnalysis.estimated_hours
+        )
+        .join(Job, Job.id == PageAnalysis.job_id)
+        .where(Job.project_id == project_id)
+        .distinct(PageAnalysis.content_hash)
+        .order_by(PageAnalysis.content_hash, PageAnalysis.created_at.desc())
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(latest.c.component_count), 0),
+            func.coalesce(func.avg(latest.c.complexity_score), 0),
+            func.coalesce(func.sum(latest.c.estimated_hours - BASE_HOURS), 0)
+        ).select_from(latest)
+    )
+    pages, components, complexity, page_hours = result.one()
+
+    return {
+        "project_id": project_id,
+        "pages": pages,
+        "components": components,
+        **build_quote(float(complexity), BASE_HOURS + float(page_hours))
+    }
+
+@router.get("/models/stats")
+async def get_model_stats():
+    """Per-tier model usage and latency, plus the classifier escalation rate"""
+    return {
+        "tiers": get_model_router().snapshot(),
+        "classifier": {
+            "sections": classification_stats.total,
+            "escalated": classification_stats.escalated,
+            "escalation_rate": classification_stats.escalation_rate
         }
     }
+
+class JobAnalysisResponse(BaseModel):
+    job_id: str
+    source_job_id: str
+    status: str
+    message: str
+
+@router.post("/jobs/{job_id}/analyze", response_model=JobAnalysisResponse)
+async def analyze_job(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    analyzer: DOMAnalyzer = Depends(get_analyzer),
+    classifier: ComponentClassifier = Depends(get_classifier)
+):
+    """
+    Analyze every page of a scraping job server-side
+
+    Starts an `analyze` job that reads the scraped pages from the database,
+    analyzes one representative page per structural template with bounded
+    concurrency, and stores one analysis row per page. Pages whose content
+    was analyzed before are not sent to the model again. Progress is
+    broadcast over the WebSocket as `analyze:*` events.
+
+    Requires authentication.
+    """
+    result = await db.execute(
+        select(Job)
+        .join(Project, Project.id == Job.project_id)
+        .where(Job.id == job_id, Project.user_id == current_user.id)
+    )
+    source_job = result.scalar_one_or_none()
+
+    if not source_job:
+        raise NotFoundError("Job", job_id)
+
+    if source_job.type != "scrape" or source_job.status != "completed":
+        raise ValidationError(
+            "Only completed scraping jobs can be analyzed",
+            details={"job_id": job_id, "type": source_job.type, "status": source_job.status}
+        )
+
+    job = Job(
+        project_id=source_job.project_id,
+        type="analyze",
+        status="pending",
+        progress=0
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    background_tasks.add_task(
+        run_job_analysis,
+        job_id=str(job.id),
+        source_job_id=job_id,
+        project_id=str(source_job.project_id),
+        analyzer=analyzer,
+        classifier=classifier
+    )
+
+    logger.info(
+        "job_analysis_started",
+        job_id=str(job.id),
+        source_job_id=job_id,
+        user_id=str(current_user.id)
+    )
+
+    return JobAnalysisResponse(
+        job_id=str(job.id),
+        source_job_id=job_id,
+        status="started",
+        message="Analysis job started"
+    )
+
+async def load_stored_analyses(db: AsyncSession, hashes: set) -> Dict[str, Dict[str, Any]]:
+    """Latest exact analysis per content hash, for the hashes that have one"""
+    stored: Dict[str, Dict[str, Any]] = {}
+    hash_list = sorted(hashes)
+
+    for i in range(0, len(hash_list), 1000):
+        result = await db.execute(
+            select(
+                PageAnalysis.content_hash,
+                PageAnalysis.page_type,
+                PageAnalysis.components,
+                PageAnalysis.complexity_score,
+                PageAnalysis.estimated_hours
+            )
+            .where(
+                PageAnalysis.content_hash.in_(hash_list[i:i + 1000]),
+                # Copies of a same-template result would be reused as exact
+                PageAnalysis.template_confidence.is_(None)
+            )
+            .distinct(PageAnalysis.content_hash)
+            .order_by(PageAnalysis.content_hash, PageAnalysis.created_at.desc())
+        )
+        for digest, page_type, components, complexity, hours in result:
+            stored[digest] = {
+                "page_type": page_type,
+                "components": components,
+                "complexity_score": complexity,
+                "estimated_hours": hours
+            }
+
+    return stored
+
+async def run_job_analysis(
+    job_id: str,
+    source_job_id: str,
+    project_id: str,
+    analyzer: DOMAnalyzer,
+    classifier: ComponentClassifier
+):
+    """Background task to analyze a scraping job's pages and store one analysis per page"""
+    from config.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.execute(select(Job).where(Job.id == job_id))
+            job = result.scalar_one()
+            job.status = "running"
+            await db.commit()
+
+            await ws_manager.broadcast({
+                "type": "analyze:started",
+                "job_id": job_id,
+                "project_id": project_id,
+                "source_job_id": source_job_id
+            })
+
+            # Hash and fingerprint pages from a server-side cursor so only one
+            # page's HTML is held in memory at a time
+            blob_store = get_blob_store()
+            hashes: Dict[str, str] = {}
+            fingerprints: Dict[str, int] = {}
+            stream = await db.stream(
+                select(
+                    ScrapedPage.id,
+                    ScrapedPage.html_ref,
+                    ScrapedPage.css_ref,
+                    ScrapedPage.legacy_html,
+                    ScrapedPage.legacy_css
+                )
+                .where(ScrapedPage.job_id == source_job_id)
+                .order_by(ScrapedPage.scraped_at)
+                .execution_options(yield_per=50)
+            )
+            async for page_id, html_ref, css_ref, legacy_html, legacy_css in stream:
+                # Pages not yet backfilled keep their payloads inline
+                html, css = await asyncio.gather(
+                    blob_store.get_text(html_ref, legacy_html),
+                    blob_store.get_text(css_ref, legacy_css)
+                )
+                html = html or ""
+                hashes[str(page_id)] = content_hash(html, css)
+                fingerprints[str(page_id)] = await cpu_executor.run(page_fingerprint, html, size=len(html))
+
+            # Content analyzed before, by any job, is reused as is
+            stored = await load_stored_analyses(db, set(hashes.values()))
+            pending = {
+                page_id: fingerprint
+                for page_id, fingerprint in fingerprints.items()
+                if hashes[page_id] not in stored
+            }
+
+            clusters = cluster_pages(pending)
+            representatives = [cluster.representative for cluster in clusters]
+
+            logger.info(
+                "job_analysis_clustered",
+                job_id=job_id,
+                pages=len(fingerprints),
+                stored=len(fingerprints) - len(pending),
+                templates=len(clusters)
+            )
+
+            analyses: Dict[str, Dict[str, Any]] = {}
+            semaphore = asyncio.Semaphore(settings.analyzer_concurrency)
+            batch_size = settings.analyzer_pages_per_request
+
+            async def analyze_batch(page_ids: List[str]):
+                async with semaphore:
+                    async with AsyncSessionLocal() as batch_db:
+                        rows = (await batch_db.execute(
+                            select(ScrapedPage.id, ScrapedPage.html_ref, ScrapedPage.legacy_html)
+                            .where(ScrapedPage.id.in_(page_ids))
+                        )).all()
+                    html = await asyncio.gather(*(
+                        blob_store.get_text(ref, legacy) for _, ref, legacy in rows
+                    ))
+                    pages = {str(page_id): text or "" for (page_id, _, _), text in zip(rows, html)}
+
+                    page_analyses = await analyzer.analyze_pages(pages)
+                    for page_id, page_analysis in page_analyses.items():
+                        components = await classifier.classify(page_analysis['sections'])
+                        complexity = calculate_complexity(components)
+                        analyses[page_id] = {
+                            "page_type": page_analysis['page_type'],
+                            "components": components,
+                            "complexity_score": complexity,
+                            "estimated_hours": estimate_effort(complexity, len(components))
+                        }
+
+            # Progress is committed from this task only; the session is not
+            # safe for concurrent use by the batch tasks
+            batches = [
+                asyncio.ensure_future(analyze_batch(representatives[i:i + batch_size]))
+                for i in range(0, len(representatives), batch_size)
+            ]
+            try:
+                for batch in asyncio.as_completed(batches):
+                    await batch
+
+                    job.progress = int(len(analyses) / len(representatives) * 100)
+                    await db.commit()
+
+                    await ws_manager.broadcast({
+                        "type": "analyze:progress",
+                        "job_id": job_id,
+                        "project_id": project_id,
+                        "progress": {
+                            "templates_analyzed": len(analyses),
+                            "total_templates": len(representatives),
+                            "total_pages": len(fingerprints),
+                            "percentage": job.progress
+                        }
+                    })
+            finally:
+                for batch in batches:
+                    batch.cancel()
+
+            # Propagate each template's result to its pages, discounting
+            # component confidence by how closely the page matches
+            page_results: Dict[str, Dict[str, Any]] = {
+                page_id: stored[digest]
+                for page_id, digest in hashes.items()
+                if digest in stored
+            }
+            for cluster in clusters:
+                analysis = analyses[cluster.representative]
+                for page_id, confidence in cluster.members.items():
+                    page_results[page_id] = {
+                        **analysis,
+                        "components": [
+                            {**component, "confidence": component["confidence"] * confidence}
+                            for component in analysis["components"]
+                        ],
+                        "template_confidence": confidence
+                    }
+
+            db.add_all(
+                PageAnalysis(
+                    job_id=job.id,
+                    scraped_page_id=uuid.UUID(page_id),
+                    content_hash=hashes[page_id],
+                    page_type=page_result["page_type"],
+                    components=page_result["components"],
+                    component_count=len(page_result["components"]),
+                    complexity_score=page_result["complexity_score"],
+                    estimated_hours=page_result["estimated_hours"],
+                    template_confidence=page_result.get("template_confidence")
+                )
+                for page_id, page_result in page_results.items()
+            )
+
+            job.status = "completed"
+            job.progress = 100
+            job.completed_at = datetime.utcnow()
+            job.result = {
+                "source_job_id": source_job_id,
+                "pages_total": len(fingerprints),
+                "pages_stored": len(fingerprints) - len(pending),
+                "pages_analyzed": len(representatives),
+                "templates": len(clusters)
+            }
+            await db.commit()
+
+            logger.info(
+                "job_analysis_completed",
+                job_id=job_id,
+                pages=len(fingerprints),
+                templates=len(clusters)
+            )
+
+            await ws_manager.broadcast({
+                "type": "analyze:completed",
+                "job_id": job_id,
+                "project_id": project_id,
+                "source_job_id": source_job_id,
+                "pages_total": len(fingerprints),
+                "templates": len(clusters)
+            })
+
+        except Exception as e:
+            logger.error("job_analysis_failed", job_id=job_id, error=str(e), exc_info=True)
+
+            await db.rollback()
+            result = await db.execute(select(Job).where(Job.id == job_id))
+            job = result.scalar_one()
+            job.status = "failed"
+            job.error = str(e)
+            await db.commit()
+
+            await ws_manager.broadcast({
+                "type": "analyze:error",
+                "job_id": job_id,
+                "project_id": project_id,
+                "error": str(e)
+            })
@@ -7,10 +7,10 @@ from sqlalchemy import select
 from models.user import User
 from config.database import get_db
 from lib.auth import (
-    verify_password,
-    get_password_hash,
+    password_hasher,
     create_access_token,
-    get_current_user
+    get_current_user,
+    Principal
 )
 from lib.exceptions import AuthenticationError, ValidationError
 
@@ -60,7 +60,7 @@ async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
         raise ValidationError("Password must be at least 8 characters long")
 
     # Create new user
-    hashed_password = get_password_hash(request.password)
+    hashed_password = await password_hasher.hash(request.password)
     new_user = User(
         email=request.email,
         password_hash=hashed_password,
@@ -96,9 +96,14 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
         raise AuthenticationError("Invalid email or password")
 
     # Verify password
-    if not verify_password(request.password, user.password_hash):
+    valid, new_hash = await password_hasher.verify_and_update(request.password, user.password_hash)
+    if not valid:
         raise AuthenticationError("Invalid email or password")
 
+    # Hashes made under older cost settings are upgraded transparently
+    if new_hash:
+        user.password_hash = new_hash
+
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
 
@@ -113,7 +118,7 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """Get current user information"""
     return UserResponse(
         id=str(current_user.id),
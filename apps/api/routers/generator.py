@@ -1,9 +1,36 @@
 """
 Generator Router - Component and code generation endpoints
 """
-from fastapi import APIRouter
+from collections import OrderedDict
+from functools import partial
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, literal, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import defer
+from typing import AsyncIterator, List, Dict, Any, Iterable
+import asyncio
+import hashlib
+import uuid
+
+from generators.archive import ARCHIVE_WRITERS, parse_range, slice_chunks
+from generators.css_pruner import StylesheetIndex
+from generators.design_tokens import generate_tailwind_config
+from generators.jsx import GENERATOR_VERSION, generate_react_component
+from generators.memo import assign_filenames, component_hash, config_hash, diff_manifest, unique_components
+from models.project import Project
+from models.job import Job
+from models.scraped_page import ScrapedPage
+from models.generated_component import GeneratedComponent
+from config.database import get_db
+from lib.auth import Principal, get_current_user
+from lib.cpu_executor import cpu_executor
+from lib.blob_store import get_blob_store
+from lib.exceptions import NotFoundError, ValidationError
+from lib.serialization import FastJSONResponse
+from routers.analyzer import resolve_job_id
 
 router = APIRouter()
 
@@ -12,82 +39,334 @@ class GenerateRequest(BaseModel):
     components: List[Dict[str, Any]]
     target_framework: str = "nextjs"  # nextjs, react, vue
     ui_library: str = "shadcn"  # shadcn, mui, chakra
+    incremental: bool = False  # only return files changed since the last generation
 
 class GeneratedCode(BaseModel):
     filename: str
     content: str
     type: str  # component, page, style, config
 
+class ComponentFile(BaseModel):
+    type: str
+    filename: str
+
+TAILWIND_CONFIG = "tailwind.config.ts"
+
+# Archive sizes by ETag, so only the first download of an export pays for
+# the counting pass
+EXPORT_SIZE_CACHE_ENTRIES = 256
+_export_sizes: "OrderedDict[str, int]" = OrderedDict()
+
 @router.post("/generate")
-async def generate_code(request: GenerateRequest):
-    """Generate React/Next.js code from analyzed components"""
-    
-    generated_files: List[GeneratedCode] = []
-    
-    # Generate components
-    for comp in request.components:
-        code = generate_react_component(comp, request.ui_library)
-        generated_files.append(GeneratedCode(
-            filename=f"{comp['type']}.tsx",
-            content=code,
-            type="component"
-        ))
-    
-    # Generate Tailwind config
-    tailwind_config = generate_tailwind_config(request.components)
-    generated_files.append(GeneratedCode(
-        filename="tailwind.config.ts",
-        content=tailwind_config,
-        type="config"
-    ))
-    
-    return {
+async def generate_code(
+    request: GenerateRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Generate React/Next.js code from analyzed components
+
+    Identical components (e.g. the header and footer on every page) are
+    generated once into a shared file; `components` maps each input
+    component to its file. Output is memoized by a hash of the generator
+    inputs, so previously generated components are a database read.
+
+    The job's files are tracked by input hash, and `manifest` lists the
+    files added, changed and removed since the last generation. With
+    `incremental`, only added and changed files are built and returned.
+    Files are only tracked on jobs in the caller's projects; other job ids
+    just fill the shared cache.
+
+    Requires authentication.
+    """
+    job_id = await resolve_job_id(db, request.job_id, current_user)
+    css_digest = await stylesheet_digest(db, job_id)
+
+    hashes = [
+        component_hash(comp, request.target_framework, request.ui_library, css_digest)
+        for comp in request.components
+    ]
+    unique = unique_components(request.components, hashes)
+    filenames = assign_filenames(unique)
+
+    # The Tailwind config depends on every component and the job's CSS
+    current = {filenames[digest]: digest for digest in unique}
+    current[TAILWIND_CONFIG] = config_hash([*unique, css_digest], request.target_framework)
+    inputs = {filename: unique.get(digest) for filename, digest in current.items()}
+    previous: Dict[str, GeneratedComponent] = {}
+    if job_id is not None:
+        query = select(GeneratedComponent).where(GeneratedComponent.job_id == job_id)
+        if request.incremental:
+            # Unchanged files are not returned, so their code is not needed
+            query = query.options(defer(GeneratedComponent.content))
+        result = await db.execute(query)
+        previous = {row.filename: row for row in result.scalars()}
+
+    manifest = diff_manifest(
+        {filename: row.content_hash for filename, row in previous.items()},
+        current
+    )
+    outdated = manifest["added"] + manifest["changed"]
+    wanted = outdated if request.incremental else sorted(current)
+
+    contents = {}
+    if not request.incremental:
+        contents = {filename: previous[filename].content for filename in manifest["unchanged"]}
+    stored = await load_generated_components(db, {current[filename] for filename in outdated})
+    for filename in outdated:
+        if current[filename] in stored:
+            contents[filename] = stored[current[filename]]
+
+    # Generate the rest, compiled across the CPU pool for large jobs
+    missing = [filename for filename in outdated if filename not in contents]
+    components = [filename for filename in missing if inputs[filename] is not None]
+    stylesheets = await load_stylesheets(db, job_id) if missing else []
+    css_size = sum(len(sheet) for sheet in stylesheets)
+    if components:
+        # Each component only gets the job's rules that match its own DOM
+        index = await cpu_executor.run(StylesheetIndex, stylesheets, size=css_size)
+        codes = await cpu_executor.map_batched(
+            partial(generate_react_component, ui_library=request.ui_library, stylesheet=index),
+            [inputs[filename] for filename in components],
+            size=lambda comp: len(comp.get('html') or ''),
+        )
+        contents.update(zip(components, codes))
+    if TAILWIND_CONFIG in missing:
+        contents[TAILWIND_CONFIG] = await cpu_executor.run(
+            generate_tailwind_config,
+            request.components,
+            stylesheets,
+            size=css_size
+        )
+
+    # Bring the job's rows in line; unknown jobs still populate the cache
+    for filename in outdated:
+        if job_id is None and filename not in missing:
+            continue
+        row = previous.get(filename)
+        if row is None:
+            row = GeneratedComponent(job_id=job_id, filename=filename)
+            db.add(row)
+        row.component_type = inputs[filename]['type'] if inputs[filename] else "config"
+        row.content = contents[filename]
+        row.content_hash = current[filename]
+        row.generator_version = GENERATOR_VERSION
+    for filename in manifest["removed"]:
+        await db.delete(previous[filename])
+
+    generated_files = [
+        GeneratedCode(
+            filename=filename,
+            content=contents[filename],
+            type="component" if inputs[filename] else "config"
+        )
+        for filename in wanted
+    ]
+
+    # Returned as a response, so the file contents skip jsonable_encoder
+    return FastJSONResponse({
         "job_id": request.job_id,
         "files": generated_files,
-        "total_files": len(generated_files)
+        "components": [
+            ComponentFile(type=comp['type'], filename=filenames[digest])
+            for comp, digest in zip(request.components, hashes)
+        ],
+        "manifest": {key: manifest[key] for key in ("added", "changed", "removed")},
+        "total_files": len(generated_files),
+        "cache_hits": len(outdated) - len(missing)
+    })
+
+async def stylesheet_digest(db: AsyncSession, job_id) -> str:
+    """Digest of the job's scraped CSS, from the content-addressed blob keys"""
+    if job_id is None:
+        return ""
+    result = await db.execute(
+        select(func.md5(func.string_agg(
+            # Pages not yet backfilled contribute a hash of their inline CSS
+            func.coalesce(ScrapedPage.css_ref, func.md5(ScrapedPage.legacy_css), ""),
+            aggregate_order_by(literal(","), ScrapedPage.id)
+        )))
+        .where(ScrapedPage.job_id == job_id)
+    )
+    return result.scalar_one_or_none() or ""
+
+async def load_stylesheets(db: AsyncSession, job_id) -> List[str]:
+    """CSS of every page scraped by the job; pages sharing a stylesheet share a blob"""
+    if job_id is None:
+        return []
+    result = await db.execute(
+        select(ScrapedPage.css_ref, ScrapedPage.legacy_css)
+        .where(
+            ScrapedPage.job_id == job_id,
+            or_(ScrapedPage.css_ref.isnot(None), ScrapedPage.legacy_css.isnot(None))
+        )
+        .order_by(ScrapedPage.id)
+    )
+    blob_store = get_blob_store()
+    # Pages not yet backfilled have no ref, only their inline CSS
+    sources = list(dict.fromkeys(result.tuples()))
+    return list(await asyncio.gather(*(blob_store.get_text(ref, css) for ref, css in sources)))
+
+async def load_generated_components(db: AsyncSession, hashes: Iterable[str]) -> Dict[str, str]:
+    """Stored code per content hash, for the hashes that have some"""
+    stored: Dict[str, str] = {}
+    hash_list = sorted(hashes)
+
+    for i in range(0, len(hash_list), 1000):
+        result = await db.execute(
+            select(GeneratedComponent.content_hash, GeneratedComponent.content)
+            .where(GeneratedComponent.content_hash.in_(hash_list[i:i + 1000]))
+            .distinct(GeneratedComponent.content_hash)
+            .order_by(GeneratedComponent.content_hash, GeneratedComponent.created_at.desc())
+        )
+        stored.update(result.tuples())
+
+    return stored
+
+@router.get("/jobs/{job_id}/export")
+async def export_job(
+    job_id: str,
+    request: Request,
+    format: str = "zip",
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Download a job's generated Next.js project as a zip or tar.gz
+
+    The archive is built and compressed on the fly from the stored files,
+    one file at a time. Archives are reproducible, so the ETag (a hash of
+    the job's file manifest) identifies the exact bytes and interrupted
+    downloads can resume with `Range` / `If-Range`.
+
+    Requires authentication.
+    """
+    if format not in ARCHIVE_WRITERS:
+        raise ValidationError(
+            "Unsupported archive format",
+            details={"format": format, "supported": sorted(ARCHIVE_WRITERS)}
+        )
+
+    result = await db.execute(
+        select(Job.id)
+        .join(Project, Project.id == Job.project_id)
+        .where(Job.id == job_id, Project.user_id == current_user.id)
+    )
+    job_uuid = result.scalar_one_or_none()
+    if not job_uuid:
+        raise NotFoundError("Job", job_id)
+
+    result = await db.execute(
+        select(GeneratedComponent.filename, GeneratedComponent.content_hash)
+        .where(GeneratedComponent.job_id == job_uuid)
+        .order_by(GeneratedComponent.filename)
+    )
+    files = result.all()
+    if not files:
+        raise NotFoundError("Generated files for job", job_id)
+
+    writer = ARCHIVE_WRITERS[format]
+    etag = export_etag(files, format)
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="boltflow-{job_id}.{writer.extension}"'
     }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    # Only ranges need the total size; a stale If-Range means the client's
+    # partial copy is outdated and gets the whole archive
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        size = await export_size(job_uuid, format, etag)
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        # Streamed without a Content-Length, so the first byte is not held back
+        return StreamingResponse(
+            record_size(archive_chunks(job_uuid, format), etag),
+            media_type=writer.media_type,
+            headers=headers
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        slice_chunks(archive_chunks(job_uuid, format), start, end),
+        status_code=206,
+        media_type=writer.media_type,
+        headers={
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1)
+        }
+    )
+
+def export_etag(files: List[tuple], format: str) -> str:
+    """Strong ETag over the (filename, content hash) manifest and archive format"""
+    digest = hashlib.sha256(f"{format}\0{GENERATOR_VERSION}".encode())
+    for filename, content_hash in files:
+        digest.update(f"\0{filename}\0{content_hash}".encode())
+    return f'"{digest.hexdigest()}"'
+
+def project_path(filename: str, component_type: str) -> str:
+    """Location of a generated file inside the exported Next.js project"""
+    if component_type == "config":
+        return filename
+    return f"src/components/{filename}"
+
+async def archive_chunks(job_id: uuid.UUID, format: str) -> AsyncIterator[bytes]:
+    """Archive bytes for a job's files, streamed from the database one file at a time"""
+    from config.database import AsyncSessionLocal
+
+    writer = ARCHIVE_WRITERS[format]()
+    # The request session is closed once the response starts streaming
+    async with AsyncSessionLocal() as db:
+        rows = await db.stream(
+            select(
+                GeneratedComponent.filename,
+                GeneratedComponent.component_type,
+                GeneratedComponent.content
+            )
+            .where(GeneratedComponent.job_id == job_id)
+            .order_by(GeneratedComponent.filename)
+            .execution_options(yield_per=50)
+        )
+        async for filename, component_type, content in rows:
+            # Compression runs in a worker thread to keep the event loop free
+            path = project_path(filename, component_type)
+            chunk = await asyncio.to_thread(writer.add, path, content.encode())
+            if chunk:
+                yield chunk
+    yield await asyncio.to_thread(writer.close)
+
+async def record_size(chunks: AsyncIterator[bytes], etag: str) -> AsyncIterator[bytes]:
+    """Pass an archive stream through, caching its size once it completes"""
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        yield chunk
+    remember_size(etag, size)
+
+def remember_size(etag: str, size: int) -> None:
+    _export_sizes[etag] = size
+    _export_sizes.move_to_end(etag)
+    if len(_export_sizes) > EXPORT_SIZE_CACHE_ENTRIES:
+        _export_sizes.popitem(last=False)
+
+async def export_size(job_id: uuid.UUID, format: str, etag: str) -> int:
+    """Archive size in bytes, from a completed download or a counting pass over the stream"""
+    if etag in _export_sizes:
+        _export_sizes.move_to_end(etag)
+        return _export_sizes[etag]
+
+    size = 0
+    async for chunk in archive_chunks(job_id, format):
+        size += len(chunk)
 
-def generate_react_component(component: Dict, ui_library: str) -> str:
-    """Convert HTML component to React with ShadCN UI"""
-    comp_type = component['type']
-    # TODO: Parse and convert HTML to React JSX (component['html'])
-
-    # Template for React component
-    template = f'''
-import {{ Card }} from "@/components/ui/card"
-import {{ Button }} from "@/components/ui/button"
-
-export default function {comp_type.capitalize()}() {{
-  return (
-    <section className="py-12 px-4">
-      {{/* Generated from: {comp_type} */}}
-      <div className="container mx-auto">
-        {{/* Component content */}}
-      </div>
-    </section>
-  )
-}}
-'''
-    return template
-
-def generate_tailwind_config(components: List[Dict]) -> str:
-    """Generate Tailwind config with extracted design tokens"""
-    return '''
-import type { Config } from 'tailwindcss'
-
-const config: Config = {
-  content: ['./src/**/*.{ts,tsx}'],
-  theme: {
-    extend: {
-      colors: {
-        // Extracted from source
-        primary: '#0070f3',
-        secondary: '#7928ca',
-      },
-    },
-  },
-  plugins: [],
-}
-
-export default config
-'''
+    remember_size(etag, size)
+    return size
@@ -0,0 +1,117 @@
+"""
+Projects Router - Listing a user's projects and their jobs
+"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+
+from models.project import Project
+from models.job import Job
+from config.database import get_db
+from lib.auth import Principal, get_current_user
+from lib.exceptions import NotFoundError
+from lib.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+
+router = APIRouter()
+
+
+class ProjectSummary(BaseModel):
+    id: str
+    name: str
+    url: str
+    status: str
+    max_pages: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class ProjectList(BaseModel):
+    items: List[ProjectSummary]
+    next_cursor: Optional[str] = None
+
+
+class JobSummaryItem(BaseModel):
+    id: str
+    type: str
+    status: str
+    progress: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+class JobList(BaseModel):
+    items: List[JobSummaryItem]
+    next_cursor: Optional[str] = None
+
+
+@router.get("", response_model=ProjectList)
+async def list_projects(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List the current user's projects, newest first
+
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
+
+    Requires authentication.
+    """
+    rows, next_cursor = await keyset_page(
+        db,
+        select(
+            Project.id, Project.name, Project.url, Project.status,
+            Project.max_pages, Project.created_at, Project.updated_at
+        ).where(Project.user_id == current_user.id),
+        Project.created_at,
+        Project.id,
+        cursor,
+        limit
+    )
+    return ProjectList(
+        items=[ProjectSummary(**{**row._mapping, "id": str(row.id)}) for row in rows],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/{project_id}/jobs", response_model=JobList)
+async def list_jobs(
+    project_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List a project's jobs, newest first
+
+    Job results are not included; fetch them per job.
+
+    Requires authentication.
+    """
+    result = await db.execute(
+        select(Project.id).where(Project.id == project_id, Project.user_id == current_user.id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise NotFoundError("Project", project_id)
+
+    rows, next_cursor = await keyset_page(
+        db,
+        select(
+            Job.id, Job.type, Job.status, Job.progress,
+            Job.error, Job.created_at, Job.completed_at
+        ).where(Job.project_id == project_id),
+        Job.created_at,
+        Job.id,
+        cursor,
+        limit
+    )
+    return JobList(
+        items=[JobSummaryItem(**{**row._mapping, "id": str(row.id)}) for row in rows],
+        next_cursor=next_cursor
+    )
@@ -1,22 +1,31 @@
 """
 Scraper Router - Web scraping endpoints with database persistence
 """
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl, validator
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
 import structlog
 
-from models.user import User
 from models.project import Project
 from models.job import Job
 from models.scraped_page import ScrapedPage
-from config.database import get_db
+from models.job_summary import JobSummary
+from config.database import bulk_insert, get_db
 from config.settings import settings
-from lib.auth import get_current_user
+from lib.auth import Principal, get_current_user
 from lib.websocket_manager import ws_manager
+from lib.blob_store import blob_columns, get_blob_store
+from lib.cpu_executor import cpu_executor
 from lib.exceptions import NotFoundError, ValidationError
+from lib.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from lib.serialization import FastJSONResponse, dumps
 from scrapers.playwright_scraper import PlaywrightScraper
+from scrapers.search_index import extract_search_fields
 
 router = APIRouter()
 logger = structlog.get_logger(__name__)
@@ -56,11 +65,25 @@ class ScrapeResponse(BaseModel):
     message: str
 
 
+class PageSummary(BaseModel):
+    id: str
+    url: str
+    html_size: Optional[int] = None
+    css_size: Optional[int] = None
+    screenshot_size: Optional[int] = None
+    scraped_at: datetime
+
+
+class PageList(BaseModel):
+    items: List[PageSummary]
+    next_cursor: Optional[str] = None
+
+
 @router.post("/start", response_model=ScrapeResponse)
 async def start_scrape(
     request: ScrapeRequest,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -99,6 +122,7 @@ async def start_scrape(
         status="pending",
         progress=0
     )
+    job.summary = JobSummary(pages_total=request.max_pages)
     db.add(job)
     await db.commit()
     await db.refresh(job)
@@ -133,44 +157,109 @@ async def start_scrape(
 @router.get("/status/{job_id}")
 async def get_scrape_status(
     job_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get scraping job status"""
-
-    # Get job from database
-    result = await db.execute(
-        select(Job).where(Job.id == job_id)
-    )
-    job = result.scalar_one_or_none()
-
-    if not job:
-        raise NotFoundError("Job", job_id)
+    """
+    Get scraping job status
 
-    # Verify user owns this job's project
+    Served from the job summary read model in a single query. The body only
+    changes with the job, so the ETag that HTTPCacheMiddleware adds lets
+    polling with `If-None-Match` get a 304 until then; `duration_seconds`
+    is set once the job has finished.
+    """
     result = await db.execute(
-        select(Project).where(Project.id == job.project_id)
+        select(Job, JobSummary, Project.max_pages)
+        .join(Project, Project.id == Job.project_id)
+        .outerjoin(JobSummary, JobSummary.job_id == Job.id)
+        .where(Job.id == job_id, Project.user_id == current_user.id)
     )
-    project = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not project or project.user_id != current_user.id:
+    if not row:
         raise NotFoundError("Job", job_id)
 
-    # Count scraped pages
-    result = await db.execute(
-        select(ScrapedPage).where(ScrapedPage.job_id == job_id)
-    )
-    scraped_pages = result.scalars().all()
+    job, summary, max_pages = row
+    summary = summary or JobSummary(pages_scraped=0, bytes_scraped=0, error_count=0)
+    finished_at = summary.finished_at or job.completed_at
 
-    return {
+    status = {
         "job_id": str(job.id),
         "status": job.status,
         "progress": job.progress,
-        "pages_scraped": len(scraped_pages),
-        "total_pages": project.max_pages,
+        "pages_scraped": summary.pages_scraped,
+        "total_pages": summary.pages_total or max_pages,
         "progress_percentage": job.progress,
+        "bytes_scraped": summary.bytes_scraped,
+        "errors": summary.error_count,
+        "started_at": summary.started_at.isoformat() if summary.started_at else None,
+        "completed_at": finished_at.isoformat() if finished_at else None,
+        "duration_seconds": (
+            (finished_at - summary.started_at).total_seconds()
+            if summary.started_at and finished_at else None
+        ),
+        "last_event": summary.last_event,
+        "last_event_at": summary.last_event_at.isoformat() if summary.last_event_at else None,
         "error": job.error
     }
+    return FastJSONResponse(status)
+
+
+@router.get("/jobs/{job_id}/pages", response_model=PageList)
+async def list_pages(
+    job_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List a job's scraped pages, newest first
+
+    Only page sizes are listed; payloads are in the NDJSON export.
+
+    Requires authentication.
+    """
+    job_uuid = await owned_job_id(db, job_id, current_user)
+    rows, next_cursor = await keyset_page(
+        db,
+        select(
+            ScrapedPage.id, ScrapedPage.url, ScrapedPage.html_size,
+            ScrapedPage.css_size, ScrapedPage.screenshot_size, ScrapedPage.scraped_at
+        ).where(ScrapedPage.job_id == job_uuid),
+        ScrapedPage.scraped_at,
+        ScrapedPage.id,
+        cursor,
+        limit
+    )
+    return PageList(
+        items=[PageSummary(**{**row._mapping, "id": str(row.id)}) for row in rows],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/jobs/{job_id}/pages/export")
+async def export_pages(
+    job_id: str,
+    payloads: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Export a job's scraped pages as NDJSON, one page per line
+
+    Rows are read from a server-side cursor and written as they arrive, so
+    memory use does not grow with the job. With `payloads=true` each line
+    also carries the page's html, css and screenshot from the blob store.
+
+    Requires authentication.
+    """
+    job_uuid = await owned_job_id(db, job_id, current_user)
+    return StreamingResponse(
+        page_lines(job_uuid, payloads),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="pages-{job_id}.ndjson"'}
+    )
 
 
 async def run_scraper(
@@ -190,6 +279,8 @@ async def run_scraper(
             result = await db.execute(select(Job).where(Job.id == job_id))
             job = result.scalar_one()
             job.status = "running"
+            summary = await get_job_summary(db, job)
+            summary.record("scrape:started", started_at=datetime.utcnow())
             await db.commit()
 
             # Send initial WebSocket notification
@@ -209,6 +300,11 @@ async def run_scraper(
             async def progress_callback(progress_data):
                 # Update job progress
                 job.progress = progress_data.get("percentage", 0)
+                summary.record(
+                    "scrape:progress",
+                    pages_scraped=progress_data.get("pages_scraped", summary.pages_scraped),
+                    pages_total=progress_data.get("total_pages", summary.pages_total)
+                )
                 await db.commit()
 
                 # Broadcast progress
@@ -228,23 +324,45 @@ async def run_scraper(
                 progress_callback=progress_callback
             )
 
-            # Save scraped pages to database
-            if "pages" in result_data:
-                for page_data in result_data["pages"]:
-                    scraped_page = ScrapedPage(
-                        job_id=job.id,
-                        url=page_data.get("url"),
-                        html=page_data.get("html"),
-                        css=page_data.get("css"),
-                        screenshot=page_data.get("screenshot"),
-                        metadata=page_data.get("metadata", {})
-                    )
-                    db.add(scraped_page)
-
-            # Update job as completed
+            # Save scraped pages: payloads go to the blob store, rows keep references
+            blob_store = get_blob_store()
+            pages = result_data.get("pages", [])
+            # Search fields are indexed with the rows, so pages are searchable once saved
+            search_fields = await cpu_executor.map_batched(
+                extract_search_fields,
+                [page_data.get("html") for page_data in pages],
+                size=lambda html: len(html or "")
+            )
+            page_rows, bytes_saved = [], 0
+            for page_data, fields in zip(pages, search_fields):
+                html, css, screenshot = await asyncio.gather(
+                    blob_store.put_text(page_data.get("html")),
+                    blob_store.put_text(page_data.get("css")),
+                    blob_store.put_text(page_data.get("screenshot"))
+                )
+                page_rows.append({
+                    "job_id": job.id,
+                    "url": page_data.get("url"),
+                    **blob_columns("html", html),
+                    **blob_columns("css", css),
+                    **blob_columns("screenshot", screenshot),
+                    "page_metadata": page_data.get("metadata", {}),
+                    **fields
+                })
+                bytes_saved += sum(ref.size for ref in (html, css, screenshot) if ref)
+            pages_saved = await bulk_insert(db, ScrapedPage, page_rows)
+
+            # Update job as completed; page payloads are not duplicated into the result
             job.status = "completed"
             job.progress = 100
-            job.result = result_data
+            job.result = summarize_scrape(result_data)
+            job.completed_at = datetime.utcnow()
+            summary.record(
+                "scrape:completed",
+                pages_scraped=pages_saved,
+                bytes_scraped=bytes_saved,
+                finished_at=job.completed_at
+            )
 
             # Update project status
             result = await db.execute(select(Project).where(Project.id == project_id))
@@ -264,15 +382,27 @@ async def run_scraper(
                 "type": "scrape:completed",
                 "job_id": job_id,
                 "project_id": project_id,
-                "result": result_data
+                "result": job.result
             })
 
         except Exception as e:
             logger.error("scraper_failed", job_id=job_id, error=str(e), exc_info=True)
 
+            # The failed statement may have left the session unusable, and
+            # rolling back expires the loaded job
+            await db.rollback()
+            result = await db.execute(select(Job).where(Job.id == job_id))
+            job = result.scalar_one()
+
             # Update job with error
             job.status = "failed"
             job.error = str(e)
+            summary = await get_job_summary(db, job)
+            summary.record(
+                "scrape:error",
+                error_count=summary.error_count + 1,
+                finished_at=datetime.utcnow()
+            )
             await db.commit()
 
             # Send error notification
@@ -282,3 +412,87 @@ async def run_scraper(
                 "project_id": project_id,
                 "error": str(e)
             })
+
+
+PAGE_PAYLOAD_KEYS = ("html", "css", "screenshot")
+
+
+def summarize_scrape(result_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Scrape result without page payloads, which are stored as blobs"""
+    pages = [
+        {key: value for key, value in page.items() if key not in PAGE_PAYLOAD_KEYS}
+        for page in result_data.get("pages", [])
+    ]
+    return {**result_data, "pages": pages, "pages_scraped": len(pages)}
+
+
+async def get_job_summary(db: AsyncSession, job: Job) -> JobSummary:
+    """The job's summary row, created for jobs that predate summaries"""
+    result = await db.execute(select(JobSummary).where(JobSummary.job_id == job.id))
+    summary = result.scalar_one_or_none()
+    if summary is None:
+        summary = JobSummary(job_id=job.id, pages_scraped=0, bytes_scraped=0, error_count=0)
+        db.add(summary)
+    return summary
+
+
+async def owned_job_id(db: AsyncSession, job_id: str, user: Principal):
+    """The job's id if it belongs to the user's project, else NotFoundError"""
+    result = await db.execute(
+        select(Job.id)
+        .join(Project, Project.id == Job.project_id)
+        .where(Job.id == job_id, Project.user_id == user.id)
+    )
+    job_uuid = result.scalar_one_or_none()
+    if job_uuid is None:
+        raise NotFoundError("Job", job_id)
+    return job_uuid
+
+
+PAGE_EXPORT_BATCH = 500
+
+
+async def page_lines(job_id, payloads: bool) -> AsyncIterator[bytes]:
+    """A job's pages as NDJSON lines, oldest first"""
+    from config.database import AsyncSessionLocal
+
+    # Pages that have not been backfilled yet keep their payloads inline
+    sizes = [
+        func.coalesce(
+            getattr(ScrapedPage, f"{key}_size"),
+            func.octet_length(getattr(ScrapedPage, f"legacy_{key}"))
+        ).label(f"{key}_size")
+        for key in PAGE_PAYLOAD_KEYS
+    ]
+    legacy = [getattr(ScrapedPage, f"legacy_{key}") for key in PAGE_PAYLOAD_KEYS] if payloads else []
+
+    # The request session is closed once the response starts streaming
+    async with AsyncSessionLocal() as db:
+        rows = await db.stream(
+            select(
+                ScrapedPage.id, ScrapedPage.url, ScrapedPage.page_metadata, ScrapedPage.scraped_at,
+                *(getattr(ScrapedPage, f"{key}_ref") for key in PAGE_PAYLOAD_KEYS),
+                *sizes,
+                *legacy
+            )
+            .where(ScrapedPage.job_id == job_id)
+            .order_by(ScrapedPage.scraped_at, ScrapedPage.id)
+            .execution_options(yield_per=PAGE_EXPORT_BATCH)
+        )
+        blob_store = get_blob_store()
+        async for row in rows:
+            page = {
+                "id": str(row.id),
+                "url": row.url,
+                "metadata": row.page_metadata,
+                "scraped_at": row.scraped_at.isoformat()
+            }
+            for key in PAGE_PAYLOAD_KEYS:
+                page[f"{key}_size"] = getattr(row, f"{key}_size")
+            if payloads:
+                texts = await asyncio.gather(*(
+                    blob_store.get_text(getattr(row, f"{key}_ref"), getattr(row, f"legacy_{key}"))
+                    for key in PAGE_PAYLOAD_KEYS
+                ))
+                page.update(zip(PAGE_PAYLOAD_KEYS, texts))
+            yield dumps(page) + b"\n"
@@ -0,0 +1,129 @@
+"""
+Search Router - Full-text and structural search over scraped pages
+"""
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, literal, literal_column, select
+from typing import List, Optional
+
+from models.project import Project
+from models.job import Job
+from models.scraped_page import ScrapedPage
+from config.database import get_db
+from lib.auth import Principal, get_current_user
+from lib.exceptions import ValidationError
+from scrapers.search_index import structure_query_tokens
+
+router = APIRouter()
+
+# Must match the configuration in ScrapedPage.search_vector
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=24, MinWords=8"
+
+MAX_RESULTS = 100
+
+
+class SearchHit(BaseModel):
+    page_id: str
+    job_id: str
+    project_id: str
+    url: str
+    title: Optional[str] = None
+    rank: float
+    snippet: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    query: Optional[str] = None
+    selectors: List[str]
+    hits: List[SearchHit]
+
+
+@router.get("/pages", response_model=SearchResponse)
+async def search_pages(
+    q: Optional[str] = None,
+    selector: List[str] = Query([]),
+    project_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_RESULTS),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search the current user's scraped pages
+
+    - **q**: Text to find, in web-search syntax (`"exact phrase"`, `-exclude`, `or`)
+    - **selector**: Elements the page must contain, e.g. `form.newsletter`,
+      `input[type=email]`, `#signup`; repeat to require several
+    - **project_id** / **job_id**: Restrict to one project or job
+
+    Text hits are ranked and come with highlighted snippets. Both filters
+    are answered from GIN indexes rather than by scanning page HTML.
+
+    Requires authentication.
+    """
+    if not q and not selector:
+        raise ValidationError("Provide a search query or a selector", details={"fields": ["q", "selector"]})
+
+    tokens = []
+    for text in selector:
+        try:
+            tokens += structure_query_tokens(text)
+        except ValueError as e:
+            raise ValidationError(str(e), details={"field": "selector", "selector": text})
+
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q) if q else None
+    rank = func.ts_rank_cd(ScrapedPage.search_vector, tsquery) if q else literal(0.0)
+
+    matches = (
+        select(ScrapedPage.id, Job.project_id, rank.label("rank"))
+        .join(Job, Job.id == ScrapedPage.job_id)
+        .join(Project, Project.id == Job.project_id)
+        .where(Project.user_id == current_user.id)
+    )
+    if q:
+        matches = matches.where(ScrapedPage.search_vector.op("@@")(tsquery))
+    if tokens:
+        matches = matches.where(ScrapedPage.structure_tokens.contains(sorted(set(tokens))))
+    if project_id:
+        matches = matches.where(Job.project_id == project_id)
+    if job_id:
+        matches = matches.where(ScrapedPage.job_id == job_id)
+    matches = (
+        matches.order_by(rank.desc(), ScrapedPage.scraped_at.desc())
+        .limit(limit)
+        .cte("matches")
+    )
+
+    # Headlines re-parse the text, so they are only built for the returned pages
+    snippet = (
+        func.ts_headline(SEARCH_CONFIG, ScrapedPage.search_text, tsquery, HEADLINE_OPTIONS)
+        if q else literal(None)
+    )
+    result = await db.execute(
+        select(
+            ScrapedPage.id, ScrapedPage.job_id, matches.c.project_id,
+            ScrapedPage.url, ScrapedPage.title, matches.c.rank, snippet.label("snippet")
+        )
+        .join(matches, matches.c.id == ScrapedPage.id)
+        .order_by(matches.c.rank.desc(), ScrapedPage.scraped_at.desc())
+    )
+
+    return SearchResponse(
+        query=q,
+        selectors=selector,
+        hits=[
+            SearchHit(
+                page_id=str(row.id),
+                job_id=str(row.job_id),
+                project_id=str(row.project_id),
+                url=row.url,
+                title=row.title,
+                rank=row.rank,
+                snippet=row.snippet
+            )
+            for row in result
+        ]
+    )
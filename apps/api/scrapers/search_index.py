@@ -0,0 +1,104 @@
+"""Search fields extracted from scraped pages: visible text and structure tokens"""
+import re
+from typing import Any, Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+from lxml.etree import ParserError
+
+from generators.css_pruner import parse_compound
+
+# Postgres caps a tsvector at 1MB; visible text beyond this adds little recall
+SEARCH_TEXT_LIMIT = 200_000
+
+# Elements whose text is never rendered
+HIDDEN_TAGS = {"script", "style", "noscript", "template", "head", "svg"}
+
+# Attributes whose values are worth indexing as `tag[name=value]` tokens
+TOKEN_ATTRIBUTES = {"type", "role", "name"}
+
+_WHITESPACE = re.compile(r"\s+")
+# lxml refuses str input that declares its own encoding (XHTML pages)
+_XML_DECLARATION = re.compile(r"^\ufeff?\s*<\?xml[^>]*\?>")
+
+
+def element_tokens(element) -> List[str]:
+    """Structure tokens for one element: tag, #id, .class, tag.class, tag[attr=value]"""
+    tag = element.tag
+    tokens = [tag]
+    element_id = element.get("id")
+    if element_id:
+        tokens += [f"#{element_id}", f"{tag}#{element_id}"]
+    for cls in (element.get("class") or "").split():
+        tokens += [f".{cls}", f"{tag}.{cls}"]
+    for name in TOKEN_ATTRIBUTES:
+        value = element.get(name)
+        if value:
+            tokens += [f"[{name}={value.lower()}]", f"{tag}[{name}={value.lower()}]"]
+    return tokens
+
+
+def extract_search_fields(html: Optional[str]) -> Dict[str, Any]:
+    """
+    Title, visible text and the set of structure tokens of a page
+
+    Text from hidden elements (scripts, styles, templates) is dropped and
+    whitespace collapsed. Structure tokens let searches ask for pages
+    containing e.g. `form.newsletter` or `input[type=email]` without
+    touching the HTML.
+    """
+    empty = {"title": None, "search_text": None, "structure_tokens": []}
+    if not html:
+        return empty
+    try:
+        root = lxml.html.document_fromstring(_XML_DECLARATION.sub("", html, count=1))
+    except (ParserError, ValueError):
+        return empty
+
+    title = root.findtext(".//title")
+    etree.strip_elements(root, etree.Comment, etree.ProcessingInstruction, with_tail=False)
+    for element in list(root.iter(*HIDDEN_TAGS)):
+        element.drop_tree()  # keeps the tail text
+
+    tokens = set()
+    for element in root.iter(tag=etree.Element):
+        if element.tag not in ("html", "body"):
+            tokens.update(element_tokens(element))
+
+    # itertext keeps neighbouring blocks apart, unlike text_content()
+    text = _WHITESPACE.sub(" ", " ".join(root.itertext())).strip()
+    title = _WHITESPACE.sub(" ", title).strip() if title else ""
+    return {
+        "title": title or None,
+        "search_text": text[:SEARCH_TEXT_LIMIT] or None,
+        "structure_tokens": sorted(tokens),
+    }
+
+
+def structure_query_tokens(selector: str) -> List[str]:
+    """
+    Tokens a page must contain to match a compound selector like `form.newsletter`
+
+    Each class, id and attribute is paired with the tag, so `form.a.b` finds
+    pages with a `form.a` and a `form.b` element (usually the same one).
+    Raises ValueError for selectors beyond a single compound.
+    """
+    parsed = parse_compound(selector.strip(), subject=True)
+    if parsed is None or not selector.strip():
+        raise ValueError(f"Unsupported structural selector {selector!r}")
+    compound, _, variants = parsed
+    if variants or compound.pseudos:
+        raise ValueError(f"Unsupported structural selector {selector!r}")
+
+    prefix = compound.tag or ""
+    tokens = [compound.tag] if compound.tag else []
+    if compound.id:
+        tokens.append(f"{prefix}#{compound.id}")
+    tokens += [f"{prefix}.{cls}" for cls in compound.classes]
+    for name, operator, value in compound.attributes:
+        if operator != "=" or name not in TOKEN_ATTRIBUTES:
+            raise ValueError(f"Only [{'|'.join(sorted(TOKEN_ATTRIBUTES))}=value] attributes are indexed")
+        tokens.append(f"{prefix}[{name}={value.lower()}]")
+    if not tokens:
+        raise ValueError(f"Unsupported structural selector {selector!r}")
+    return tokens
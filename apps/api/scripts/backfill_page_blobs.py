@@ -0,0 +1,80 @@
+"""
+Move scraped page payloads from the legacy inline columns into the blob store
+
+Pages scraped before the blob store kept their HTML, CSS and screenshot in
+the `html`, `css` and `screenshot` columns. This adds the `*_ref`/`*_size`
+columns if the table predates them, then, batch by batch, writes each
+page's payloads to the blob store, records the refs and clears the inline
+columns. Every batch is committed and only pages that still have an inline
+payload are picked up, so it can be interrupted and re-run:
+
+    DATABASE_URL=postgresql://... python -m scripts.backfill_page_blobs --batch-size 200
+"""
+import argparse
+import asyncio
+from typing import Any, Dict
+
+from sqlalchemy import or_, select, text, update
+
+from config.database import AsyncSessionLocal
+from lib.blob_store import blob_columns, get_blob_store
+from models.scraped_page import ScrapedPage
+
+PAYLOAD_KEYS = ("html", "css", "screenshot")
+
+ADD_BLOB_COLUMNS = [
+    statement
+    for key in PAYLOAD_KEYS
+    for statement in (
+        f"ALTER TABLE scraped_pages ADD COLUMN IF NOT EXISTS {key}_ref VARCHAR(80)",
+        f"ALTER TABLE scraped_pages ADD COLUMN IF NOT EXISTS {key}_size INTEGER",
+    )
+]
+
+LEGACY_COLUMNS = [getattr(ScrapedPage, f"legacy_{key}") for key in PAYLOAD_KEYS]
+
+
+async def move_page(db, row) -> None:
+    blob_store = get_blob_store()
+    values: Dict[Any, Any] = {}
+    for key, column in zip(PAYLOAD_KEYS, LEGACY_COLUMNS):
+        payload = getattr(row, column.key)
+        if payload is None:
+            continue
+        ref = await blob_store.put_text(payload)
+        for name, value in blob_columns(key, ref).items():
+            values[getattr(ScrapedPage, name)] = value
+        values[column] = None
+    await db.execute(update(ScrapedPage).where(ScrapedPage.id == row.id).values(values))
+
+
+async def main(batch_size: int) -> None:
+    moved = 0
+    async with AsyncSessionLocal() as db:
+        for statement in ADD_BLOB_COLUMNS:
+            await db.execute(text(statement))
+        await db.commit()
+
+        while True:
+            result = await db.execute(
+                select(ScrapedPage.id, *LEGACY_COLUMNS)
+                .where(or_(*(column.isnot(None) for column in LEGACY_COLUMNS)))
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for row in rows:
+                await move_page(db, row)
+            await db.commit()
+            moved += len(rows)
+            print(f"moved {moved} pages")
+
+    print(f"done: {moved} pages moved to the blob store")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
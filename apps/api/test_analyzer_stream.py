@@ -0,0 +1,52 @@
+"""Tests for the streaming analysis endpoint"""
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import analyzer
+
+
+class FakeAnalyzer:
+    async def analyze(self, html, css=None):
+        return {
+            "page_type": "static",
+            "sections": [
+                {"type": "header", "html": "<header><nav><a href='/'>Home</a></nav></header>"},
+                {"type": "hero", "html": "<div><p>Welcome</p></div>", "confidence": 0.7},
+            ],
+        }
+
+
+class FakeClassifier(analyzer.ComponentClassifier):
+    def __init__(self):
+        super().__init__(client=object())
+
+    async def get_embedding(self, text):
+        return [0.0]
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(analyzer.router, prefix="/api/analyzer")
+    app.dependency_overrides[analyzer.get_analyzer] = FakeAnalyzer
+    app.dependency_overrides[analyzer.get_classifier] = FakeClassifier
+    return TestClient(app)
+
+
+def test_stream_emits_page_type_components_and_summary():
+    response = make_client().post(
+        "/api/analyzer/analyze/stream",
+        json={"job_id": "job-1", "html": "<html></html>"},
+    )
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == ["page_type", "component", "component", "summary"]
+    assert events[0]["page_type"] == "static"
+
+    components = {e["index"]: e["component"] for e in events[1:3]}
+    assert components[0]["type"] == "header"
+    assert components[1]["type"] == "hero"
+    assert components[1]["confidence"] == 0.7
+    assert events[-1]["component_count"] == 2
@@ -0,0 +1,61 @@
+"""Tests for streaming project archives"""
+import asyncio
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from generators.archive import ARCHIVE_WRITERS, parse_range, slice_chunks
+
+FILES = [("src/components/Header.tsx", b"export default function Header() {}\n" * 50), ("tailwind.config.ts", b"{}")]
+
+
+def build(format):
+    writer = ARCHIVE_WRITERS[format]()
+    chunks = [writer.add(path, data) for path, data in FILES]
+    chunks.append(writer.close())
+    return chunks
+
+
+@pytest.mark.parametrize("format", ["zip", "tar.gz"])
+def test_archives_are_reproducible(format):
+    assert b"".join(build(format)) == b"".join(build(format))
+
+
+def test_zip_contents():
+    with zipfile.ZipFile(io.BytesIO(b"".join(build("zip")))) as archive:
+        assert archive.namelist() == [path for path, _ in FILES]
+        assert archive.read("tailwind.config.ts") == b"{}"
+
+
+def test_tar_gz_contents():
+    with tarfile.open(fileobj=io.BytesIO(b"".join(build("tar.gz"))), mode="r:gz") as archive:
+        assert archive.getnames() == [path for path, _ in FILES]
+        assert archive.extractfile("src/components/Header.tsx").read() == FILES[0][1]
+
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+def test_slice_chunks_matches_byte_slice():
+    chunks = build("zip")
+    data = b"".join(chunks)
+
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect(start, end):
+        return b"".join([part async for part in slice_chunks(source(), start, end)])
+
+    for start, end in [(0, 10), (5, len(data) - 1), (len(data) // 2, len(data) // 2)]:
+        assert asyncio.run(collect(start, end)) == data[start:end + 1]
@@ -0,0 +1,103 @@
+"""Tests for cached principal resolution"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+
+from lib import auth
+from lib.auth import Principal, PrincipalCache, create_access_token, decode_token, get_current_user
+from models.user import User
+
+
+def make_principal(user_id=None):
+    return Principal(id=user_id or uuid.uuid4(), email="a@example.com", name="A", created_at=datetime(2024, 1, 1))
+
+
+def test_cache_hit_miss_and_ttl():
+    cache = PrincipalCache(ttl=60, max_entries=10)
+    principal = make_principal()
+    assert cache.get("t1", str(principal.id)) is None
+
+    cache.put("t1", principal)
+    assert cache.get("t1", str(principal.id)) is principal
+    # A token ID presented with another subject is never served
+    assert cache.get("t1", str(uuid.uuid4())) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    expired = PrincipalCache(ttl=0, max_entries=10)
+    expired.put("t1", principal)
+    assert expired.get("t1", str(principal.id)) is None
+    assert len(expired) == 0
+
+
+def test_cache_never_outlives_the_token():
+    cache = PrincipalCache(ttl=60, max_entries=10)
+    principal = make_principal()
+    cache.put("t1", principal, token_expires_at=time.time() - 1)
+    assert cache.get("t1", str(principal.id)) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PrincipalCache(ttl=60, max_entries=2)
+    first, second, third = make_principal(), make_principal(), make_principal()
+    cache.put("t1", first)
+    cache.put("t2", second)
+    cache.get("t1", str(first.id))
+    cache.put("t3", third)
+    assert cache.get("t2", str(second.id)) is None
+    assert cache.get("t1", str(first.id)) is first
+
+
+def test_invalidate_user_drops_all_their_tokens():
+    cache = PrincipalCache(ttl=60, max_entries=10)
+    principal, other = make_principal(), make_principal()
+    cache.put("t1", principal)
+    cache.put("t2", principal)
+    cache.put("t3", other)
+    cache.invalidate_user(principal.id)
+    assert len(cache) == 1
+    assert cache.get("t3", str(other.id)) is other
+
+
+def test_user_changes_invalidate_cache():
+    assert event.contains(User, "after_update", auth._invalidate_principal)
+    assert event.contains(User, "after_delete", auth._invalidate_principal)
+
+
+class FakeResult:
+    def __init__(self, user):
+        self.user = user
+
+    def scalar_one_or_none(self):
+        return self.user
+
+
+class FakeSession:
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        return FakeResult(self.user)
+
+
+def test_get_current_user_reads_database_once_per_token(monkeypatch):
+    monkeypatch.setattr(auth, "principal_cache", PrincipalCache(ttl=60, max_entries=10))
+    user = User(id=uuid.uuid4(), email="a@example.com", name="A", created_at=datetime(2024, 1, 1))
+    session = FakeSession(user)
+    token = create_access_token({"sub": str(user.id)})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    first = asyncio.run(get_current_user(credentials, session))
+    second = asyncio.run(get_current_user(credentials, session))
+    assert first == second == Principal.from_user(user)
+    assert session.queries == 1
+    assert decode_token(token)["jti"]
+
+    auth._invalidate_principal(None, None, user)
+    asyncio.run(get_current_user(credentials, session))
+    assert session.queries == 2
@@ -0,0 +1,124 @@
+"""Tests for the content-addressed blob store"""
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+
+from lib import blob_store
+from lib.blob_store import BlobStore, LazyBlob, LocalBlobStore, S3BlobStore, blob_columns, decompress
+
+
+def test_local_roundtrip_is_compressed_and_deduplicated(tmp_path):
+    store = LocalBlobStore(str(tmp_path), codec="gzip")
+    html = "<html>" + "<p>same</p>" * 1000 + "</html>"
+
+    first = asyncio.run(store.put_text(html))
+    second = asyncio.run(store.put_text(html))
+
+    assert first == second
+    assert first.key.endswith(".gz")
+    assert first.size == len(html)
+    files = [path for path in Path(tmp_path).rglob("*") if path.is_file()]
+    assert len(files) == 1
+    assert files[0].stat().st_size < first.size / 10
+    assert asyncio.run(store.get_text(first.key)) == html
+    assert asyncio.run(store.put_text(None)) is None
+
+
+def test_lazy_blob_reads_once(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path), codec="gzip")
+    monkeypatch.setattr(blob_store, "_store", store)
+    ref = asyncio.run(store.put_text("body { color: red }"))
+
+    class Page:
+        css = LazyBlob("css_ref", "css_size")
+
+        def __init__(self, **columns):
+            self.__dict__.update(columns)
+
+    page = Page(**blob_columns("css", ref))
+    assert page.css.size == ref.size
+    assert page.css is page.css
+    assert asyncio.run(page.css.text()) == "body { color: red }"
+
+    Path(store._file(ref.key)).unlink()
+    # Served from the handle after the first read
+    assert asyncio.run(page.css.text()) == "body { color: red }"
+
+
+def test_lazy_blob_falls_back_to_the_legacy_column(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path), codec="gzip")
+    monkeypatch.setattr(blob_store, "_store", store)
+
+    class Page:
+        html = LazyBlob("html_ref", "html_size", "legacy_html")
+
+        def __init__(self, **columns):
+            self.__dict__.update(columns)
+
+    page = Page(**blob_columns("html", None), legacy_html="<p>café</p>")
+    assert page.html.size == len("<p>café</p>".encode())
+    assert asyncio.run(page.html.text()) == "<p>café</p>"
+    assert asyncio.run(store.get_text(None, page.legacy_html)) == "<p>café</p>"
+
+    # Once backfilled, the blob is read instead
+    ref = asyncio.run(store.put_text("<p>moved</p>"))
+    page.__dict__.update(blob_columns("html", ref), legacy_html=None)
+    assert asyncio.run(page.html.text()) == "<p>moved</p>"
+    assert asyncio.run(Page(**blob_columns("html", None), legacy_html=None).html.text()) is None
+
+
+class FakeS3Client:
+    """The slice of the boto3 S3 client the store uses, backed by a dict"""
+
+    def __init__(self):
+        self.objects = {}
+        self.puts = 0
+
+    def get_object(self, Bucket, Key):
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.puts += 1
+        self.objects[(Bucket, Key)] = Body
+
+    def head_object(self, Bucket, Key):
+        from botocore.exceptions import ClientError
+
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+def test_s3_backend_roundtrip_and_deduplication():
+    client = FakeS3Client()
+    store = S3BlobStore("blobs", prefix="pages/", codec="gzip", client=client)
+
+    ref = asyncio.run(store.put(b"payload"))
+    again = asyncio.run(store.put(b"payload"))
+
+    assert again == ref
+    assert client.puts == 1
+    assert list(client.objects) == [("blobs", f"pages/{ref.key[:2]}/{ref.key[2:4]}/{ref.key}")]
+    assert asyncio.run(store.get(ref.key)) == b"payload"
+
+    asyncio.run(store.delete(ref.key))
+    assert client.objects == {}
+
+
+def test_unknown_codec_extension_names_the_key():
+    with pytest.raises(ValueError, match="abc.lz4"):
+        decompress(b"", "abc.lz4")
+
+
+def test_backends_must_implement_storage():
+    class Partial(BlobStore):
+        def _read(self, key):
+            return b""
+
+    with pytest.raises(TypeError):
+        Partial()
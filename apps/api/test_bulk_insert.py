@@ -0,0 +1,101 @@
+"""Tests for the bulk ingest path"""
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from config import database
+from config.database import bulk_insert, bulk_records
+from models.component_pattern import ComponentPattern
+from models.scraped_page import ScrapedPage
+
+
+def test_records_apply_defaults_and_column_names():
+    job_id = uuid.uuid4()
+    rows = [
+        {"job_id": job_id, "url": "https://example.com/", "page_metadata": {"title": "Home"}},
+        {"job_id": job_id, "url": "https://example.com/about", "html_ref": "ab.zst", "html_size": 10},
+    ]
+    columns, records = bulk_records(ScrapedPage, rows, asyncpg_dialect())
+
+    assert "metadata" in columns and "page_metadata" not in columns
+    assert {"id", "scraped_at", "html_ref"} <= set(columns)
+    first, second = (dict(zip(columns, record)) for record in records)
+    assert first["id"] != second["id"]
+    assert isinstance(first["scraped_at"], datetime)
+    assert json.loads(first["metadata"]) == {"title": "Home"}
+    assert first["html_ref"] is None and second["html_ref"] == "ab.zst"
+
+
+def test_records_reject_unknown_columns():
+    with pytest.raises(TypeError):
+        bulk_records(ComponentPattern, [{"type": "hero", "colour": "red"}], asyncpg_dialect())
+
+
+class FakeSession:
+    def __init__(self):
+        self.added = []
+        self.flushes = 0
+
+    def add_all(self, objects):
+        self.added.extend(objects)
+
+    async def flush(self):
+        self.flushes += 1
+
+    async def connection(self):
+        raise AssertionError("small writes should not touch the raw connection")
+
+
+def test_small_writes_use_orm():
+    session = FakeSession()
+    rows = [{"type": "hero"}, {"type": "footer"}]
+    assert asyncio.run(bulk_insert(session, ComponentPattern, rows)) == 2
+    assert [pattern.type for pattern in session.added] == ["hero", "footer"]
+    assert session.flushes == 1
+    assert asyncio.run(bulk_insert(session, ComponentPattern, [])) == 0
+
+
+class FakeDriver:
+    def __init__(self):
+        self.copies = []
+
+    async def copy_records_to_table(self, table, schema_name=None, columns=None, records=None):
+        self.copies.append((table, columns, records))
+
+
+class FakeConnection:
+    def __init__(self, driver):
+        self.dialect = asyncpg_dialect()
+        self.driver = driver
+        self.statements = []
+
+    async def exec_driver_sql(self, statement):
+        self.statements.append(statement)
+
+    async def get_raw_connection(self):
+        return type("Fairy", (), {"driver_connection": self.driver})()
+
+
+def test_large_writes_copy_in_batches(monkeypatch):
+    monkeypatch.setattr(database, "BULK_INSERT_MIN_ROWS", 3)
+    driver = FakeDriver()
+    connection = FakeConnection(driver)
+    session = FakeSession()
+
+    async def get_connection():
+        return connection
+
+    session.connection = get_connection
+    rows = [{"type": f"pattern-{i}"} for i in range(5)]
+    assert asyncio.run(bulk_insert(session, ComponentPattern, rows, batch_size=2)) == 5
+
+    assert session.added == [] and session.flushes == 1
+    assert connection.statements == ["SELECT 1"]
+    assert [len(records) for _, _, records in driver.copies] == [2, 2, 1]
+    table, columns, records = driver.copies[0]
+    assert table == "component_patterns"
+    assert dict(zip(columns, records[0]))["type"] == "pattern-0"
@@ -0,0 +1,46 @@
+"""Tests for the size-aware CPU executor"""
+import asyncio
+
+from ai.fingerprint import page_fingerprint
+from lib.cpu_executor import CPUExecutor
+
+PAGES = ["<html><body><p>x</p></body></html>", "<html><body>" + "<div><p>y</p></div>" * 200 + "</body></html>"]
+
+
+def test_runs_inline_before_start():
+    executor = CPUExecutor()
+    result = asyncio.run(executor.map(page_fingerprint, PAGES))
+
+    assert result == [page_fingerprint(page) for page in PAGES]
+    assert executor.metrics()["inline_calls"] == 2
+    assert executor.metrics()["offloaded_calls"] == 0
+
+
+def test_offloads_large_inputs():
+    executor = CPUExecutor()
+    executor.start(max_workers=1, inline_threshold=1000)
+    try:
+        result = asyncio.run(executor.map(page_fingerprint, PAGES))
+    finally:
+        executor.shutdown()
+
+    assert result == [page_fingerprint(page) for page in PAGES]
+    metrics = executor.metrics()
+    assert metrics["inline_calls"] == 1
+    assert metrics["offloaded_calls"] == 1
+    assert metrics["in_flight"] == 0
+    assert not metrics["running"]
+
+
+def test_map_batched_chunks_small_items():
+    executor = CPUExecutor()
+    executor.start(max_workers=1, inline_threshold=1000)
+    try:
+        pages = PAGES * 3
+        result = asyncio.run(executor.map_batched(page_fingerprint, pages))
+    finally:
+        executor.shutdown()
+
+    assert result == [page_fingerprint(page) for page in pages]
+    assert executor.metrics()["offloaded_calls"] == len(pages)
+    assert executor.metrics()["inline_calls"] == 0
@@ -0,0 +1,80 @@
+"""Tests for per-component CSS pruning"""
+import lxml.html
+
+from generators.css_pruner import StylesheetIndex, parse_selector
+from generators.jsx import generate_react_component
+
+CSS = """
+/* base */
+@import url("fonts.css");
+body { font-family: Inter }
+body .hero h1 { font-size: 48px }
+.hero { padding: 2rem 1rem; background: url("a;b.png") }
+.hero > .title, #main-title { color: #111; }
+.hero .title { color: #222 !important }
+.btn:hover { background-color: #1d4ed8 }
+.card:hover .title { color: red }
+li:nth-child(2n+1) { margin: 0 }
+li:not(.active) { opacity: .5 }
+input[type="email"] { border-width: 1px }
+@media (min-width: 768px) { .hero { padding: 4rem 2rem } }
+@keyframes spin { from { transform: rotate(0) } to { transform: rotate(360deg) } }
+.unused { color: blue }
+"""
+
+HTML = (
+    '<section class="hero"><h1 id="main-title" class="title">Hi</h1><a class="btn" href="#">Go</a>'
+    '<ul><li class="active">1</li><li>2</li><li>3</li></ul><input type="email"></section>'
+)
+
+
+def classes_by_element(index, html):
+    root = lxml.html.fragment_fromstring(html, create_parent="div")
+    return {
+        (element.tag, element.text): classes
+        for element, classes in index.tailwind_classes(root).items()
+    }
+
+
+def test_index_files_rules_by_rightmost_compound():
+    index = StylesheetIndex([CSS])
+
+    assert set(index.by_id) == {"main-title"}
+    assert set(index.by_class) == {"hero", "title", "btn", "unused"}
+    assert set(index.by_tag) == {"body", "h1", "li", "input"}
+    # Rules depending on another element's runtime state are skipped
+    assert index.skipped_selectors == 1
+
+
+def test_keeps_only_matching_rules_with_cascade():
+    classes = classes_by_element(StylesheetIndex([CSS]), HTML)
+
+    assert classes[("section", None)] == [
+        "[padding:2rem_1rem]", '[background:url("a;b.png")]', "[@media(min-width:768px)]:[padding:4rem_2rem]",
+    ]
+    assert classes[("h1", "Hi")] == ["![color:#222]", "[font-size:48px]"]
+    assert classes[("a", "Go")] == ["hover:[background-color:#1d4ed8]"]
+    assert classes[("li", "2")] == ["[opacity:.5]"]
+    assert classes[("li", "3")] == ["[margin:0]", "[opacity:.5]"]
+    assert classes[("li", "1")] == ["[margin:0]"]
+    assert classes[("input", None)] == ["[border-width:1px]"]
+    assert not any("blue" in cls for values in classes.values() for cls in values)
+
+
+def test_selector_parsing():
+    selector = parse_selector("ul > li:nth-child(2n+1) ~ a[title='x y']::before")
+    assert selector.combinators == (">", "~")
+    assert selector.specificity == (0, 2, 4)
+    assert selector.variants == ("before",)
+    assert parse_selector(".a:hover .b") is None
+
+
+def test_compiler_adds_matching_classes():
+    code = generate_react_component(
+        {"type": "hero", "html": '<div class="hero"><p>Hi</p></div>'},
+        "none",
+        StylesheetIndex([".hero { padding: 2rem 1rem } .hero p { font-family: a_b } .other { color: red }"]),
+    )
+    assert '<div className="hero [padding:2rem_1rem]">' in code
+    assert '<p className={"[font-family:a\\\\_b]"}>Hi</p>' in code
+    assert "red" not in code
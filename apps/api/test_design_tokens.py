@@ -0,0 +1,53 @@
+"""Tests for design-token extraction"""
+import numpy as np
+
+from generators.design_tokens import (
+    extract_design_tokens,
+    generate_tailwind_config,
+    parse_color_functions,
+    parse_hex_colors,
+    srgb_to_lab,
+)
+
+CSS = """
+body { color: #111827; background-color: #FFFFFF; font-size: 16px; margin: 0 }
+a, #fade-in { color: #2563eb; padding: 8px 15px; border-radius: 6px }
+.btn { background: rgb(37, 99, 235); border-radius: .5rem; font-size: 0.875rem; gap: 1rem }
+.err { color: #ef4444; border-color: hsl(0, 84%, 60%); font-size: 2.3rem; border-radius: 9999px }
+h1 { font-size: 48px; color: #f3f4f6 }
+.card { background: #fff; outline-color: #ef4444 }
+"""
+
+
+def test_parse_colors():
+    assert parse_hex_colors(["fff", "0000", "2563eb", "2563eb80"]).tolist() == [
+        [255, 255, 255, 255], [0, 0, 0, 0], [37, 99, 235, 255], [37, 99, 235, 128],
+    ]
+    rgb = parse_color_functions([("rgb", "50", "%", "0", "", "0", ""), ("hsl", "120", "", "100", "%", "50", "%")])
+    assert np.allclose(rgb, [[127.5, 0, 0], [0, 255, 0]])
+
+
+def test_lab_reference_values():
+    lab = srgb_to_lab(np.array([[255.0, 255, 255], [0, 0, 0], [255, 0, 0]]))
+    assert np.allclose(lab, [[100, 0, 0], [0, 0, 0], [53.24, 80.09, 67.20]], atol=0.05)
+
+
+def test_extracts_palette_and_scales():
+    tokens = extract_design_tokens([CSS])
+
+    # Near-identical colors collapse into their most used member; "#fade" in a selector is not a color
+    assert tokens["colors"] == {
+        "primary": "#ef4444",
+        "secondary": "#2563eb",
+        "neutral": {"50": "#ffffff", "900": "#111827"},
+    }
+    assert tokens["fontSize"] == {"sm": "0.875rem", "base": "1rem", "4xl": "2.25rem", "5xl": "3rem"}
+    assert tokens["spacing"] == {"2": "0.5rem", "4": "1rem"}
+    assert tokens["borderRadius"] == {"md": "0.375rem", "lg": "0.5rem"}
+
+
+def test_config_uses_component_styles_and_falls_back():
+    config = generate_tailwind_config([{"type": "hero", "html": '<p style="color: #16a34a">x</p>'}])
+    assert "primary: '#16a34a'" in config
+
+    assert "primary: '#0070f3'" in generate_tailwind_config([])
@@ -0,0 +1,56 @@
+"""Tests for structural page fingerprints and template clustering"""
+from ai.fingerprint import (
+    cluster_pages,
+    hamming_distance,
+    page_fingerprint,
+    propagate_results,
+)
+
+ARTICLE = """
+<html><body>
+  <header><nav><a href="/">Home</a><a href="/blog">Blog</a></nav></header>
+  <main><article><h1>{title}</h1><p>{body}</p><p>{body}</p></article></main>
+  <footer><p>(c) Example</p></footer>
+</body></html>
+"""
+
+LANDING = """
+<html><body>
+  <section class="hero"><h1>{title}</h1><button>Start</button></section>
+  <section><ul><li>One</li><li>Two</li><li>Three</li></ul></section>
+  <form><input name="email"><input name="name"><button>Sign up</button></form>
+</body></html>
+"""
+
+
+def test_text_content_is_ignored():
+    a = page_fingerprint(ARTICLE.format(title="First", body="Lorem ipsum"))
+    b = page_fingerprint(ARTICLE.format(title="Second post", body="Something else entirely"))
+    assert a == b
+
+
+def test_different_templates_are_far_apart():
+    a = page_fingerprint(ARTICLE.format(title="A", body="B"))
+    b = page_fingerprint(LANDING.format(title="A"))
+    assert hamming_distance(a, b) > 6
+
+
+def test_clustering_and_propagation():
+    pages = {
+        "/post-1": ARTICLE.format(title="One", body="x"),
+        "/": LANDING.format(title="Welcome"),
+        "/post-2": ARTICLE.format(title="Two", body="y"),
+        "/post-3": ARTICLE.format(title="Three", body="z"),
+    }
+    clusters = cluster_pages({key: page_fingerprint(html) for key, html in pages.items()})
+
+    assert [c.representative for c in clusters] == ["/post-1", "/"]
+    assert set(clusters[0].members) == {"/post-1", "/post-2", "/post-3"}
+
+    results = propagate_results(clusters, {"/post-1": {"page_type": "template"}, "/": {"page_type": "static"}})
+    assert results["/post-3"]["page_type"] == "template"
+    assert results["/post-3"]["template"] == {"representative": "/post-1", "confidence": 1.0}
+
+
+def test_empty_document():
+    assert page_fingerprint("") == 0
@@ -0,0 +1,208 @@
+"""Tests for access control on code generation"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import config.database
+from config.database import get_db
+from lib.auth import Principal, get_current_user
+from lib.blob_store import LocalBlobStore
+from lib.exceptions import BoltflowException
+from middleware.error_handler import boltflow_exception_handler
+from models.generated_component import GeneratedComponent
+from models.job import Job
+from routers import generator
+
+OWNER = Principal(id=uuid.uuid4(), email="owner@example.com", name="Owner", created_at=datetime(2024, 1, 1))
+
+COMPONENTS = [{"type": "hero", "html": "<section><h1>Hi</h1></section>"}]
+
+
+class Result:
+    def __init__(self, values):
+        self.values = values
+
+    def scalar_one_or_none(self):
+        return self.values[0] if self.values else None
+
+    def scalars(self):
+        return iter(self.values)
+
+    def tuples(self):
+        return iter(self.values)
+
+    def all(self):
+        return self.values
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for value in self.values:
+            yield value
+
+
+class FakeSession:
+    """A database holding one job, owned by OWNER when `owned`, and its generated files"""
+
+    def __init__(self, owned, previous=()):
+        self.owned = owned
+        self.job_id = uuid.uuid4()
+        self.previous = list(previous)
+        self.queries = []
+        self.added = []
+        self.deleted = []
+        self.streams = 0
+
+    async def execute(self, query):
+        self.queries.append(query)
+        expr = query.column_descriptions[0]["expr"]
+        if expr is Job.id:
+            return Result([self.job_id] if self.owned else [])
+        if expr is GeneratedComponent:
+            return Result(self.previous)
+        if expr is GeneratedComponent.content_hash:
+            return Result([])
+        if expr is GeneratedComponent.filename:
+            return Result([(row.filename, row.content_hash) for row in self.previous])
+        # The job's stylesheets and their digest
+        return Result([])
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def delete(self, row):
+        self.deleted.append(row)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def stream(self, query):
+        self.streams += 1
+        return Result([(row.filename, row.component_type, row.content) for row in self.previous])
+
+
+def make_client(session, user=OWNER):
+    app = FastAPI()
+    app.include_router(generator.router, prefix="/api/generator")
+    app.dependency_overrides[get_db] = lambda: session
+    if user is not None:
+        app.dependency_overrides[get_current_user] = lambda: user
+    app.add_exception_handler(BoltflowException, boltflow_exception_handler)
+    return TestClient(app)
+
+
+def generate(session, user=OWNER):
+    return make_client(session, user).post(
+        "/api/generator/generate", json={"job_id": str(session.job_id), "components": COMPONENTS}
+    )
+
+
+def test_generate_requires_authentication():
+    session = FakeSession(owned=True)
+    response = generate(session, user=None)
+
+    assert response.status_code in (401, 403)
+    assert session.added == []
+
+
+def test_owned_job_tracks_its_files():
+    session = FakeSession(owned=True)
+    response = generate(session)
+
+    assert response.status_code == 200
+    assert {row.job_id for row in session.added} == {session.job_id}
+    assert {row.filename for row in session.added} == {"Hero.tsx", "tailwind.config.ts"}
+
+
+def test_other_users_job_only_fills_the_cache():
+    session = FakeSession(owned=False)
+    response = generate(session)
+
+    assert response.status_code == 200
+    assert response.json()["total_files"] == 2
+    assert {row.job_id for row in session.added} == {None}
+    assert not any(q.column_descriptions[0]["expr"] is GeneratedComponent for q in session.queries)
+
+
+def previous_rows():
+    return [
+        GeneratedComponent(filename="Hero.tsx", component_type="hero", content="old", content_hash="stale"),
+        GeneratedComponent(filename="Footer.tsx", component_type="footer", content="old", content_hash="gone"),
+    ]
+
+
+def test_owned_job_replaces_and_removes_its_files():
+    hero, footer = rows = previous_rows()
+    session = FakeSession(owned=True, previous=rows)
+
+    assert generate(session).status_code == 200
+    assert session.deleted == [footer]
+    assert hero.content != "old"
+    assert hero not in session.added
+
+
+def test_other_users_job_rows_are_never_touched():
+    hero, footer = rows = previous_rows()
+    session = FakeSession(owned=False, previous=rows)
+
+    assert generate(session).status_code == 200
+    assert session.deleted == []
+    assert hero.content == "old"
+
+
+@pytest.fixture
+def export(monkeypatch):
+    """Downloads an owned job's archive; returns the response and the database session"""
+    monkeypatch.setattr(generator, "_export_sizes", generator.OrderedDict())
+
+    def download(headers=None):
+        session = FakeSession(owned=True, previous=previous_rows())
+        monkeypatch.setattr(config.database, "AsyncSessionLocal", lambda: session)
+        response = make_client(session).get(f"/api/generator/jobs/{session.job_id}/export", headers=headers)
+        return response, session
+
+    return download
+
+
+def test_plain_export_streams_without_a_size_pass(export):
+    response, session = export()
+
+    assert response.status_code == 200
+    assert "content-length" not in response.headers
+    assert session.streams == 1
+    # The completed download leaves its size for later range requests
+    assert generator._export_sizes[response.headers["etag"]] == len(response.content)
+
+
+def test_range_export_resumes_a_download(export):
+    whole, _ = export()
+    generator._export_sizes.clear()
+
+    response, session = export({"Range": "bytes=10-", "If-Range": whole.headers["etag"]})
+
+    assert response.status_code == 206
+    assert response.content == whole.content[10:]
+    assert response.headers["content-range"] == f"bytes 10-{len(whole.content) - 1}/{len(whole.content)}"
+    assert session.streams == 2
+
+
+def test_stylesheets_fall_back_to_inline_css(tmp_path, monkeypatch):
+    store = LocalBlobStore(str(tmp_path), codec="gzip")
+    monkeypatch.setattr(generator, "get_blob_store", lambda: store)
+    ref = asyncio.run(store.put_text("a { color: red }"))
+
+    class StylesheetSession:
+        async def execute(self, query):
+            # Two pages sharing a blob, one page scraped before the blob store
+            return Result([(ref.key, None), (None, "p { margin: 0 }"), (ref.key, None)])
+
+    stylesheets = asyncio.run(generator.load_stylesheets(StylesheetSession(), uuid.uuid4()))
+    assert stylesheets == ["a { color: red }", "p { margin: 0 }"]
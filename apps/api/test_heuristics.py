@@ -0,0 +1,46 @@
+"""Tests for the heuristic section classifier"""
+from ai.heuristics import ClassificationStats, HeuristicClassifier, extract_features
+
+classifier = HeuristicClassifier(threshold=0.8)
+
+
+def test_header_with_nav_is_confident():
+    html = '<header class="site-header"><nav><a href="/">Home</a><a href="/about">About</a></nav></header>'
+    prediction = classifier.predict(html, position=0.0)
+
+    assert prediction.type == "header"
+    assert classifier.is_confident(prediction)
+
+
+def test_footer_is_confident():
+    html = '<footer><p>(c) 2025 Example</p><a href="/privacy">Privacy</a></footer>'
+    prediction = classifier.predict(html, position=1.0)
+
+    assert prediction.type == "footer"
+    assert classifier.is_confident(prediction)
+
+
+def test_ambiguous_section_escalates():
+    prediction = classifier.predict('<div class="section"><p>Some text</p></div>', position=0.5)
+    assert not classifier.is_confident(prediction)
+
+
+def test_features():
+    html = '<section id="pricingTable" role="region"><p>$10</p><p>$20</p><a href="#">Buy</a></section>'
+    features = extract_features(html, position=0.4)
+
+    assert features.tag == "section"
+    assert {"pricing", "table"} <= features.tokens
+    assert features.prices == 2
+    assert features.counts["a"] == 1
+
+
+def test_stats():
+    stats = ClassificationStats()
+    assert stats.escalation_rate is None
+
+    for escalated in (True, False, False, False):
+        stats.record(escalated)
+
+    assert stats.fast_path == 3
+    assert stats.escalation_rate == 0.25
@@ -0,0 +1,131 @@
+"""Tests for response compression and conditional caching"""
+import gzip
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from middleware import http_cache
+from middleware.http_cache import HTTPCacheMiddleware, etag_matches, negotiate_encoding
+
+BIG = {"files": [{"filename": f"Component{i}.tsx", "content": "export default () => null\n" * 20} for i in range(20)]}
+
+
+def make_client():
+    app = FastAPI()
+
+    @app.get("/api/files")
+    async def files():
+        return BIG
+
+    @app.get("/api/small")
+    async def small():
+        return {"ok": True}
+
+    @app.post("/api/generate")
+    async def generate():
+        return BIG
+
+    @app.get("/api/status")
+    async def status():
+        return Response('{"status":"running"}', media_type="application/json", headers={"ETag": '"own"'})
+
+    @app.get("/api/export")
+    async def export():
+        async def chunks():
+            yield b'{"page":1}\n'
+            yield b'{"page":2}\n'
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/api/auth/me")
+    async def me():
+        return {"id": "u1"}
+
+    app.add_middleware(
+        HTTPCacheMiddleware,
+        minimum_size=512,
+        policies={"* /api/auth/*": "no-store", "GET /api/*": "private, no-cache", "* /api/*": "no-store"},
+    )
+    return TestClient(app)
+
+
+def test_negotiation(monkeypatch):
+    monkeypatch.setattr(http_cache, "brotli", None)
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_encoding("br;q=1, gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("*") == "gzip"
+
+    monkeypatch.setattr(http_cache, "brotli", object())
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5") == "gzip"
+
+
+def test_etag_matching():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+
+
+def test_large_get_is_compressed_with_etag_and_policy():
+    client = make_client()
+    response = client.get("/api/files", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert response.json() == BIG
+
+    raw = client.get("/api/files", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert raw.headers["etag"] != response.headers["etag"]
+
+
+def test_if_none_match_returns_304():
+    client = make_client()
+    etag = client.get("/api/files", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    cached = client.get("/api/files", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert cached.headers["cache-control"] == "private, no-cache"
+
+
+def test_compressed_output_is_stable():
+    client = make_client()
+    first = client.get("/api/files", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/api/files", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["content-length"] == second.headers["content-length"]
+
+
+def test_small_bodies_and_posts():
+    client = make_client()
+    small = client.get("/api/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers and "etag" in small.headers
+
+    generated = client.post("/api/generate", headers={"Accept-Encoding": "gzip"})
+    assert generated.headers["content-encoding"] == "gzip"
+    assert "etag" not in generated.headers
+    assert generated.headers["cache-control"] == "no-store"
+
+    assert client.get("/api/auth/me").headers["cache-control"] == "no-store"
+
+
+def test_own_etags_and_streams_pass_through():
+    client = make_client()
+    status = client.get("/api/status", headers={"Accept-Encoding": "gzip"})
+    assert status.headers["etag"] == '"own"'
+    assert status.headers["cache-control"] == "private, no-cache"
+
+    export = client.get("/api/export", headers={"Accept-Encoding": "gzip"})
+    assert export.text == '{"page":1}\n{"page":2}\n'
+    assert "content-encoding" not in export.headers and "etag" not in export.headers
+
+
+@pytest.mark.parametrize("size", [600, http_cache.THREADED_COMPRESSION_BYTES + 1])
+def test_gzip_round_trip(size):
+    body = b"x" * size
+    assert gzip.decompress(http_cache.compress(body, "gzip")) == body
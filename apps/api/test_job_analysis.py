@@ -0,0 +1,216 @@
+"""Tests for server-side analysis of a scraping job's pages"""
+import asyncio
+import uuid
+
+import pytest
+
+import config.database
+from lib.blob_store import LocalBlobStore, blob_columns
+from models.job import Job
+from models.page_analysis import PageAnalysis
+from routers import analyzer
+
+ARTICLE = (
+    '<html><body><header><nav><a href="/">Home</a><a href="/b">Blog</a></nav></header>'
+    "<main><article><h1>{title}</h1><p>One</p><p>Two</p>{extra}</article></main>"
+    "<footer><p>f</p></footer></body></html>"
+)
+FORM = (
+    "<html><body><form><table><tr><td><input name=q></td>"
+    "<td><select><option>1</option></select></td></tr></table><button>Go</button></form></body></html>"
+)
+
+
+class FakeAnalyzer:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def analyze_pages(self, pages):
+        self.calls.append(dict(pages))
+        if self.error:
+            raise self.error
+        return {
+            page_id: {"page_type": "template", "sections": [{"type": "hero", "html": html}]}
+            for page_id, html in pages.items()
+        }
+
+
+class FakeClassifier:
+    async def classify(self, sections):
+        return [
+            {"type": section["type"], "confidence": 0.8, "html": "", "styles": {}, "complexity_score": 10}
+            for section in sections
+        ]
+
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalar_one(self):
+        return self.rows[0]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeDatabase:
+    """Sessions over an in-memory job and its scraped pages"""
+
+    def __init__(self, job, pages):
+        self.job = job
+        self.pages = pages  # page id -> column values
+        self.added = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def session(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, database):
+        self.database = database
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def _rows(self, query, page_ids):
+        names = [column["name"] for column in query.column_descriptions]
+        return [
+            tuple(page_id if name == "id" else self.database.pages[page_id][name] for name in names)
+            for page_id in page_ids
+        ]
+
+    async def execute(self, query):
+        if query.column_descriptions[0]["expr"] is Job:
+            return Rows([self.database.job])
+        # A batch of representatives, selected by id
+        page_ids = [uuid.UUID(page_id) for page_id in query.whereclause.right.value]
+        return Rows(self._rows(query, page_ids))
+
+    async def stream(self, query):
+        return Rows(self._rows(query, list(self.database.pages)))
+
+    def add_all(self, rows):
+        self.database.added.extend(rows)
+
+    async def commit(self):
+        self.database.commits += 1
+
+    async def rollback(self):
+        self.database.rollbacks += 1
+
+
+@pytest.fixture
+def job_analysis(tmp_path, monkeypatch):
+    """Runs run_job_analysis over the given pages; returns the database and broadcast events"""
+    store = LocalBlobStore(str(tmp_path), codec="gzip")
+    events = []
+
+    async def broadcast(event):
+        events.append(event)
+
+    monkeypatch.setattr(analyzer, "get_blob_store", lambda: store)
+    monkeypatch.setattr(analyzer.ws_manager, "broadcast", broadcast)
+
+    def run(pages, stored=None, fake_analyzer=None, inline=False):
+        columns = {}
+        for html in pages:
+            if inline:
+                # Scraped before the blob store and not backfilled yet
+                page = {**blob_columns("html", None), "legacy_html": html}
+            else:
+                page = {**blob_columns("html", asyncio.run(store.put_text(html))), "legacy_html": None}
+            columns[uuid.uuid4()] = {**page, "css_ref": None, "legacy_css": None}
+        database = FakeDatabase(Job(id=uuid.uuid4(), status="pending"), columns)
+        monkeypatch.setattr(config.database, "AsyncSessionLocal", database.session)
+
+        async def load_stored_analyses(db, hashes):
+            return {digest: result for digest, result in (stored or {}).items() if digest in hashes}
+
+        monkeypatch.setattr(analyzer, "load_stored_analyses", load_stored_analyses)
+        asyncio.run(analyzer.run_job_analysis(
+            job_id=str(database.job.id),
+            source_job_id=str(uuid.uuid4()),
+            project_id=str(uuid.uuid4()),
+            analyzer=fake_analyzer or FakeAnalyzer(),
+            classifier=FakeClassifier()
+        ))
+        return database, [str(page_id) for page_id in columns], events
+
+    return run
+
+
+def test_one_request_per_template_with_discounted_copies(job_analysis):
+    fake = FakeAnalyzer()
+    similar = ARTICLE.format(title="B", extra="<p>Three</p><ul><li>x</li></ul>")
+    database, (first, second, form), events = job_analysis(
+        [ARTICLE.format(title="A", extra=""), similar, FORM], fake_analyzer=fake
+    )
+
+    assert [sorted(call) for call in fake.calls] == [sorted([first, form])]
+    rows = {str(row.scraped_page_id): row for row in database.added}
+    assert set(rows) == {first, second, form}
+    assert all(isinstance(row, PageAnalysis) and row.job_id == database.job.id for row in rows.values())
+
+    assert rows[first].template_confidence == 1.0
+    copied = rows[second]
+    assert 0 < copied.template_confidence < 1
+    assert copied.components[0]["confidence"] == pytest.approx(0.8 * copied.template_confidence)
+    assert copied.content_hash != rows[first].content_hash
+
+    assert database.job.status == "completed"
+    assert database.job.result["templates"] == 2
+    assert database.job.result["pages_analyzed"] == 2
+    assert [event["type"] for event in events][0] == "analyze:started"
+    assert events[-1]["type"] == "analyze:completed"
+
+
+def test_stored_content_is_reused_without_model_calls(job_analysis):
+    fake = FakeAnalyzer()
+    page = ARTICLE.format(title="A", extra="")
+    previous = {
+        "page_type": "static", "components": [], "complexity_score": 0.0, "estimated_hours": 8.0
+    }
+    stored = {analyzer.content_hash(page, None): previous}
+
+    database, (page_id,), _ = job_analysis([page], stored=stored, fake_analyzer=fake)
+
+    assert fake.calls == []
+    (row,) = database.added
+    assert str(row.scraped_page_id) == page_id
+    assert row.page_type == "static"
+    assert row.template_confidence is None
+    assert database.job.result["pages_stored"] == 1
+
+
+def test_pages_without_blobs_are_read_from_the_legacy_columns(job_analysis):
+    fake = FakeAnalyzer()
+    database, (page_id,), _ = job_analysis([FORM], fake_analyzer=fake, inline=True)
+
+    assert fake.calls == [{page_id: FORM}]
+    (row,) = database.added
+    assert row.content_hash == analyzer.content_hash(FORM, None)
+
+
+def test_failure_marks_the_job_failed(job_analysis):
+    database, _, events = job_analysis([FORM], fake_analyzer=FakeAnalyzer(error=RuntimeError("model down")))
+
+    assert database.rollbacks == 1
+    assert database.added == []
+    assert database.job.status == "failed"
+    assert database.job.error == "model down"
+    assert events[-1]["type"] == "analyze:error"
+    assert events[-1]["error"] == "model down"
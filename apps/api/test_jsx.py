@@ -0,0 +1,85 @@
+"""Tests for the HTML to JSX compiler"""
+from generators.jsx import component_name, generate_react_component, style_to_object
+
+
+def test_maps_attributes_and_void_tags():
+    code = generate_react_component(
+        {"type": "hero", "html": '<div class="wrap" style="margin-top: 4px; color:red"><img src="a.png"><br></div>'},
+        "none",
+    )
+
+    assert '<div className="wrap" style={{ marginTop: "4px", color: "red" }}>' in code
+    assert '<img src="a.png" />' in code
+    assert "<br />" in code
+    assert "import" not in code
+    assert "export default function Hero()" in code
+
+
+def test_shadcn_widgets_import_only_what_is_used():
+    code = generate_react_component(
+        {"type": "contact-form", "html": '<form><label for="e">Email</label><input id="e" type="email" value="x">'
+                                         '<input type="checkbox" checked><button onclick="go()">Send</button></form>'},
+        "shadcn",
+    )
+
+    assert code.startswith(
+        'import { Button } from "@/components/ui/button"\n'
+        'import { Checkbox } from "@/components/ui/checkbox"\n'
+        'import { Input } from "@/components/ui/input"\n'
+        'import { Label } from "@/components/ui/label"\n\n'
+    )
+    assert '<Label htmlFor="e">Email</Label>' in code
+    assert '<Input id="e" type="email" defaultValue="x" />' in code
+    assert "<Checkbox defaultChecked />" in code
+    assert "<Button>Send</Button>" in code
+    assert "onclick" not in code
+    assert "export default function ContactForm()" in code
+
+
+def test_keeps_spaces_between_inline_elements():
+    code = generate_react_component({"type": "text", "html": "<p>Hello <b>big</b> world</p>"}, "shadcn")
+    assert '<p>\n' in code
+    assert 'Hello{" "}' in code
+    assert '{" "}world' in code
+
+
+def test_empty_html_falls_back_to_placeholder():
+    code = generate_react_component({"type": "footer", "html": ""}, "shadcn")
+    assert "Generated from: footer" in code
+
+
+def test_helpers():
+    assert style_to_object("--gap: 2px; font-size: 1rem") == '{ "--gap": "2px", fontSize: "1rem" }'
+    assert component_name("404-page") == "Section404Page"
+
+
+def test_drops_attributes_that_are_not_jsx():
+    code = generate_react_component(
+        {"type": "menu", "html": '<div :class="a" v-on:click="b" x-data="{}" xml:lang="en" stroke-width="2">Menu</div>'},
+        "none",
+    )
+
+    assert '<div xmlLang="en" strokeWidth="2">Menu</div>' in code
+
+
+def test_entities_and_braces_stay_literal():
+    code = generate_react_component(
+        {"type": "code", "html": '<p title="a &amp;lt; b">Use &amp;lt; and {x}</p><p>1&nbsp;km</p>'},
+        "none",
+    )
+
+    assert '<p title={"a &lt; b"}>{"Use &lt; and {x}"}</p>' in code
+    assert '<p>{"1\\u00a0km"}</p>' in code
+
+
+def test_textarea_content_becomes_default_value():
+    code = generate_react_component({"type": "form", "html": "<textarea name=\"m\">\nHi &amp; bye</textarea>"}, "shadcn")
+
+    assert '<Textarea name="m" defaultValue={"Hi & bye"} />' in code
+
+
+def test_style_values_may_contain_semicolons():
+    style = 'background: url("data:image/png;base64,AAAA") no-repeat; color: red'
+    assert style_to_object(style) == (
+        '{ background: "url(\\"data:image/png;base64,AAAA\\") no-repeat", color: "red" }'
+    )
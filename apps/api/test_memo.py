@@ -0,0 +1,46 @@
+"""Tests for generated component memoization keys"""
+from generators.memo import assign_filenames, component_hash, config_hash, diff_manifest, unique_components
+
+HEADER = {"type": "header", "html": "<header>\n  <nav>Home</nav>\n</header>"}
+
+
+def test_hash_ignores_insignificant_whitespace():
+    reformatted = {"type": "header", "html": "<header><nav>Home</nav></header>"}
+    assert component_hash(HEADER, "nextjs", "shadcn") == component_hash(reformatted, "nextjs", "shadcn")
+
+
+def test_hash_covers_generator_inputs():
+    base = component_hash(HEADER, "nextjs", "shadcn")
+    assert component_hash(HEADER, "react", "shadcn") != base
+    assert component_hash(HEADER, "nextjs", "mui") != base
+    assert component_hash({**HEADER, "styles": {"color": "red"}}, "nextjs", "shadcn") != base
+    assert component_hash({**HEADER, "html": "<header>Other</header>"}, "nextjs", "shadcn") != base
+
+
+def test_identical_components_share_a_file():
+    components = [HEADER, {"type": "hero", "html": "<div>A</div>"}, dict(HEADER), {"type": "header", "html": "<p>B</p>"}]
+    hashes = [component_hash(c, "nextjs", "shadcn") for c in components]
+
+    unique = unique_components(components, hashes)
+    filenames = assign_filenames(unique)
+
+    assert len(unique) == 3
+    assert [filenames[h] for h in hashes] == ["Header.tsx", "Hero.tsx", "Header.tsx", "Header2.tsx"]
+
+
+def test_config_hash_depends_on_component_set():
+    a, b = component_hash(HEADER, "nextjs", "shadcn"), component_hash({"type": "hero", "html": "x"}, "nextjs", "shadcn")
+    assert config_hash([a, b], "nextjs") == config_hash([b, a, a], "nextjs")
+    assert config_hash([a], "nextjs") != config_hash([a, b], "nextjs")
+
+
+def test_diff_manifest():
+    previous = {"Header.tsx": "h1", "Hero.tsx": "x1", "Footer.tsx": "f1"}
+    current = {"Header.tsx": "h1", "Hero.tsx": "x2", "Pricing.tsx": "p1"}
+
+    assert diff_manifest(previous, current) == {
+        "added": ["Pricing.tsx"],
+        "changed": ["Hero.tsx"],
+        "removed": ["Footer.tsx"],
+        "unchanged": ["Header.tsx"],
+    }
@@ -0,0 +1,62 @@
+"""Tests for model tier routing and escalation"""
+import asyncio
+from types import SimpleNamespace
+
+from ai.model_router import ModelRouter, ModelTier
+
+TIERS = [
+    ModelTier(name="fast", model="fast-model", max_input_tokens=1000, max_complexity=0.3),
+    ModelTier(name="strong", model="strong-model", max_input_tokens=8000, max_complexity=1.0),
+]
+
+
+class FakeLimiter:
+    def __init__(self, headroom):
+        self.headroom = headroom
+
+
+class FakeClient:
+    def __init__(self, replies, headroom=None):
+        self.replies = replies
+        self.headroom = headroom or {}
+        self.calls = []
+
+    def limiter(self, model):
+        return FakeLimiter(self.headroom.get(model, 1.0))
+
+    async def chat_completion(self, model, messages, **kwargs):
+        self.calls.append(model)
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        return SimpleNamespace(reply=self.replies[model], usage=usage)
+
+
+def parse(response):
+    return response.reply
+
+
+def test_routes_small_simple_requests_to_fast_tier():
+    router = ModelRouter(TIERS, client=FakeClient({}))
+    assert [t.name for t in router.route(500, 0.1)] == ["fast", "strong"]
+    assert [t.name for t in router.route(5000, 0.1)] == ["strong"]
+    assert [t.name for t in router.route(500, 0.8)] == ["strong"]
+
+
+def test_skips_tier_without_headroom():
+    router = ModelRouter(TIERS, client=FakeClient({}, headroom={"fast-model": 0.0}))
+    assert [t.name for t in router.route(500, 0.1)] == ["strong"]
+
+
+def test_escalates_on_invalid_or_low_confidence_response():
+    for fast_reply in [(None, None), ({"ok": False}, 0.2)]:
+        client = FakeClient({"fast-model": fast_reply, "strong-model": ({"ok": True}, 0.9)})
+        router = ModelRouter(TIERS, client=client, min_confidence=0.5)
+
+        result = asyncio.run(router.complete([], input_tokens=100, complexity=0.1, parse=parse))
+
+        assert result == {"ok": True}
+        assert client.calls == ["fast-model", "strong-model"]
+        stats = router.snapshot()
+        assert stats["fast"]["escalations"] == 1
+        assert stats["strong"]["calls"] == 1
+        assert stats["strong"]["prompt_tokens"] == 10
+        assert stats["strong"]["latency_p95"] is not None
@@ -0,0 +1,99 @@
+"""Tests for the rate-limit-aware OpenAI client layer"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from ai.client import TokenBucket, close_openai_client, is_retryable, retry_after_seconds, wait_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("Rate limited", response=response, body=None)
+
+
+def test_bucket_takes_and_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)
+
+    asyncio.run(bucket.acquire(60))
+    assert bucket.headroom == 0.0
+
+    clock.now = 30.0
+    assert bucket.headroom == 0.5
+
+
+def test_bucket_waits_for_quota():
+    bucket = TokenBucket(per_minute=6000)
+
+    async def drain_and_wait():
+        await bucket.acquire(6000)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await bucket.acquire(5)
+        return loop.time() - start
+
+    # 5 tokens at 100 tokens/second take about 50ms to refill
+    assert asyncio.run(drain_and_wait()) >= 0.04
+
+
+def test_pause_blocks_headroom():
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)
+    bucket.pause(10)
+
+    assert bucket.headroom == 0.0
+    clock.now = 11.0
+    assert bucket.headroom == 1.0
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds(rate_limit_error({"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(rate_limit_error({"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(rate_limit_error({})) is None
+    assert is_retryable(rate_limit_error({}))
+    assert not is_retryable(ValueError("boom"))
+
+
+def failed_attempt(exc):
+    return SimpleNamespace(outcome=SimpleNamespace(failed=True, exception=lambda: exc))
+
+
+def test_rate_limits_wait_in_the_limiter_only():
+    wait = wait_retry_after(lambda retry_state: 5.0)
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    unavailable = openai.InternalServerError(
+        "Unavailable", response=httpx.Response(503, headers={"retry-after": "3"}, request=request), body=None
+    )
+
+    # The 429 already paused the limiter for its Retry-After
+    assert wait(failed_attempt(rate_limit_error({"retry-after": "7"}))) == 0.0
+    assert wait(failed_attempt(unavailable)) == 3.0
+    assert wait(failed_attempt(ValueError("boom"))) == 5.0
+
+
+def test_shared_users_pick_up_a_new_client_after_close():
+    from ai.classifier import ComponentClassifier
+    from ai.model_router import get_model_router
+
+    router = get_model_router()
+    classifier = ComponentClassifier()
+    first = router.client
+    assert classifier.client is first
+
+    asyncio.run(close_openai_client())
+
+    assert router.client is not first
+    assert classifier.client is router.client
+
+    asyncio.run(close_openai_client())
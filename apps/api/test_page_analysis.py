@@ -0,0 +1,181 @@
+"""Tests for stored page analyses: content-hash reuse, job linking and project quotes"""
+import asyncio
+import uuid
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from config.database import get_db
+from lib.auth import Principal, get_current_user, get_current_user_optional
+from lib.exceptions import BoltflowException
+from middleware.error_handler import boltflow_exception_handler
+from models.job import Job
+from models.page_analysis import PageAnalysis
+from routers import analyzer
+
+OWNER = Principal(id=uuid.uuid4(), email="owner@example.com", name="Owner", created_at=datetime(2024, 1, 1))
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    async def analyze(self, html, css=None):
+        self.calls += 1
+        return {"page_type": "static", "sections": [{"type": "hero", "html": html}]}
+
+
+class FakeClassifier:
+    async def classify(self, sections):
+        return [
+            {"type": s["type"], "confidence": 0.9, "html": s["html"], "styles": {}, "complexity_score": 10}
+            for s in sections
+        ]
+
+
+class Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def one(self):
+        return self.value
+
+
+class FakeSession:
+    """Answers the analysis lookup, the job ownership check and the quote aggregate"""
+
+    def __init__(self, stored=None, owned_job=None, project=None, totals=None):
+        self.stored = stored
+        self.owned_job = owned_job
+        self.project = project
+        self.totals = totals
+        self.queries = []
+        self.added = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        expr = query.column_descriptions[0]["expr"]
+        if expr is PageAnalysis:
+            return Result(self.stored)
+        if expr is Job.id:
+            return Result(self.owned_job)
+        if self.project is not None and len(self.queries) == 1:
+            return Result(self.project)
+        return Result(self.totals)
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def flush(self):
+        pass
+
+
+def sql(query):
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def make_client(session, user=None, fake_analyzer=None):
+    app = FastAPI()
+    app.include_router(analyzer.router, prefix="/api/analyzer")
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user_optional] = lambda: user
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[analyzer.get_analyzer] = lambda: fake_analyzer or FakeAnalyzer()
+    app.dependency_overrides[analyzer.get_classifier] = FakeClassifier
+    app.add_exception_handler(BoltflowException, boltflow_exception_handler)
+    return TestClient(app)
+
+
+def test_stored_analysis_is_reused():
+    stored = PageAnalysis(
+        page_type="template", components=[], component_count=0, complexity_score=12.0, estimated_hours=9.0
+    )
+    session = FakeSession(stored=stored)
+    fake = FakeAnalyzer()
+
+    response = make_client(session, fake_analyzer=fake).post(
+        "/api/analyzer/analyze", json={"job_id": "job-1", "html": "<p>hi</p>"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["page_type"] == "template"
+    assert fake.calls == 0
+    assert session.added == []
+
+
+def test_propagated_analyses_are_not_reused_as_exact():
+    session = FakeSession()
+    make_client(session).post("/api/analyzer/analyze", json={"job_id": "job-1", "html": "<p>hi</p>"})
+    assert "page_analyses.template_confidence IS NULL" in sql(session.queries[0])
+
+    class BatchSession:
+        queries = []
+
+        async def execute(self, query):
+            self.queries.append(query)
+            return []
+
+    db = BatchSession()
+    assert asyncio.run(analyzer.load_stored_analyses(db, {"a" * 64})) == {}
+    assert "page_analyses.template_confidence IS NULL" in sql(db.queries[0])
+
+
+def test_new_analysis_is_linked_only_for_the_job_owner():
+    job_id = uuid.uuid4()
+
+    anonymous = FakeSession(owned_job=job_id)
+    response = make_client(anonymous).post(
+        "/api/analyzer/analyze", json={"job_id": str(job_id), "html": "<p>hi</p>"}
+    )
+    assert response.status_code == 200
+    (row,) = anonymous.added
+    assert row.job_id is None
+    assert row.content_hash == analyzer.content_hash("<p>hi</p>")
+    # No ownership lookup without a caller
+    assert len(anonymous.queries) == 1
+
+    owner = FakeSession(owned_job=job_id)
+    make_client(owner, user=OWNER).post(
+        "/api/analyzer/analyze", json={"job_id": str(job_id), "html": "<p>hi</p>"}
+    )
+    (row,) = owner.added
+    assert row.job_id == job_id
+    ownership = sql(owner.queries[1])
+    assert "JOIN projects" in ownership and "projects.user_id" in ownership
+
+    stranger = FakeSession(owned_job=None)
+    make_client(stranger, user=OWNER).post(
+        "/api/analyzer/analyze", json={"job_id": str(job_id), "html": "<p>hi</p>"}
+    )
+    (row,) = stranger.added
+    assert row.job_id is None
+
+
+def test_project_quote_sums_page_analyses():
+    project_id = uuid.uuid4()
+    session = FakeSession(project=project_id, totals=(3, 12, 40.0, 9.0))
+
+    response = make_client(session, user=OWNER).get(f"/api/analyzer/projects/{project_id}/quote")
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["pages"] == 3
+    assert body["components"] == 12
+    assert body["complexity_score"] == 40.0
+    # Setup hours are counted once, plus each page's own hours
+    assert body["estimated_hours"] == analyzer.BASE_HOURS + 9.0
+    assert body["total_cost"] == (analyzer.BASE_HOURS + 9.0) * analyzer.HOURLY_RATE
+    aggregate = sql(session.queries[1])
+    assert "DISTINCT ON (page_analyses.content_hash)" in aggregate
+    assert "jobs.project_id" in aggregate
+
+
+def test_project_quote_requires_ownership():
+    session = FakeSession(project=None)
+    response = make_client(session, user=OWNER).get(f"/api/analyzer/projects/{uuid.uuid4()}/quote")
+    assert response.status_code == 404
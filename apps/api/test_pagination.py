@@ -0,0 +1,81 @@
+"""Tests for keyset pagination"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from lib.exceptions import ValidationError
+from lib.pagination import decode_cursor, encode_cursor, keyset_page
+from models.project import Project
+
+
+class FakeRow:
+    def __init__(self, **values):
+        self._mapping = values
+        self.__dict__.update(values)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(query)
+        return FakeResult(self.rows[:query._limit_clause.value])
+
+
+def page(session, cursor=None, limit=2):
+    query = select(Project.id, Project.created_at)
+    return asyncio.run(keyset_page(session, query, Project.created_at, Project.id, cursor, limit))
+
+
+def sql(query):
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_round_trip():
+    created_at, id = datetime(2024, 5, 1, 12, 30, 15, 123456), uuid.uuid4()
+    cursor = encode_cursor(created_at, id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(datetime(2024, 1, 1), uuid.uuid4())[:-4]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor)
+
+
+def test_first_page_fetches_one_extra_row_for_next_cursor():
+    rows = [FakeRow(id=uuid.uuid4(), created_at=datetime(2024, 1, day)) for day in (3, 2, 1)]
+    session = FakeSession(rows)
+
+    items, next_cursor = page(session)
+    assert items == rows[:2]
+    assert decode_cursor(next_cursor) == (rows[1].created_at, rows[1].id)
+
+    query = sql(session.queries[0])
+    assert "ORDER BY projects.created_at DESC, projects.id DESC" in query
+    assert "(projects.created_at, projects.id) <" not in query
+
+
+def test_cursor_seeks_without_offset():
+    session = FakeSession([FakeRow(id=uuid.uuid4(), created_at=datetime(2024, 1, 1))])
+    items, next_cursor = page(session, cursor=encode_cursor(datetime(2024, 1, 2), uuid.uuid4()))
+
+    assert len(items) == 1 and next_cursor is None
+    query = sql(session.queries[0])
+    assert "(projects.created_at, projects.id) < (" in query
+    assert "OFFSET" not in query
@@ -0,0 +1,78 @@
+"""Tests for off-loop password hashing"""
+import asyncio
+import threading
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from lib import auth
+from lib.auth import PasswordHasher
+from lib.exceptions import RateLimitError
+
+
+@pytest.fixture
+def fast_context(monkeypatch):
+    # bcrypt cost is irrelevant to these tests; pbkdf2 keeps them quick
+    context = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__rounds=1000)
+    monkeypatch.setattr(auth, "pwd_context", context)
+    return context
+
+
+def test_hash_and_verify(fast_context):
+    async def scenario():
+        hasher = PasswordHasher(max_workers=2, max_waiting=4)
+        try:
+            hashed = await hasher.hash("s3cret-pass")
+            assert await hasher.verify_and_update("s3cret-pass", hashed) == (True, None)
+            assert await hasher.verify_and_update("wrong", hashed) == (False, None)
+        finally:
+            hasher.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_outdated_cost_is_rehashed(fast_context, monkeypatch):
+    hashed = fast_context.hash("s3cret-pass")
+    monkeypatch.setattr(auth, "pwd_context", CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__rounds=2000))
+
+    async def scenario():
+        hasher = PasswordHasher(max_workers=1, max_waiting=1)
+        try:
+            return await hasher.verify_and_update("s3cret-pass", hashed)
+        finally:
+            hasher.shutdown()
+
+    valid, new_hash = asyncio.run(scenario())
+    assert valid and new_hash.startswith("$pbkdf2-sha256$2000$")
+
+
+def test_concurrency_is_capped_and_excess_is_shed():
+    running, peak, lock = 0, 0, threading.Lock()
+
+    def slow():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return True
+
+    async def scenario():
+        hasher = PasswordHasher(max_workers=2, max_waiting=3)
+        try:
+            tasks = [asyncio.create_task(hasher.run(slow)) for _ in range(5)]
+            await asyncio.sleep(0.01)
+            assert hasher.waiting == 3
+            with pytest.raises(RateLimitError):
+                await hasher.run(slow)
+            assert all(await asyncio.gather(*tasks))
+        finally:
+            hasher.shutdown()
+        return hasher
+
+    hasher = asyncio.run(scenario())
+    assert peak == 2
+    assert hasher.rejected == 1 and hasher.waiting == 0
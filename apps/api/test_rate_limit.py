@@ -0,0 +1,138 @@
+"""Tests for the rate limiting middleware"""
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from lib.auth import create_access_token
+from middleware import rate_limit
+from middleware.rate_limit import Budget, MemoryRateLimitBackend, RateLimitMiddleware, decide
+
+
+def test_gcra_allows_a_burst_then_spaces_requests():
+    budget = Budget("default", requests=3, period=60)
+    tat, now = 0.0, 1000.0
+    remaining = []
+    for _ in range(3):
+        decision, tat = decide(budget, tat, now)
+        assert decision.allowed
+        remaining.append(decision.remaining)
+    assert remaining == [2, 1, 0]
+
+    denied, unchanged = decide(budget, tat, now)
+    assert not denied.allowed and unchanged is None
+    assert denied.retry_after == pytest.approx(20)
+    assert denied.reset_after == pytest.approx(60)
+
+    # One interval later exactly one more request fits
+    decision, tat = decide(budget, tat, now + 20)
+    assert decision.allowed and decision.remaining == 0
+
+
+def test_memory_backend_tracks_keys_independently():
+    backend = MemoryRateLimitBackend(max_keys=2)
+    budget = Budget("default", requests=1, period=60)
+
+    async def scenario():
+        return [
+            (await backend.hit("a", budget)).allowed,
+            (await backend.hit("a", budget)).allowed,
+            (await backend.hit("b", budget)).allowed,
+        ]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+
+
+def make_client(backend=None, routes=None):
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return {"ok": True}
+
+    @app.post("/api/scraper/start")
+    async def start():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=backend or MemoryRateLimitBackend(),
+        default=Budget("default", requests=3, period=60),
+        routes={"POST /api/scraper/*": {"requests": 1, "period": 60}} if routes is None else routes,
+    )
+    return TestClient(app)
+
+
+def test_headers_and_429():
+    client = make_client()
+    responses = [client.get("/api/items") for _ in range(4)]
+
+    assert [r.status_code for r in responses] == [200, 200, 200, 429]
+    assert responses[0].headers["ratelimit-limit"] == "3"
+    assert responses[0].headers["ratelimit-remaining"] == "2"
+    assert responses[0].headers["ratelimit-policy"] == "3;w=60"
+    assert responses[3].headers["retry-after"] == "20"
+    assert responses[3].json()["error"]["type"] == "RateLimitError"
+
+
+def test_route_budget_is_tighter_than_default():
+    client = make_client()
+    assert client.post("/api/scraper/start").status_code == 200
+    denied = client.post("/api/scraper/start")
+    assert denied.status_code == 429
+    assert denied.json()["error"]["details"]["budget"] == "POST /api/scraper/*"
+    # The denied call did not spend the default budget
+    assert client.get("/api/items").headers["ratelimit-remaining"] == "1"
+
+
+def test_users_have_separate_budgets():
+    client = make_client()
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': str(uuid.uuid4())})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': str(uuid.uuid4())})}"}
+    for _ in range(3):
+        assert client.get("/api/items", headers=alice).status_code == 200
+    assert client.get("/api/items", headers=alice).status_code == 429
+    assert client.get("/api/items", headers=bob).status_code == 200
+    # An invalid token falls back to the address, which is unspent
+    assert client.get("/api/items", headers={"Authorization": "Bearer junk"}).status_code == 200
+
+
+def test_exempt_paths_and_backend_failures():
+    class BrokenBackend:
+        async def hit(self, key, budget):
+            raise ConnectionError("redis down")
+
+    client = make_client()
+    for _ in range(5):
+        response = client.get("/health")
+        assert response.status_code == 200 and "ratelimit-limit" not in response.headers
+
+    broken = make_client(BrokenBackend())
+    assert all(broken.get("/api/items").status_code == 200 for _ in range(5))
+
+
+def test_redis_backend_matches_memory_backend():
+    redis = pytest.importorskip("redis.asyncio")
+
+    async def scenario():
+        client = redis.from_url("redis://localhost:6379")
+        try:
+            await client.ping()
+        except Exception:
+            pytest.skip("no Redis server")
+        backend = rate_limit.RedisRateLimitBackend(client, prefix=f"test:{uuid.uuid4()}:")
+        budget = Budget("default", requests=2, period=60)
+        try:
+            return [(await backend.hit("k", budget)).remaining for _ in range(2)], await backend.hit("k", budget)
+        finally:
+            await client.aclose()
+
+    remaining, denied = asyncio.run(scenario())
+    assert remaining == [1, 0]
+    assert not denied.allowed and denied.retry_after == pytest.approx(30, abs=1)
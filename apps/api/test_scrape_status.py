@@ -0,0 +1,155 @@
+"""Tests for the scrape status endpoint"""
+import uuid
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from config.database import get_db
+from lib.auth import get_current_user
+from lib.exceptions import BoltflowException
+from middleware.error_handler import boltflow_exception_handler
+from middleware.http_cache import HTTPCacheMiddleware
+from models.user import User
+from models.job import Job
+from models.job_summary import JobSummary
+from routers import scraper
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def one_or_none(self):
+        return self.row
+
+
+class FakeSession:
+    def __init__(self, row):
+        self.row = row
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        return FakeResult(self.row)
+
+
+def make_client(session):
+    app = FastAPI()
+    app.include_router(scraper.router, prefix="/api/scraper")
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: User(id=uuid.uuid4())
+    app.add_exception_handler(BoltflowException, boltflow_exception_handler)
+    app.add_middleware(HTTPCacheMiddleware)
+    return TestClient(app)
+
+
+def test_status_from_summary_with_etag():
+    job = Job(id=uuid.uuid4(), status="running", progress=40)
+    summary = JobSummary(
+        pages_scraped=4, pages_total=10, bytes_scraped=2048, error_count=0,
+        started_at=datetime(2024, 1, 1), last_event="scrape:progress", last_event_at=datetime(2024, 1, 1, 0, 1),
+    )
+    session = FakeSession((job, summary, 50))
+    client = make_client(session)
+
+    response = client.get(f"/api/scraper/status/{job.id}")
+    body = response.json()
+    assert response.status_code == 200
+    assert session.queries == 1
+    assert body["pages_scraped"] == 4
+    assert body["total_pages"] == 10
+    assert body["bytes_scraped"] == 2048
+    assert body["last_event"] == "scrape:progress"
+    assert body["duration_seconds"] is None
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    # A running job's status is stable between events, so polls revalidate
+    etag = response.headers["etag"]
+    cached = client.get(f"/api/scraper/status/{job.id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    summary.record("scrape:progress", pages_scraped=5)
+    assert client.get(f"/api/scraper/status/{job.id}", headers={"If-None-Match": etag}).status_code == 200
+
+    summary.record("scrape:completed", finished_at=datetime(2024, 1, 1, 0, 2))
+    assert client.get(f"/api/scraper/status/{job.id}").json()["duration_seconds"] == 120.0
+
+
+def test_missing_job_is_not_found():
+    response = make_client(FakeSession(None)).get(f"/api/scraper/status/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+class BrokenSession:
+    """Fails every statement after an error until it is rolled back"""
+
+    def __init__(self):
+        self.broken = False
+        self.commits = 0
+        self.jobs = []
+        self.summary = JobSummary(pages_scraped=0, bytes_scraped=0, error_count=0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, query):
+        if self.broken:
+            raise RuntimeError("This session's transaction has been rolled back")
+        if query.column_descriptions[0]["entity"] is Job:
+            self.jobs.append(Job(id=uuid.uuid4(), status="pending"))
+            return FakeScalars(self.jobs[-1])
+        return FakeScalars(self.summary)
+
+    async def commit(self):
+        if self.broken:
+            raise RuntimeError("This session's transaction has been rolled back")
+        self.commits += 1
+
+    async def rollback(self):
+        self.broken = False
+
+
+class FakeScalars:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one(self):
+        return self.value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+def test_failed_scrape_is_recorded_after_rollback(monkeypatch):
+    import asyncio
+    import config.database
+
+    session = BrokenSession()
+    events = []
+
+    class FailingScraper:
+        def __init__(self, job_id):
+            session.broken = True
+            raise RuntimeError("flush failed")
+
+    async def broadcast(event):
+        events.append(event)
+
+    monkeypatch.setattr(config.database, "AsyncSessionLocal", lambda: session)
+    monkeypatch.setattr(scraper, "PlaywrightScraper", FailingScraper)
+    monkeypatch.setattr(scraper.ws_manager, "broadcast", broadcast)
+
+    asyncio.run(scraper.run_scraper("job", "project", "https://example.com", 5, False, False))
+
+    reloaded = session.jobs[-1]
+    assert len(session.jobs) == 2
+    assert reloaded.status == "failed"
+    assert reloaded.error == "flush failed"
+    assert session.summary.error_count == 1
+    assert session.summary.last_event == "scrape:error"
+    assert session.commits == 2
+    assert events[-1]["type"] == "scrape:error"
@@ -0,0 +1,115 @@
+"""Tests for the scraped page search index"""
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from config.database import get_db
+from lib.auth import get_current_user
+from lib.exceptions import BoltflowException
+from middleware.error_handler import boltflow_exception_handler
+from models.user import User
+from routers import search
+from scrapers.search_index import extract_search_fields, structure_query_tokens
+
+PAGE = """
+<html>
+  <head><title> Join   our list </title><style>.newsletter { color: red }</style></head>
+  <body>
+    <!-- tracking -->
+    <h1 class="hero title">Welcome</h1><p>Fresh <b>coffee</b> daily</p>
+    <script>window.track = true</script>
+    <form id="signup" class="newsletter"><input type="Email" name="email"><button>Subscribe</button></form>
+    <svg><text>icon</text></svg>after
+  </body>
+</html>
+"""
+
+
+def test_extracts_visible_text_and_title():
+    fields = extract_search_fields(PAGE)
+    assert fields["title"] == "Join our list"
+    assert fields["search_text"] == "Welcome Fresh coffee daily Subscribe after"
+
+
+def test_extracts_structure_tokens():
+    tokens = set(extract_search_fields(PAGE)["structure_tokens"])
+    assert {"form", "form.newsletter", "#signup", "form#signup", "input[type=email]", "h1.hero"} <= tokens
+    assert not {"script", "style", "svg", "title", "html", "body"} & tokens
+
+
+def test_empty_or_broken_html():
+    assert extract_search_fields(None) == {"title": None, "search_text": None, "structure_tokens": []}
+    assert extract_search_fields("")["structure_tokens"] == []
+
+
+def test_structure_query_tokens():
+    assert structure_query_tokens("form.newsletter#signup") == ["form", "form#signup", "form.newsletter"]
+    assert structure_query_tokens("input[type=EMAIL]") == ["input", "input[type=email]"]
+    assert structure_query_tokens(".cta") == [".cta"]
+
+
+@pytest.mark.parametrize("selector", ["", "form .newsletter", "a:hover", "a[href^=http]", "*"])
+def test_unsupported_selectors(selector):
+    with pytest.raises(ValueError):
+        structure_query_tokens(selector)
+
+
+class FakeSession:
+    def __init__(self):
+        self.queries = []
+
+    async def execute(self, query):
+        self.queries.append(str(query.compile(dialect=postgresql.dialect())))
+        return []
+
+
+def make_client(session):
+    app = FastAPI()
+    app.include_router(search.router, prefix="/api/search")
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_current_user] = lambda: User(id=uuid.uuid4())
+    app.add_exception_handler(BoltflowException, boltflow_exception_handler)
+    return TestClient(app)
+
+
+def test_search_uses_indexed_predicates():
+    session = FakeSession()
+    response = make_client(session).get(
+        "/api/search/pages", params={"q": "coffee", "selector": ["form.newsletter"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["hits"] == []
+
+    (query,) = session.queries
+    assert "scraped_pages.search_vector @@ websearch_to_tsquery('english'::regconfig" in query
+    assert "scraped_pages.structure_tokens @>" in query
+    assert "ts_headline" in query and "LIMIT" in query
+
+
+def test_search_requires_query_or_valid_selector():
+    client = make_client(FakeSession())
+    assert client.get("/api/search/pages").status_code == 400
+    assert client.get("/api/search/pages", params={"selector": "a:hover"}).status_code == 400
+
+
+def test_processing_instructions_are_ignored():
+    fields = extract_search_fields(
+        '<?xml-stylesheet href="a.xsl"?><html><body><p>Hi <?php echo 1; ?>there</p></body></html>'
+    )
+
+    assert fields["search_text"] == "Hi there"
+    assert fields["structure_tokens"] == ["p"]
+
+
+def test_xhtml_with_xml_declaration_is_indexed():
+    fields = extract_search_fields(
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>XHTML</title></head>'
+        '<body><form class="search"></form></body></html>'
+    )
+
+    assert fields["title"] == "XHTML"
+    assert "form.search" in fields["structure_tokens"]
@@ -0,0 +1,81 @@
+"""Tests for fast JSON serialization"""
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel
+
+from lib import serialization
+from lib.serialization import FastJSONResponse, dumps, dumps_text
+from lib.websocket_manager import WebSocketManager
+
+
+class File(BaseModel):
+    filename: str
+    created_at: datetime
+
+
+ID = uuid.UUID("12345678-1234-5678-1234-567812345678")
+PAYLOAD = {
+    "id": ID,
+    "at": datetime(2024, 1, 2, 3, 4, 5, 600000),
+    "file": File(filename="Hero.tsx", created_at=datetime(2024, 1, 1)),
+    "tags": {"hero"},
+    7: "int key",
+    "text": "naïve ✓",
+}
+EXPECTED = {
+    "id": str(ID),
+    "at": "2024-01-02T03:04:05.600000",
+    "file": {"filename": "Hero.tsx", "created_at": "2024-01-01T00:00:00"},
+    "tags": ["hero"],
+    "7": "int key",
+    "text": "naïve ✓",
+}
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_dumps_encodes_api_types(fast, monkeypatch):
+    if fast:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    encoded = dumps(PAYLOAD)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == EXPECTED
+    assert dumps_text([1]) == "[1]"
+
+
+def test_unknown_types_raise():
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
+
+
+def test_response_renders_with_dumps():
+    response = FastJSONResponse({"id": ID}, headers={"ETag": '"x"'})
+    assert json.loads(response.body) == {"id": str(ID)}
+    assert response.media_type == "application/json"
+    assert response.headers["etag"] == '"x"'
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+def test_broadcast_encodes_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr("lib.websocket_manager.dumps_text", lambda message: calls.append(message) or "{}")
+    manager = WebSocketManager()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for i, socket in enumerate(sockets):
+        manager.active_connections[str(i)] = socket
+
+    asyncio.run(manager.broadcast({"type": "scrape:progress", "job_id": ID}))
+    assert len(calls) == 1
+    assert all(socket.sent == ["{}"] for socket in sockets)
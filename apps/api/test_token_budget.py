@@ -0,0 +1,90 @@
+"""Tests for token counting and request packing"""
+from ai.token_budget import TokenBudgetPacker, TokenCounter, group_by_source
+
+
+class CharEncoding:
+    """One token per character, so budgets are easy to reason about"""
+
+    def encode(self, text, disallowed_special=()):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+def make_packer(max_tokens=100, overhead=10, completion_tokens=0):
+    counter = TokenCounter(encoding=CharEncoding())
+    return TokenBudgetPacker(
+        counter, max_tokens=max_tokens, item_overhead=overhead, completion_tokens=completion_tokens
+    )
+
+
+def test_small_inputs_share_one_batch():
+    packer = make_packer()
+    batches = packer.pack({"a": "x" * 20, "b": "y" * 20, "c": "z" * 20})
+
+    assert len(batches) == 1
+    assert [item.source for item in batches[0].items] == ["a", "b", "c"]
+    assert batches[0].tokens <= packer.budget
+
+
+def test_packing_respects_budget():
+    packer = make_packer()
+    sources = {f"p{i}": "x" * (15 + i * 7) for i in range(10)}
+    batches = packer.pack(sources)
+
+    assert all(batch.tokens <= packer.budget for batch in batches)
+    assert sorted(item.source for b in batches for item in b.items) == sorted(sources)
+
+
+def test_oversized_input_splits_on_tag_boundaries():
+    packer = make_packer()
+    html = "".join(f"<p>{i:02d}</p>" for i in range(30))
+    batches = packer.pack({"page": html})
+    items = sorted((item for b in batches for item in b.items), key=lambda i: i.part)
+
+    assert len(items) > 1
+    assert all(item.tokens - packer.item_overhead <= packer.item_budget for item in items)
+    assert all(item.text.endswith(">") for item in items)
+    assert "".join(item.text for item in items) == html
+
+
+def test_split_is_deterministic():
+    packer = make_packer()
+    text = "a" * 500
+    assert packer.split(text) == packer.split(text)
+    assert "".join(packer.split(text)) == text
+
+
+def test_group_by_source_orders_parts():
+    packer = make_packer()
+    batches = packer.pack({"big": "<b>x</b>" * 40, "small": "tiny"})
+    results = {item.id: item.part for b in batches for item in b.items}
+    grouped = group_by_source(batches, results)
+
+    assert grouped["small"] == [0]
+    assert grouped["big"] == list(range(len(grouped["big"])))
+
+
+def test_reply_budget_is_reserved_per_item():
+    packer = make_packer(completion_tokens=20)
+    batches = packer.pack({"a": "x" * 20, "b": "y" * 20, "c": "z" * 20})
+
+    # 30 input + 20 reply per item: two fit in 100, the third needs its own request
+    assert [len(batch.items) for batch in batches] == [2, 1]
+    assert [batch.completion_tokens for batch in batches] == [40, 20]
+    assert all(batch.tokens + batch.completion_tokens <= packer.budget for batch in batches)
+    assert packer.item_budget == 70
+    assert packer.batch_of(batches[1].items[0]).completion_tokens == 20
+
+
+def test_split_parts_cannot_collide_with_source_keys():
+    packer = make_packer()
+    batches = packer.pack({"page": "<p>x</p>" * 20, "page#0": "other"})
+    items = [item for b in batches for item in b.items]
+    results = {item.id: (item.source, item.part) for item in items}
+    grouped = group_by_source(batches, results)
+
+    assert len({item.id for item in items}) == len(items)
+    assert grouped["page#0"] == [("page#0", 0)]
+    assert grouped["page"] == [("page", part) for part in range(len(grouped["page"]))]
@@ -3,10 +3,12 @@ import { jobs } from './jobs'
 
 export const generatedComponents = pgTable('generated_components', {
   id: uuid('id').defaultRandom().primaryKey(),
-  jobId: uuid('job_id').references(() => jobs.id).notNull(),
+  jobId: uuid('job_id').references(() => jobs.id),
   componentType: text('component_type').notNull(),
   filename: text('filename').notNull(),
   content: text('content').notNull(),
+  contentHash: text('content_hash').notNull(), // sha256 of generator inputs
+  generatorVersion: text('generator_version').notNull(),
   createdAt: timestamp('created_at').defaultNow().notNull(),
 })
 
@@ -4,3 +4,5 @@ export * from './jobs'
 export * from './scraped-pages'
 export * from './component-patterns'
 export * from './generated-components'
+export * from './page-analyses'
+export * from './job-summaries'
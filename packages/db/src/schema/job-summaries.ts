@@ -0,0 +1,18 @@
+import { pgTable, uuid, text, timestamp, integer, bigint } from 'drizzle-orm/pg-core'
+import { jobs } from './jobs'
+
+// Denormalized counters for a job, updated by its runner as it goes
+export const jobSummaries = pgTable('job_summaries', {
+  jobId: uuid('job_id').references(() => jobs.id, { onDelete: 'cascade' }).primaryKey(),
+  pagesScraped: integer('pages_scraped').notNull().default(0),
+  pagesTotal: integer('pages_total'),
+  bytesScraped: bigint('bytes_scraped', { mode: 'number' }).notNull().default(0),
+  errorCount: integer('error_count').notNull().default(0),
+  startedAt: timestamp('started_at'),
+  finishedAt: timestamp('finished_at'),
+  lastEvent: text('last_event'), // e.g. scrape:progress
+  lastEventAt: timestamp('last_event_at'),
+})
+
+export type JobSummary = typeof jobSummaries.$inferSelect
+export type NewJobSummary = typeof jobSummaries.$inferInsert
@@ -1,4 +1,4 @@
-import { pgTable, uuid, text, timestamp, integer, jsonb } from 'drizzle-orm/pg-core'
+import { pgTable, uuid, text, timestamp, integer, jsonb, index } from 'drizzle-orm/pg-core'
 import { projects } from './projects'
 
 export const jobs = pgTable('jobs', {
@@ -11,7 +11,10 @@ export const jobs = pgTable('jobs', {
   error: text('error'),
   createdAt: timestamp('created_at').defaultNow().notNull(),
   completedAt: timestamp('completed_at'),
-})
+}, (table) => ({
+  // Keyset pagination of a project's jobs, newest first
+  projectCreatedIdx: index('ix_jobs_project_id_created_at_id').on(table.projectId, table.createdAt, table.id),
+}))
 
 export type Job = typeof jobs.$inferSelect
 export type NewJob = typeof jobs.$inferInsert
@@ -0,0 +1,20 @@
+import { pgTable, uuid, text, timestamp, integer, real, jsonb } from 'drizzle-orm/pg-core'
+import { jobs } from './jobs'
+import { scrapedPages } from './scraped-pages'
+
+export const pageAnalyses = pgTable('page_analyses', {
+  id: uuid('id').defaultRandom().primaryKey(),
+  jobId: uuid('job_id').references(() => jobs.id),
+  scrapedPageId: uuid('scraped_page_id').references(() => scrapedPages.id),
+  contentHash: text('content_hash').notNull(), // sha256 of HTML + CSS
+  pageType: text('page_type').notNull(), // static, template, dynamic
+  components: jsonb('components').notNull(),
+  componentCount: integer('component_count').notNull().default(0),
+  complexityScore: real('complexity_score').notNull(),
+  estimatedHours: real('estimated_hours').notNull(),
+  templateConfidence: real('template_confidence'), // set when copied from a same-template page
+  createdAt: timestamp('created_at').defaultNow().notNull(),
+})
+
+export type PageAnalysis = typeof pageAnalyses.$inferSelect
+export type NewPageAnalysis = typeof pageAnalyses.$inferInsert
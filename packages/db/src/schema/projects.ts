@@ -1,4 +1,4 @@
-import { pgTable, uuid, text, timestamp, integer } from 'drizzle-orm/pg-core'
+import { pgTable, uuid, text, timestamp, integer, index } from 'drizzle-orm/pg-core'
 import { users } from './users'
 
 export const projects = pgTable('projects', {
@@ -10,7 +10,10 @@ export const projects = pgTable('projects', {
   maxPages: integer('max_pages').default(50),
   createdAt: timestamp('created_at').defaultNow().notNull(),
   updatedAt: timestamp('updated_at').defaultNow().notNull(),
-})
+}, (table) => ({
+  // Keyset pagination of a user's projects, newest first
+  userCreatedIdx: index('ix_projects_user_id_created_at_id').on(table.userId, table.createdAt, table.id),
+}))
 
 export type Project = typeof projects.$inferSelect
 export type NewProject = typeof projects.$inferInsert
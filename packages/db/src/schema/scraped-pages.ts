@@ -1,16 +1,43 @@
-import { pgTable, uuid, text, timestamp, jsonb } from 'drizzle-orm/pg-core'
+import { pgTable, uuid, text, timestamp, jsonb, integer, index, customType } from 'drizzle-orm/pg-core'
 import { jobs } from './jobs'
 
+// Generated by Postgres from title and search_text; see SEARCH_VECTOR in
+// apps/api/models/scraped_page.py
+const tsvector = customType<{ data: string }>({
+  dataType() {
+    return 'tsvector'
+  },
+})
+
 export const scrapedPages = pgTable('scraped_pages', {
   id: uuid('id').defaultRandom().primaryKey(),
   jobId: uuid('job_id').references(() => jobs.id).notNull(),
   url: text('url').notNull(),
-  html: text('html'),
-  css: text('css'),
-  screenshot: text('screenshot'),
+  // Payloads live in the blob store; rows keep the key and uncompressed size
+  htmlRef: text('html_ref'),
+  htmlSize: integer('html_size'),
+  cssRef: text('css_ref'),
+  cssSize: integer('css_size'),
+  screenshotRef: text('screenshot_ref'),
+  screenshotSize: integer('screenshot_size'),
+  // Inline payloads from before the blob store, kept until
+  // `python -m scripts.backfill_page_blobs` (apps/api) has moved them out
+  legacyHtml: text('html'),
+  legacyCss: text('css'),
+  legacyScreenshot: text('screenshot'),
   metadata: jsonb('metadata'),
+  // Search fields, extracted from the HTML at scrape time
+  title: text('title'),
+  searchText: text('search_text'),
+  structureTokens: text('structure_tokens').array(),
+  searchVector: tsvector('search_vector'),
   scrapedAt: timestamp('scraped_at').defaultNow().notNull(),
-})
+}, (table) => ({
+  // Keyset pagination and ordered export of a job's pages
+  jobScrapedIdx: index('ix_scraped_pages_job_id_scraped_at_id').on(table.jobId, table.scrapedAt, table.id),
+  searchVectorIdx: index('ix_scraped_pages_search_vector').using('gin', table.searchVector),
+  structureTokensIdx: index('ix_scraped_pages_structure_tokens').using('gin', table.structureTokens),
+}))
 
 export type ScrapedPage = typeof scrapedPages.$inferSelect
 export type NewScrapedPage = typeof scrapedPages.$inferInsert